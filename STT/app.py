@@ -4,12 +4,10 @@ import argparse
 import asyncio
 from dotenv import load_dotenv
 from server import AsrServer
+from asr_backend import create_backend_from_env
 
 import torch
 
-# transformers
-from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
-
 # FutureWarning 제거
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -42,30 +40,17 @@ def main():
     print(f"[INFO] 음성 없음 텍스트: {no_voice_text}")
 
 
-    # 디바이스 및 dtype 설정
+    # 디바이스 설정
     device = "cuda:0" if torch.cuda.is_available() else "cpu"
-    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
-
-    print(f"[INFO] 로컬 모델 로드 중... path: {model_dir}, device: {device}")
-    # ① 모델 디렉토리에서 실제 파일을 로드할 때만 local_files_only 사용
-    processor = AutoProcessor.from_pretrained(
-        model_dir,
-        local_files_only=True
-    )
 
-    model = AutoModelForSpeechSeq2Seq.from_pretrained(
-        model_dir,
-        local_files_only=True
-    ).to(device)
+    # ASR 백엔드 구성 (ASR_BACKEND=hf|ct2)
+    backend_name = os.getenv("ASR_BACKEND", "hf")
+    print(f"[INFO] ASR 백엔드 로드 중... backend: {backend_name}, device: {device}")
+    stt_pipeline = create_backend_from_env(device=device)
+    print(f"[INFO] STT 백엔드 구성 완료. {stt_pipeline.capabilities()}")
 
-    stt_pipeline = pipeline(
-    "automatic-speech-recognition",
-    model=model,
-    tokenizer=processor.tokenizer,
-    feature_extractor=processor.feature_extractor,
-    device=device,           # GPU 인덱스(예: 0) 또는 "cuda:0"    
-    )
-    print(f"[INFO] STT 파이프라인 구성 완료. (device: {device})")
+    if os.getenv("ASR_WARMUP", "True").lower() == "true":
+        stt_pipeline.warmup()
 
     try:
         host = os.getenv("ASR_HOST")
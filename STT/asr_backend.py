@@ -0,0 +1,200 @@
+# filename: asr_backend.py
+# author: gbox3d
+# created: 2025-10-19
+# description: ASR 추론 백엔드 인터페이스 (HF transformers 파이프라인 / CTranslate2 CPU 엔진)
+
+import os
+import time
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Whisper 계열 모델의 입력 샘플레이트
+WHISPER_SAMPLE_RATE = 16000
+
+
+class AsrBackend:
+    """
+    ASR 추론 백엔드 공통 인터페이스
+
+    AsrServer는 `stt_pipeline({"array": ..., "sampling_rate": ...})` 형태로 호출하므로
+    백엔드 객체도 같은 규약의 __call__ 을 제공합니다. (기존 HF 파이프라인과 호환)
+
+    하위 클래스는 transcribe_batch() 와 capabilities() 를 구현합니다.
+    """
+
+    name = "base"
+
+    def transcribe_batch(self, items: Sequence[Tuple[np.ndarray, int]]) -> List[str]:
+        """(waveform, sample_rate) 목록을 받아 인식 텍스트 목록을 반환"""
+        raise NotImplementedError
+
+    def transcribe(self, waveform: np.ndarray, sample_rate: int) -> str:
+        """단일 오디오 인식"""
+        return self.transcribe_batch([(waveform, sample_rate)])[0]
+
+    def warmup(self, seconds: float = 1.0, repeat: int = 1) -> float:
+        """무음 입력으로 모델/커널을 미리 초기화하고 소요 시간(초)을 반환"""
+        silence = np.zeros(int(WHISPER_SAMPLE_RATE * seconds), dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            self.transcribe(silence, WHISPER_SAMPLE_RATE)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] ASR 백엔드 워밍업 완료: {self.name} ({elapsed:.3f}s)")
+        return elapsed
+
+    def capabilities(self) -> dict:
+        """백엔드 특성 정보 (이름, 디바이스, 배치 지원 여부 등)"""
+        return {"name": self.name}
+
+    def __call__(self, inputs):
+        text = self.transcribe(inputs["array"], inputs["sampling_rate"])
+        return {"text": text}
+
+
+def resample_to_16k(waveform: np.ndarray, sample_rate: int) -> np.ndarray:
+    """백엔드 입력용 16kHz 리샘플링 (torchaudio)"""
+    if sample_rate == WHISPER_SAMPLE_RATE:
+        return np.ascontiguousarray(waveform, dtype=np.float32)
+    import torch
+    import torchaudio.functional as AF
+    tensor = torch.from_numpy(np.ascontiguousarray(waveform, dtype=np.float32))
+    return AF.resample(tensor, sample_rate, WHISPER_SAMPLE_RATE).numpy()
+
+
+#---------------------------------------------------------
+# 1. transformers 파이프라인 백엔드 (기존 구현)
+#---------------------------------------------------------
+class HFPipelineBackend(AsrBackend):
+    """transformers `automatic-speech-recognition` 파이프라인 백엔드"""
+
+    name = "hf"
+
+    def __init__(self, stt_pipeline, batch_size: int = 1, device: str = "cpu", model_id: str = ""):
+        self.pipeline = stt_pipeline
+        self.batch_size = max(1, int(batch_size))
+        self.device = device
+        self.model_id = model_id
+
+    @classmethod
+    def from_pretrained(cls, model_dir: str, device: str = "cpu", batch_size: int = 1, local_files_only: bool = True):
+        """로컬 모델 디렉토리에서 파이프라인을 구성"""
+        from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+
+        processor = AutoProcessor.from_pretrained(model_dir, local_files_only=local_files_only)
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(
+            model_dir,
+            local_files_only=local_files_only
+        ).to(device)
+        stt_pipeline = pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            device=device,
+        )
+        return cls(stt_pipeline, batch_size=batch_size, device=device, model_id=model_dir)
+
+    def transcribe_batch(self, items):
+        inputs = [{"array": waveform, "sampling_rate": sr} for waveform, sr in items]
+        results = self.pipeline(inputs, batch_size=self.batch_size)
+        return [r.get("text", "").strip() for r in results]
+
+    def capabilities(self):
+        return {
+            "name": self.name,
+            "engine": "transformers",
+            "model": self.model_id,
+            "device": str(self.device),
+            "batch": True,
+            "batch_size": self.batch_size,
+        }
+
+
+#---------------------------------------------------------
+# 2. CTranslate2 CPU 백엔드 (faster-whisper)
+#---------------------------------------------------------
+class CT2WhisperBackend(AsrBackend):
+    """
+    CTranslate2로 변환된 로컬 Whisper 모델을 사용하는 CPU 최적화 백엔드
+
+    모델 변환 예:
+        ct2-transformers-converter --model ./models/whisper-large-v3-turbo \\
+            --output_dir ./models/whisper-large-v3-turbo-ct2 --quantization int8
+    """
+
+    name = "ct2"
+
+    def __init__(self, model_dir: str, device: str = "cpu", compute_type: str = "int8",
+                 cpu_threads: int = 0, num_workers: int = 1, beam_size: int = 1, language: str = None):
+        from faster_whisper import WhisperModel  # pip install faster-whisper
+
+        self.model_dir = model_dir
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.beam_size = beam_size
+        self.language = language
+        self.model = WhisperModel(
+            model_dir,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+            local_files_only=True,
+        )
+
+    def transcribe_batch(self, items):
+        texts = []
+        for waveform, sr in items:
+            audio = resample_to_16k(waveform, sr)
+            segments, _info = self.model.transcribe(
+                audio,
+                language=self.language,
+                beam_size=self.beam_size,
+                condition_on_previous_text=False,
+            )
+            texts.append("".join(seg.text for seg in segments).strip())
+        return texts
+
+    def capabilities(self):
+        return {
+            "name": self.name,
+            "engine": "ctranslate2",
+            "model": self.model_dir,
+            "device": self.device,
+            "compute_type": self.compute_type,
+            "cpu_threads": self.cpu_threads,
+            "batch": False,
+            "beam_size": self.beam_size,
+        }
+
+
+#---------------------------------------------------------
+# 3. .env 설정으로 백엔드 생성
+#---------------------------------------------------------
+def create_backend_from_env(device: str = "cpu") -> AsrBackend:
+    """
+    ASR_BACKEND 환경 변수로 백엔드 선택
+      - hf  : MODEL_DIR 의 transformers 모델 (기본값)
+      - ct2 : CT2_MODEL_DIR 의 CTranslate2 변환 모델
+    """
+    backend = os.getenv("ASR_BACKEND", "hf").lower()
+    if backend == "hf":
+        return HFPipelineBackend.from_pretrained(
+            os.getenv("MODEL_DIR", "./models"),
+            device=device,
+            batch_size=int(os.getenv("ASR_BATCH_SIZE", 1)),
+        )
+    if backend == "ct2":
+        return CT2WhisperBackend(
+            os.getenv("CT2_MODEL_DIR", "./models/whisper-ct2"),
+            device=os.getenv("CT2_DEVICE", "cpu"),
+            compute_type=os.getenv("CT2_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(os.getenv("CT2_CPU_THREADS", 0)),
+            num_workers=int(os.getenv("CT2_NUM_WORKERS", 1)),
+            beam_size=int(os.getenv("CT2_BEAM_SIZE", 1)),
+            language=os.getenv("ASR_LANGUAGE") or None,
+        )
+    raise ValueError(f"지원하지 않는 ASR_BACKEND: {backend}")
@@ -0,0 +1,128 @@
+# filename: benchmark.py
+# author: gbox3d
+# created: 2025-10-19
+# description: ASR 백엔드 비교 벤치마크 (같은 오디오 세트로 hf / ct2 백엔드 측정)
+#
+# 사용 예:
+#   python benchmark.py --env ../.env --audio-dir ./test --backends hf,ct2 --repeat 3 --out bench_asr.json
+
+import os
+import json
+import time
+import argparse
+import statistics
+
+import torch
+from dotenv import load_dotenv
+
+from server import decode_audio
+from asr_backend import create_backend_from_env
+
+AUDIO_EXTS = (".wav", ".mp3", ".webm", ".mp4")
+
+
+def load_audio_set(audio_dir):
+    """디렉토리의 오디오 파일을 미리 디코딩 (디코딩 시간은 측정에서 제외)"""
+    items = []
+    for name in sorted(os.listdir(audio_dir)):
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in AUDIO_EXTS:
+            continue
+        with open(os.path.join(audio_dir, name), "rb") as f:
+            waveform, sr = decode_audio(f.read(), ext[1:])
+        items.append((name, waveform, sr))
+    return items
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_backend(name, items, repeat, device):
+    os.environ["ASR_BACKEND"] = name
+    load_start = time.perf_counter()
+    backend = create_backend_from_env(device=device)
+    load_time = time.perf_counter() - load_start
+    warmup_time = backend.warmup()
+
+    audio_seconds = sum(len(w) / sr for _, w, sr in items)
+    latencies = []
+    texts = {}
+    wall_start = time.perf_counter()
+    for _ in range(repeat):
+        for fname, waveform, sr in items:
+            start = time.perf_counter()
+            texts[fname] = backend.transcribe(waveform, sr)
+            latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - wall_start
+
+    result = {
+        "backend": backend.capabilities(),
+        "load_time": load_time,
+        "warmup_time": warmup_time,
+        "files": len(items),
+        "repeat": repeat,
+        "audio_seconds": audio_seconds * repeat,
+        "wall_seconds": wall,
+        "rtf": wall / (audio_seconds * repeat) if audio_seconds else 0.0,
+        "latency_mean": statistics.mean(latencies) if latencies else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "texts": texts,
+    }
+    del backend
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR 백엔드 벤치마크")
+    parser.add_argument('--env', default='.env', help="Path to the .env file (default: .env)")
+    parser.add_argument('--audio-dir', default='./test', help="벤치마크용 오디오 디렉토리")
+    parser.add_argument('--backends', default='hf,ct2', help="비교할 백엔드 목록 (콤마 구분)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--device', default=None, help="hf 백엔드 디바이스 (기본: 자동)")
+    parser.add_argument('--out', default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if os.path.exists(args.env):
+        load_dotenv(dotenv_path=args.env)
+
+    device = args.device or ("cuda:0" if torch.cuda.is_available() else "cpu")
+    items = load_audio_set(args.audio_dir)
+    if not items:
+        print(f"[ERROR] 오디오 파일이 없습니다: {args.audio_dir}")
+        return
+    print(f"[INFO] 오디오 {len(items)}개 로드 완료: {args.audio_dir}")
+
+    results = []
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        print(f"[INFO] 벤치마크 실행: {name}")
+        try:
+            results.append(run_backend(name, items, args.repeat, device))
+        except Exception as e:
+            print(f"[ERROR] {name} 백엔드 실행 실패: {e}")
+
+    print(f"\n{'backend':<8} {'load(s)':>8} {'RTF':>8} {'mean(s)':>8} {'p50(s)':>8} {'p95(s)':>8}")
+    for r in results:
+        print(f"{r['backend']['name']:<8} {r['load_time']:>8.2f} {r['rtf']:>8.3f} "
+              f"{r['latency_mean']:>8.3f} {r['latency_p50']:>8.3f} {r['latency_p95']:>8.3f}")
+
+    # 백엔드 간 인식 결과 일치 여부
+    if len(results) > 1:
+        base = results[0]["texts"]
+        for r in results[1:]:
+            same = sum(1 for k, v in r["texts"].items() if base.get(k) == v)
+            print(f"[INFO] {results[0]['backend']['name']} vs {r['backend']['name']} 결과 일치: {same}/{len(base)}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,140 +2,737 @@
 STT 클라이언트 헬퍼 모듈
 
 이 모듈은 STT(Speech-to-Text) 서버와 통신하는 클라이언트 헬퍼를 제공합니다.
-스레드 기반 구현과 asyncio 기반 구현을 모두 제공하여 다양한 환경에서 사용할 수 있습니다.
+asyncio 기반 구현(AsyncSTTClient)과 이를 감싼 동기/콜백 래퍼(STTClient)를 제공하여 다양한 환경에서 사용할 수 있습니다.
 """
 
 import os
 import socket
-import struct
 import sys
 import threading
+import time
+import queue
+import collections
 import asyncio
-from typing import Callable, Optional, Any, Coroutine, Union
+import concurrent.futures
+from typing import (Callable, Optional, Any, Coroutine, Union, Iterable, Iterator,
+                    AsyncIterator, NamedTuple)
 from dotenv import load_dotenv
 
+from voice_protocol import asr as proto
 
-# 스레드 기반 STT 클라이언트
+
+# 요청 코드
+REQ_STT = proto.REQ_STT
+REQ_STT_SHM = proto.REQ_STT_SHM
+REQ_PING = proto.REQ_PING
+
+# 확장자 -> 오디오 포맷 코드 (서버 fmt_map: 1 wav, 2 mp3, 3 webm, 4 mp4)
+FORMAT_CODES = {".wav": 1, ".mp3": 2, ".webm": 3, ".mp4": 4, ".m4a": 4}
+
+AudioSource = Union[str, os.PathLike, bytes, bytearray, memoryview]
+
+
+def detect_format_code(data: Optional[bytes] = None, path: Optional[str] = None, default: int = 1) -> int:
+    """오디오 포맷 코드 추정 (파일 시그니처 우선, 없으면 확장자)"""
+    if data is not None and len(data) >= 12:
+        head = bytes(data[:12])
+        if head[0:4] == b'RIFF' and head[8:12] == b'WAVE':
+            return 1
+        if head[0:3] == b'ID3' or (head[0] == 0xFF and (head[1] & 0xE0) == 0xE0):
+            return 2
+        if head[0:4] == b'\x1a\x45\xdf\xa3':  # EBML (webm/mkv)
+            return 3
+        if head[4:8] == b'ftyp':
+            return 4
+    if path is not None:
+        ext = os.path.splitext(str(path))[1].lower()
+        if ext in FORMAT_CODES:
+            return FORMAT_CODES[ext]
+    return default
+
+
+class BulkResult(NamedTuple):
+    """recognize_many 결과 항목"""
+    index: int                  # 입력 순서
+    source: str                 # 파일 경로 또는 "<bytes #index>"
+    text: Optional[str]
+    error: Optional[Exception]
+    latency: float              # 요청 전송부터 응답까지 걸린 시간 (초)
+    size: int                   # 오디오 바이트 수
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize_bulk(results, wall_seconds: float) -> dict:
+    """recognize_many 결과로 처리량/지연 시간 리포트 생성"""
+    latencies = [r.latency for r in results if r.error is None]
+    total_bytes = sum(r.size for r in results)
+    return {
+        "count": len(results),
+        "succeeded": len(latencies),
+        "failed": len(results) - len(latencies),
+        "wall_seconds": wall_seconds,
+        "files_per_sec": len(results) / wall_seconds if wall_seconds > 0 else 0.0,
+        "bytes_per_sec": total_bytes / wall_seconds if wall_seconds > 0 else 0.0,
+        "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "latency_max": max(latencies) if latencies else 0.0,
+        "per_file": [(r.source, r.latency, r.error is None) for r in sorted(results, key=lambda r: r.index)],
+    }
+
+
+def print_bulk_report(report: dict) -> None:
+    print(f"[INFO] 일괄 인식 완료: {report['succeeded']}/{report['count']}건 성공, "
+          f"{report['wall_seconds']:.2f}s, {report['files_per_sec']:.2f} files/s")
+    print(f"[INFO] 지연 시간 mean={report['latency_mean']:.3f}s p50={report['latency_p50']:.3f}s "
+          f"p95={report['latency_p95']:.3f}s max={report['latency_max']:.3f}s")
+    for source, latency, ok in report["per_file"]:
+        print(f"  {'OK ' if ok else 'ERR'} {latency:8.3f}s  {source}")
+
+
+class STTServerError(ValueError):
+    """서버가 SUCCESS(0) 이외의 상태 코드를 반환한 경우"""
+
+    def __init__(self, status: int):
+        super().__init__(f"서버에서 오류 발생. status: {status}")
+        self.status = status
+
+
+class _StaleConnection(Exception):
+    """풀에서 꺼낸 연결이 이미 서버에 의해 닫힌 경우 (내부용)"""
+
+
+class _Connection:
+    """풀에 보관되는 서버 연결"""
+
+    __slots__ = ("reader", "writer", "reused")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    @property
+    def is_closing(self) -> bool:
+        return self.writer.is_closing() or self.reader.at_eof()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+EndpointSpec = Union[str, tuple]
+
+
+class _Endpoint:
+    """서버 복제본(replica) 1개의 연결 풀과 상태"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 unix_path: Optional[str] = None, pool_size: int = 8):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.pool_size = pool_size
+        self.idle = []                      # 재사용 대기 중인 연결 (LIFO)
+        self.slots = asyncio.Semaphore(pool_size)
+        self.outstanding = 0                # 진행 중(대기 포함)인 요청 수
+        self.healthy = True
+        self.failures = 0                   # 연속 실패 횟수
+
+    @property
+    def label(self) -> str:
+        return self.unix_path or f"{self.host}:{self.port}"
+
+    @staticmethod
+    def parse(spec: EndpointSpec, pool_size: int) -> "_Endpoint":
+        """("host", port) 튜플 또는 "host:port" 문자열"""
+        if isinstance(spec, str):
+            host, _, port = spec.rpartition(":")
+            return _Endpoint(host or "localhost", int(port), pool_size=pool_size)
+        host, port = spec
+        return _Endpoint(host, int(port), pool_size=pool_size)
+
+
+# asyncio 기반 STT 클라이언트
+class AsyncSTTClient:
+    """
+    asyncio 기반 STT 클라이언트
+
+    - 연결 풀: 동시에 열리는 연결 수를 pool_size로 제한하고, 서버가 연결을 유지하면 재사용합니다.
+    - 요청별 타임아웃과 지수 백오프 재시도를 지원합니다.
+    - 요청마다 스레드를 만들지 않으므로 수천 개의 요청을 동시에 대기시킬 수 있습니다.
+    - 여러 복제본(endpoints)을 지정하면 진행 중인 요청이 가장 적은 서버로 보내고,
+      PING에 실패한 서버는 제외했다가 다시 응답하면 복귀시킵니다.
+    - hedge=True면 p95 지연 시간이 지나도 응답이 없을 때 다른 서버로 같은 요청을 보내고 먼저 온 응답을 사용합니다.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, checkcode: Optional[int] = None,
+                 unix_path: Optional[str] = None, pool_size: int = 8, timeout: float = 30.0,
+                 connect_timeout: float = 5.0, retries: int = 2, backoff: float = 0.2,
+                 endpoints: Optional[Iterable[EndpointSpec]] = None, health_interval: float = 5.0,
+                 hedge: bool = False, hedge_min_delay: float = 0.05, hedge_min_samples: int = 20):
+        """
+        Args:
+            host, port, checkcode: STT 서버 설정
+            unix_path: 같은 호스트의 서버 Unix 소켓 경로 (지정 시 TCP 대신 사용)
+            pool_size: 서버별 최대 동시 연결 수
+            timeout: 요청 1건의 응답 대기 시간 (초)
+            connect_timeout: 연결 수립 대기 시간 (초)
+            retries: 연결/타임아웃 오류 시 재시도 횟수 (가능하면 다른 서버로 재시도)
+            backoff: 첫 재시도 대기 시간 (초, 재시도마다 2배)
+            endpoints: 복제본 목록 [("host", port), "host:port", ...] (지정 시 host/port 대신 사용)
+            health_interval: 복제본 PING 주기 (초, 복제본이 2개 이상일 때만 동작)
+            hedge: 헤지 요청 사용 여부
+            hedge_min_delay: 헤지 요청 최소 대기 시간 (초)
+            hedge_min_samples: p95 계산에 필요한 최소 응답 수 (그 전에는 헤지하지 않음)
+        """
+        self.checkcode = checkcode or 20250218
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.health_interval = health_interval
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+
+        if unix_path:
+            self._endpoints = [_Endpoint(unix_path=unix_path, pool_size=pool_size)]
+        elif endpoints:
+            self._endpoints = [_Endpoint.parse(spec, pool_size) for spec in endpoints]
+        else:
+            self._endpoints = [_Endpoint(host or "localhost", port or 4270, pool_size=pool_size)]
+        first = self._endpoints[0]
+        self.server_host = first.host
+        self.server_port = first.port
+        self.unix_path = unix_path
+
+        self._rr = 0                                    # 동률일 때 라운드 로빈
+        self._latencies = collections.deque(maxlen=256) # 최근 성공 요청 지연 시간 (헤지 지연 계산용)
+        self._health_task = None
+
+        # 마지막 recognize_many 리포트
+        self.last_report = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ──────────────────────────────────────────────
+    # 공개 API
+    # ──────────────────────────────────────────────
+    async def recognize(self, audio_data: bytes, format_code: Optional[int] = None, timeout: Optional[float] = None) -> str:
+        """오디오 데이터 인식
+
+        Args:
+            audio_data: 오디오 데이터 바이트
+            format_code: 오디오 포맷 코드 (1: wav, 2: mp3, 3: webm, 4: mp4, None이면 시그니처로 추정)
+            timeout: 요청 타임아웃 (None이면 기본값)
+        """
+        if format_code is None:
+            format_code = detect_format_code(audio_data)
+        return await self._call(proto.stt_frames(self.checkcode, format_code, audio_data),
+                                expect_text=True, timeout=timeout)
+
+    async def recognize_file(self, file_path: str, timeout: Optional[float] = None) -> str:
+        """오디오 파일 인식 (포맷은 파일 시그니처/확장자로 결정)"""
+        loop = asyncio.get_running_loop()
+        audio_data = await loop.run_in_executor(None, _read_file, file_path)
+        return await self.recognize(audio_data, detect_format_code(audio_data, file_path), timeout)
+
+    async def recognize_many(self, items: Iterable[AudioSource], concurrency: int = 4, ordered: bool = False,
+                             timeout: Optional[float] = None, report: bool = True) -> AsyncIterator[BulkResult]:
+        """여러 오디오를 동시 요청 수 concurrency로 제한하여 인식하고 결과를 스트리밍
+
+        Args:
+            items: 파일 경로 또는 오디오 바이트의 iterable (제너레이터도 가능, 필요한 만큼만 읽음)
+            concurrency: 동시에 처리할 최대 요청 수
+            ordered: True면 입력 순서대로, False면 완료 순서대로 결과를 반환
+            timeout: 요청별 타임아웃
+            report: 종료 시 처리량/파일별 지연 시간 리포트 출력 (self.last_report에도 저장)
+
+        Yields:
+            BulkResult (실패한 항목은 error에 예외가 담기며 반복은 계속됩니다)
+        """
+        source_iter = enumerate(items)
+        results_q = asyncio.Queue()
+        done_marker = object()
+
+        async def worker():
+            try:
+                # 여러 워커가 같은 iterator를 공유하므로 입력은 필요한 만큼만 소비됨
+                for index, item in source_iter:
+                    await results_q.put(await self._recognize_item(index, item, timeout))
+            finally:
+                results_q.put_nowait(done_marker)
+
+        concurrency = max(1, int(concurrency))
+        wall_start = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        collected = []
+        pending = {}     # ordered 모드용 재정렬 버퍼
+        next_index = 0
+        finished = 0
+        try:
+            while finished < concurrency:
+                res = await results_q.get()
+                if res is done_marker:
+                    finished += 1
+                    continue
+                collected.append(res)
+                if not ordered:
+                    yield res
+                    continue
+                pending[res.index] = res
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+            # 워커에서 입력 iterator 예외가 발생했다면 전파
+            for task in workers:
+                if task.done() and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in workers:
+                task.cancel()
+            self.last_report = summarize_bulk(collected, time.perf_counter() - wall_start)
+            if report:
+                print_bulk_report(self.last_report)
+
+    async def recognize_shm(self, shm_name: str, nbytes: int, sample_rate: int,
+                            sample_format: int = 1, timeout: Optional[float] = None) -> str:
+        """공유 메모리에 있는 raw PCM 인식 (Unix 소켓 연결 전용)
+
+        오디오 바이트 대신 세그먼트 이름과 길이만 전송하므로 긴 발화도 복사 없이 전달됩니다.
+        세그먼트의 생성/해제(unlink)는 호출자가 책임집니다.
+
+        Args:
+            shm_name: multiprocessing.shared_memory 세그먼트 이름
+            nbytes: PCM 데이터 길이 (바이트)
+            sample_rate: 샘플레이트 (Hz)
+            sample_format: 1: int16 LE, 2: float32 LE (mono)
+        """
+        if not self.unix_path:
+            raise ValueError("공유 메모리 요청은 unix_path 연결에서만 지원됩니다.")
+        parts = proto.shm_frames(self.checkcode, sample_format, sample_rate, nbytes, shm_name)
+        return await self._call(parts, expect_text=True, timeout=timeout)
+
+    async def ping(self, timeout: Optional[float] = None) -> bool:
+        """서버 응답 확인"""
+        try:
+            await self._call(proto.ping_frames(self.checkcode), expect_text=False, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        """헬스 체크 중지 및 풀에 남은 연결 정리"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for ep in self._endpoints:
+            idle, ep.idle = ep.idle, []
+            for conn in idle:
+                conn.close()
+
+    def endpoint_status(self) -> list:
+        """복제본별 상태 (주소, 정상 여부, 진행 중 요청 수, 유휴 연결 수)"""
+        return [{"endpoint": ep.label, "healthy": ep.healthy, "outstanding": ep.outstanding,
+                 "idle": len(ep.idle)} for ep in self._endpoints]
+
+    # ──────────────────────────────────────────────
+    # 내부 구현
+    # ──────────────────────────────────────────────
+    async def _recognize_item(self, index: int, item: AudioSource, timeout: Optional[float]) -> BulkResult:
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            source, path, audio_data = f"<bytes #{index}>", None, item
+        else:
+            source = path = os.fspath(item)
+            audio_data = None
+        start = time.perf_counter()
+        try:
+            if audio_data is None:
+                loop = asyncio.get_running_loop()
+                audio_data = await loop.run_in_executor(None, _read_file, path)
+            start = time.perf_counter()
+            text = await self.recognize(audio_data, detect_format_code(audio_data, path), timeout)
+            return BulkResult(index, source, text, None, time.perf_counter() - start, len(audio_data))
+        except Exception as e:
+            size = len(audio_data) if audio_data is not None else 0
+            return BulkResult(index, source, None, e, time.perf_counter() - start, size)
+
+    # ── 복제본 선택 / 헬스 체크 ──
+    def _pick(self, exclude=()) -> _Endpoint:
+        """정상 복제본 중 진행 중 요청이 가장 적은 서버 선택 (모두 제외되었으면 전체에서 선택)"""
+        candidates = [ep for ep in self._endpoints if ep.healthy and ep not in exclude]
+        if not candidates:
+            candidates = [ep for ep in self._endpoints if ep not in exclude] or self._endpoints
+        self._rr += 1
+        n = len(candidates)
+        return min((candidates[(self._rr + i) % n] for i in range(n)), key=lambda ep: ep.outstanding)
+
+    def _mark_failure(self, ep: _Endpoint) -> None:
+        ep.failures += 1
+        if ep.healthy and len(self._endpoints) > 1:
+            ep.healthy = False
+            print(f"[WARNING] STT 서버 제외: {ep.label}")
+        # 남은 유휴 연결도 신뢰할 수 없으므로 정리
+        idle, ep.idle = ep.idle, []
+        for conn in idle:
+            conn.close()
+
+    def _mark_success(self, ep: _Endpoint) -> None:
+        ep.failures = 0
+        if not ep.healthy:
+            ep.healthy = True
+            print(f"[INFO] STT 서버 복귀: {ep.label}")
+
+    def _ensure_health_task(self) -> None:
+        if self._health_task is None and len(self._endpoints) > 1 and self.health_interval > 0:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            results = await asyncio.gather(*(self._ping_endpoint(ep) for ep in self._endpoints))
+            for ep, ok in zip(self._endpoints, results):
+                if ok:
+                    self._mark_success(ep)
+                else:
+                    self._mark_failure(ep)
+
+    async def _ping_endpoint(self, ep: _Endpoint) -> bool:
+        """풀과 별개의 연결로 PING (요청이 몰려 풀이 가득 차도 헬스 체크가 밀리지 않도록)"""
+        try:
+            conn = await self._open(ep)
+        except (ConnectionError, OSError, asyncio.TimeoutError):
+            return False
+        try:
+            conn.writer.writelines(proto.ping_frames(self.checkcode))
+            await conn.writer.drain()
+            response = await asyncio.wait_for(proto.read_response(conn.reader), timeout=self.connect_timeout)
+            return response.status == proto.SUCCESS
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return False
+        finally:
+            conn.close()
+
+    # ── 연결 풀 ──
+    async def _open(self, ep: _Endpoint) -> _Connection:
+        if ep.unix_path:
+            coro = asyncio.open_unix_connection(ep.unix_path)
+        else:
+            coro = asyncio.open_connection(ep.host, ep.port)
+        reader, writer = await asyncio.wait_for(coro, timeout=self.connect_timeout)
+        return _Connection(reader, writer)
+
+    async def _acquire(self, ep: _Endpoint) -> _Connection:
+        while ep.idle:
+            conn = ep.idle.pop()
+            if not conn.is_closing:
+                conn.reused = True
+                return conn
+            conn.close()
+        return await self._open(ep)
+
+    def _release(self, ep: _Endpoint, conn: _Connection, reusable: bool) -> None:
+        if reusable and not conn.is_closing and len(ep.idle) < ep.pool_size:
+            ep.idle.append(conn)
+        else:
+            conn.close()
+
+    # ── 요청 처리 ──
+    def _hedge_delay(self) -> Optional[float]:
+        """최근 응답 p95 기반 헤지 대기 시간 (표본이 부족하면 None)"""
+        if len(self._latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, _percentile(self._latencies, 95))
+
+    async def _call(self, parts, expect_text: bool, timeout: Optional[float] = None) -> Optional[str]:
+        """요청 전송 (헤지 모드면 p95 지연 후 다른 복제본으로 중복 요청)"""
+        self._ensure_health_task()
+        delay = self._hedge_delay() if self.hedge and len(self._endpoints) > 1 else None
+        if delay is None:
+            return await self._call_with_retry(parts, expect_text, timeout)
+
+        picked = []     # primary가 시도 중인(시도한) 복제본
+        primary = asyncio.ensure_future(self._call_with_retry(parts, expect_text, timeout, picked=picked))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        # primary가 기다리고 있는 복제본은 제외하고 다른 복제본으로 중복 요청
+        hedged = asyncio.ensure_future(self._call_with_retry(parts, expect_text, timeout, exclude=list(picked)))
+        tasks = {primary, hedged}
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not tasks:
+                    # 둘 다 실패: 마지막 예외 전파
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call_with_retry(self, parts, expect_text: bool, timeout: Optional[float] = None,
+                               exclude=(), picked: Optional[list] = None) -> Optional[str]:
+        """
+        요청 전송 + 재시도 (서버 오류 상태 코드는 재시도하지 않음)
+        exclude: 선택하지 않을 복제본 (다른 복제본이 없으면 무시) / picked: 시도한 복제본을 순서대로 기록
+        """
+        attempt = 0
+        tried = list(exclude)
+        stale_ep = None
+        while True:
+            # 재사용 연결이 끊겨 있던 경우에는 같은 복제본에 새 연결로 한 번 더 시도
+            ep = stale_ep or self._pick(exclude=tried)
+            fresh, stale_ep = stale_ep is not None, None
+            if picked is not None:
+                picked.append(ep)
+            ep.outstanding += 1
+            start = time.perf_counter()
+            record = False
+            try:
+                async with ep.slots:
+                    result = await asyncio.wait_for(self._exchange(ep, parts, expect_text, fresh),
+                                                    timeout or self.timeout)
+                record = True
+                self._mark_success(ep)
+                return result
+            except STTServerError:
+                raise
+            except asyncio.CancelledError:
+                # 헤지에 져서 취소된 느린 시도도 지연 표본에 포함 (빠른 응답만 남아 p95가 계속 낮아지지 않도록)
+                record = True
+                raise
+            except _StaleConnection:
+                # 서버가 유휴 연결을 닫은 경우: 복제본 장애로 보지 않고 새 연결로 즉시 재시도
+                stale_ep = ep
+                continue
+            except asyncio.TimeoutError:
+                record = True
+                # 느린 응답은 서버 장애로 단정하지 않음 (헬스 체크에서 판단)
+                if attempt >= self.retries:
+                    raise
+            except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                self._mark_failure(ep)
+                if attempt >= self.retries:
+                    raise
+            finally:
+                ep.outstanding -= 1
+                if record and expect_text:
+                    # 헤지 지연은 인식 요청 지연만으로 계산 (PING 왕복은 제외)
+                    self._latencies.append(time.perf_counter() - start)
+            tried.append(ep)
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    async def _exchange(self, ep: _Endpoint, parts, expect_text: bool, fresh: bool = False) -> Optional[str]:
+        """요청 1회 (fresh=True면 풀을 거치지 않고 새 연결 사용)"""
+        conn = await self._open(ep) if fresh else await self._acquire(ep)
+        reusable = False
+        try:
+            try:
+                # 헤더와 오디오를 이어 붙이지 않고 조각 그대로 전송
+                conn.writer.writelines(parts)
+                await conn.writer.drain()
+
+                # 응답 헤더 수신: checkcode(4) + request_code(4) + status(1)
+                response = await proto.read_response(conn.reader)
+            except (asyncio.IncompleteReadError, OSError) as e:
+                # 재사용 연결의 전송/수신 실패는 서버가 유휴 연결을 닫은 것으로 간주
+                if conn.reused:
+                    raise _StaleConnection() from e
+                raise
+            if response.status != proto.SUCCESS:
+                # 오류 응답 후에는 서버가 연결을 닫을 수 있으므로 재사용하지 않음
+                raise STTServerError(response.status)
+            if not expect_text:
+                reusable = True
+                return None
+
+            # 성공일 경우, 텍스트 길이(4) + UTF-8 텍스트
+            recognized_text = await proto.read_text(conn.reader)
+            reusable = True
+            return recognized_text
+        finally:
+            self._release(ep, conn, reusable)
+
+
+# 동기/콜백 STT 클라이언트 (AsyncSTTClient 래퍼)
 class STTClient:
     """
-    스레드 기반 STT 클라이언트
-    
-    각 STT 요청을 별도의 스레드에서 처리하고, 콜백 함수를 통해 결과를 반환합니다.
-    
-    장점:
-    - 기존 동기 코드와 쉽게 통합 가능
-    - 별도의 실행 환경 설정 없이 사용 가능
-    
-    단점:
-    - 많은 수의 동시 요청 처리 시 스레드 오버헤드 발생 가능
+    콜백 기반 STT 클라이언트
+
+    기존 콜백 API를 유지하면서, 내부적으로는 백그라운드 스레드 1개에서 도는 이벤트 루프와
+    AsyncSTTClient의 연결 풀을 사용합니다. 요청마다 스레드나 소켓을 새로 만들지 않습니다.
+
+    콜백은 이벤트 루프 스레드에서 호출되므로 오래 걸리는 작업은 콜백 밖에서 처리하세요.
     """
-    
-    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, checkcode: Optional[int] = None):
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, checkcode: Optional[int] = None,
+                 unix_path: Optional[str] = None, pool_size: int = 8, timeout: float = 30.0, retries: int = 2,
+                 endpoints: Optional[Iterable[EndpointSpec]] = None, hedge: bool = False):
         """STT 클라이언트 초기화
-        
+
         Args:
-            host: STT 서버 호스트 (None일 경우 환경변수에서 로드)
-            port: STT 서버 포트 (None일 경우 환경변수에서 로드)
-            checkcode: STT 서버 체크코드 (None일 경우 환경변수에서 로드)
+            host: STT 서버 호스트 (None일 경우 localhost)
+            port: STT 서버 포트 (None일 경우 4270)
+            checkcode: STT 서버 체크코드 (None일 경우 20250218)
+            unix_path: 같은 호스트의 서버 Unix 소켓 경로 (지정 시 TCP 대신 사용)
+            pool_size: 최대 동시 연결 수
+            timeout: 요청 1건의 응답 대기 시간 (초)
+            retries: 연결/타임아웃 오류 시 재시도 횟수
+            endpoints: 복제본 목록 [("host", port), "host:port", ...] (지정 시 host/port 대신 사용)
+            hedge: p95 지연 기반 헤지 요청 사용 여부
         """
-        # 환경변수 로드
-        # load_dotenv()
-        
-        # 서버 설정
-        self.server_host = host or "localhost"
-        self.server_port = port or 4270
-        self.checkcode = checkcode or 20250218
-        
-        self._threads = []
-    
+        self._client = AsyncSTTClient(host, port, checkcode, unix_path=unix_path,
+                                      pool_size=pool_size, timeout=timeout, retries=retries,
+                                      endpoints=endpoints, hedge=hedge)
+        self.server_host = self._client.server_host
+        self.server_port = self._client.server_port
+        self.checkcode = self._client.checkcode
+        self.unix_path = unix_path
+
+        self._loop = None
+        self._loop_thread = None
+        self._lock = threading.Lock()
+        self._pending = set()
+
     def recognize_file(self, file_path: str, callback: Callable[[str, Optional[Exception]], Any]) -> None:
         """파일에서 오디오를 읽어 STT 요청을 비동기로 수행
-        
+
         Args:
             file_path: 오디오 파일 경로
             callback: 결과를 반환할 콜백 함수. 첫 번째 인자는 인식된 텍스트, 두 번째 인자는 예외(발생시)
         """
-        thread = threading.Thread(target=self._process_file, args=(file_path, callback))
-        thread.daemon = True  # 메인 스레드가 종료되면 이 스레드도 종료
-        self._threads.append(thread)
-        thread.start()
-    
+        self._submit(self._client.recognize_file(file_path), callback)
+
     def recognize_audio(self, audio_data: bytes, callback: Callable[[str, Optional[Exception]], Any], format_code: int = 1) -> None:
         """오디오 데이터로부터 STT 요청을 비동기로 수행
-        
+
         Args:
             audio_data: 오디오 데이터 바이트
             format_code: 오디오 포맷 코드 (1: wav, 2: mp3, 3: webm 등)
             callback: 결과를 반환할 콜백 함수. 첫 번째 인자는 인식된 텍스트, 두 번째 인자는 예외(발생시)
         """
-        thread = threading.Thread(target=self._process_audio, args=(audio_data, format_code, callback))
-        thread.daemon = True
-        self._threads.append(thread)
-        thread.start()
-    
-    def _process_file(self, file_path: str, callback: Callable[[str, Optional[Exception]], Any]) -> None:
-        """파일에서 오디오를 읽어 STT 요청 처리 (내부 메서드)"""
+        self._submit(self._client.recognize(audio_data, format_code), callback)
+
+    def recognize_shm(self, shm_name: str, nbytes: int, sample_rate: int,
+                      callback: Callable[[str, Optional[Exception]], Any], sample_format: int = 1) -> None:
+        """공유 메모리에 있는 raw PCM으로 STT 요청 (Unix 소켓 연결 전용)
+
+        세그먼트의 생성/해제(unlink)는 호출자가 책임집니다. (AsyncSTTClient.recognize_shm 참고)
+        """
+        self._submit(self._client.recognize_shm(shm_name, nbytes, sample_rate, sample_format), callback)
+
+    def recognize_many(self, items: Iterable[AudioSource], concurrency: int = 4, ordered: bool = False,
+                       timeout: Optional[float] = None, report: bool = True) -> Iterator[BulkResult]:
+        """여러 오디오를 동시 요청 수 concurrency로 제한하여 인식하고 결과를 이터레이터로 반환
+
+        AsyncSTTClient.recognize_many의 동기 버전입니다. 종료 후 리포트는 self.last_report에 있습니다.
+        """
+        results_q = queue.Queue()
+        done_marker = object()
+
+        async def pump():
+            try:
+                async for res in self._client.recognize_many(items, concurrency, ordered, timeout, report):
+                    results_q.put(res)
+            finally:
+                results_q.put(done_marker)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._ensure_loop())
         try:
-            with open(file_path, "rb") as f:
-                audio_data = f.read()
-            self._process_audio(audio_data, 1, callback)  # 기본 포맷 코드 1 (wav)
-        except Exception as e:
-            callback(None, e)
-    
-    def _process_audio(self, audio_data: bytes, format_code: int, callback: Callable[[str, Optional[Exception]], Any]) -> None:
-        """오디오 데이터로부터 STT 요청 처리 (내부 메서드)"""
+            while True:
+                res = results_q.get()
+                if res is done_marker:
+                    break
+                yield res
+            future.result()
+        finally:
+            if not future.done():
+                future.cancel()
+
+    @property
+    def last_report(self) -> Optional[dict]:
+        """마지막 recognize_many 리포트 (처리량, 파일별 지연 시간)"""
+        return self._client.last_report
+
+    def recognize_sync(self, audio_data: bytes, format_code: Optional[int] = None, timeout: Optional[float] = None) -> str:
+        """오디오 데이터를 인식하고 결과를 기다려 반환 (블로킹)"""
+        return self._run(self._client.recognize(audio_data, format_code, timeout))
+
+    def ping(self) -> bool:
+        """서버 응답 확인 (블로킹)"""
+        return self._run(self._client.ping())
+
+    def wait(self) -> None:
+        """모든 비동기 요청이 완료될 때까지 대기"""
+        with self._lock:
+            pending = list(self._pending)
+        concurrent.futures.wait(pending)
+
+    def close(self) -> None:
+        """연결 풀과 이벤트 루프 스레드 정리"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._loop_thread = self._loop_thread, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    # ──────────────────────────────────────────────
+    # 내부 구현
+    # ──────────────────────────────────────────────
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="STTClientLoop")
+                self._loop_thread.daemon = True  # 메인 스레드가 종료되면 이 스레드도 종료
+                self._loop_thread.start()
+            return self._loop
+
+    def _run(self, coro: Coroutine) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def _submit(self, coro: Coroutine, callback: Callable[[str, Optional[Exception]], Any]) -> concurrent.futures.Future:
+        future = asyncio.run_coroutine_threadsafe(self._with_callback(coro, callback), self._ensure_loop())
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    @staticmethod
+    async def _with_callback(coro: Coroutine, callback: Callable[[str, Optional[Exception]], Any]) -> None:
+        """요청 결과를 콜백으로 전달 (wait()가 콜백 완료까지 기다리도록 코루틴 안에서 호출)"""
         try:
-            # STT 요청 패킷 구성
-            request_code = 0x01  # STT 요청
-            header = struct.pack('!ii', self.checkcode, request_code)
-            format_code_bytes = struct.pack('!B', format_code)
-            audio_length = len(audio_data)
-            audio_length_bytes = struct.pack('!i', audio_length)
-            packet = header + format_code_bytes + audio_length_bytes + audio_data
-            
-            # 서버로 패킷 전송 및 응답 수신
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
-                client_socket.connect((self.server_host, self.server_port))
-                
-                # STT 요청 패킷 전송
-                client_socket.sendall(packet)
-                
-                # 응답 헤더 수신: checkcode(4) + request_code(4) + status(1)
-                response_header = client_socket.recv(9)
-                if len(response_header) != 9:
-                    raise ValueError("응답 헤더 길이가 잘못되었습니다.")
-                
-                res_checkcode, res_request_code, status_code = struct.unpack('!iiB', response_header)
-                if status_code != 0:
-                    raise ValueError(f"서버에서 오류 발생. status: {status_code}")
-                
-                # 성공일 경우, 다음 4바이트로 텍스트 길이 정보를 받음
-                response_length_bytes = client_socket.recv(4)
-                if len(response_length_bytes) != 4:
-                    raise ValueError("응답 텍스트 길이 정보 수신 실패.")
-                text_length = struct.unpack('!i', response_length_bytes)[0]
-                
-                # 텍스트 데이터 수신
-                recognized_text_bytes = b""
-                remaining = text_length
-                while remaining > 0:
-                    chunk = client_socket.recv(remaining)
-                    if not chunk:
-                        break
-                    recognized_text_bytes += chunk
-                    remaining -= len(chunk)
-                
-                if len(recognized_text_bytes) != text_length:
-                    raise ValueError("텍스트 데이터 수신 길이 오류.")
-                
-                recognized_text = recognized_text_bytes.decode('utf-8')
-                callback(recognized_text, None)
+            result = await coro
         except Exception as e:
             callback(None, e)
-    
-    def wait(self) -> None:
-        """모든 비동기 요청이 완료될 때까지 대기"""
-        for thread in self._threads:
-            thread.join()
-        self._threads = []
+            return
+        callback(result, None)
+
 
+def _read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
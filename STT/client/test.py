@@ -5,8 +5,9 @@ STT 클라이언트 헬퍼 사용 예제
 """
 
 import os
+import asyncio
 from dotenv import load_dotenv
-from stt_client import STTClient
+from stt_client import STTClient, AsyncSTTClient
 
 # 환경변수 로드
 load_dotenv()
@@ -48,6 +49,33 @@ def thread_example():
 
 
 
+# asyncio 기반 STT 클라이언트 사용 예제
+async def async_example(concurrency=100):
+    """연결 풀을 사용하는 AsyncSTTClient 예제 (동시 요청 concurrency건)"""
+    print("=== asyncio 기반 STT 클라이언트 사용 예제 ===")
+    
+    with open(test_file_path, "rb") as f:
+        audio_data = f.read()
+    
+    async with AsyncSTTClient(
+        host=os.getenv("ASR_HOST"),
+        port=int(os.getenv("ASR_PORT")),
+        checkcode=int(os.getenv("ASR_CHECKCODE")),
+        pool_size=8,
+        timeout=30.0
+    ) as client:
+        results = await asyncio.gather(
+            *(client.recognize(audio_data) for _ in range(concurrency)),
+            return_exceptions=True
+        )
+    
+    errors = [r for r in results if isinstance(r, Exception)]
+    print(f"[INFO] 완료: {len(results) - len(errors)}건 성공, {len(errors)}건 실패")
+    if results and not isinstance(results[0], Exception):
+        print(results[0])
+    print("=== 요청 완료 ===")
+
+
 # 메인 실행 함수
 if __name__ == "__main__":
     """이 스크립트를 직접 실행할 경우"""
@@ -57,4 +85,7 @@ if __name__ == "__main__":
     # 1. 스레드 기반 예제 실행
     thread_example()
     
+    # 2. asyncio 기반 예제 실행
+    # asyncio.run(async_example())
+    
     
\ No newline at end of file
@@ -4,11 +4,12 @@
 # Description: STT App Server with torchaudio for offline multi-format decoding
 
 import asyncio
-import struct
 import sys
 import os
 import io
 import re
+import socket
+from multiprocessing import shared_memory
 
 import torch
 import numpy as np
@@ -16,6 +17,8 @@ import torchaudio
 
 from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
 
+from voice_protocol import asr as proto
+
 #---------------------------------------------------------
 # 1. 다양한 포맷을 처리하기 위한 디코딩 함수 (torchaudio)
 #---------------------------------------------------------
@@ -36,24 +39,63 @@ def decode_audio(audio_data: bytes, audio_format: str):
     samples = waveform.squeeze(0).cpu().numpy().astype(np.float32)
     return samples, sample_rate
 
+#---------------------------------------------------------
+# 1-1. 공유 메모리 PCM (같은 호스트 클라이언트용 zero-copy 입력)
+#---------------------------------------------------------
+# 샘플 포맷 코드 -> numpy dtype (리틀 엔디안, mono)
+PCM_SAMPLE_FORMATS = {1: np.dtype('<i2'), 2: np.dtype('<f4')}
+
+def open_shared_memory(name: str):
+    """클라이언트가 만든 공유 메모리 세그먼트에 attach (소유권은 클라이언트에 있음)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # attach만 한 세그먼트를 resource_tracker가 종료 시 unlink 하지 않도록 해제
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+def shared_pcm_view(shm, nbytes: int, sample_format: int):
+    """
+    공유 메모리 버퍼를 복사 없이 float32 파형으로 변환
+    - float32 PCM: 버퍼 view 그대로 사용 (zero copy)
+    - int16 PCM: float32 변환 1회
+    """
+    dtype = PCM_SAMPLE_FORMATS[sample_format]
+    if nbytes > shm.size or nbytes % dtype.itemsize != 0:
+        raise ValueError(f"잘못된 PCM 길이: {nbytes} (segment size={shm.size})")
+    samples = np.frombuffer(shm.buf, dtype=dtype, count=nbytes // dtype.itemsize)
+    if sample_format == 1:
+        return samples.astype(np.float32) / 32768.0
+    return samples
+
 #---------------------------------------------------------
 # 2. 비동기 서버 클래스
 #---------------------------------------------------------
 class AsrServer:
-    SUCCESS = 0
-    ERR_CHECKCODE_MISMATCH = 1
-    ERR_INVALID_DATA = 2
-    ERR_INVALID_REQUEST = 3
-    ERR_INVALID_PARAMETER = 4
-    ERR_INVALID_FORMAT = 5
-    ERR_UNKNOWN_CODE = 8
-    ERR_EXCEPTION = 9
-    ERR_TIMEOUT = 10
-
-    __VERSION__ = "1.0.1"
+    SUCCESS = proto.SUCCESS
+    ERR_CHECKCODE_MISMATCH = proto.ERR_CHECKCODE_MISMATCH
+    ERR_INVALID_DATA = proto.ERR_INVALID_DATA
+    ERR_INVALID_REQUEST = proto.ERR_INVALID_REQUEST
+    ERR_INVALID_PARAMETER = proto.ERR_INVALID_PARAMETER
+    ERR_INVALID_FORMAT = proto.ERR_INVALID_FORMAT
+    ERR_UNKNOWN_CODE = proto.ERR_UNKNOWN_CODE
+    ERR_EXCEPTION = proto.ERR_EXCEPTION
+    ERR_TIMEOUT = proto.ERR_TIMEOUT
+
+    # 요청 코드
+    REQ_STT = proto.REQ_STT
+    REQ_STT_SHM = proto.REQ_STT_SHM
+    REQ_PING = proto.REQ_PING
+
+    __VERSION__ = "1.1.0"
 
     def __init__(self, host=None, port=None, timeout=None, checkcode=None, stt_pipeline=None,
-                 min_text_length=5, no_voice_text="novoice"):
+                 min_text_length=5, no_voice_text="novoice", unix_path=None):
         print(f"torch.__version__={torch.__version__}")
         print(f"torchaudio.__version__={torchaudio.__version__}")
         self.host = host or os.getenv("ASR_HOST", "localhost")
@@ -63,6 +105,10 @@ class AsrServer:
         self.stt_pipeline = stt_pipeline
         self.min_text_length = min_text_length
         self.no_voice_text = no_voice_text
+        # 같은 호스트 클라이언트용 Unix domain socket 경로 (없으면 TCP만 사용)
+        self.unix_path = unix_path or os.getenv("ASR_UNIX_SOCKET") or None
+        # 연결 유지 중 다음 요청을 기다리는 최대 유휴 시간 (초)
+        self.keepalive_timeout = float(os.getenv("ASR_KEEPALIVE_TIMEOUT", 60))
 
     async def receive_data_with_timeout(self, reader, size, label):
         try:
@@ -95,59 +141,148 @@ class AsrServer:
             print(f"[ERROR] 음성 처리 중 오류 발생: {e}")
             return self.no_voice_text
 
+    @staticmethod
+    def is_unix_connection(writer):
+        sock = writer.get_extra_info('socket')
+        return sock is not None and sock.family == getattr(socket, "AF_UNIX", None)
+
+    async def send_status(self, writer, request_code, status):
+        writer.writelines(proto.status_frames(self.checkcode, request_code, status))
+        await writer.drain()
+
+    async def send_text(self, writer, request_code, text):
+        writer.writelines(proto.text_frames(self.checkcode, request_code, text))
+        await writer.drain()
+
+    async def handle_shm_request(self, reader, writer, request_code):
+        """공유 메모리 PCM 인식 요청 처리 (Unix domain socket 전용)"""
+        if not self.is_unix_connection(writer):
+            await self.send_status(writer, request_code, self.ERR_INVALID_REQUEST)
+            return False
+
+        # sample_format(1) + sample_rate(4) + nbytes(4) + name_len(1)
+        meta = await self.receive_data_with_timeout(reader, proto.SHM_META_SIZE, "SHM Meta")
+        if meta is None:
+            await self.send_status(writer, request_code, self.ERR_TIMEOUT)
+            return False
+        sample_format, sr, nbytes, name_len = proto.unpack_shm_meta(meta)
+        name_b = await self.receive_data_with_timeout(reader, name_len, "SHM Name")
+        if sample_format not in PCM_SAMPLE_FORMATS or sr <= 0 or nbytes <= 0 or not name_b:
+            await self.send_status(writer, request_code, self.ERR_INVALID_PARAMETER)
+            return False
+
+        try:
+            shm = open_shared_memory(name_b.decode('utf-8'))
+        except (FileNotFoundError, ValueError, OSError) as e:
+            print(f"[ERROR] 공유 메모리 attach 실패: {e}")
+            await self.send_status(writer, request_code, self.ERR_INVALID_DATA)
+            return True
+
+        waveform = None
+        try:
+            waveform = shared_pcm_view(shm, nbytes, sample_format)
+            print(f"[INFO] SHM PCM: sr={sr}, len={len(waveform)}")
+            text = await self.process_audio(waveform, sr)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            await self.send_status(writer, request_code, self.ERR_INVALID_DATA)
+            return True
+        finally:
+            # 공유 메모리를 참조하는 view를 먼저 해제해야 close 가능 (모든 경로에서)
+            waveform = None
+            try:
+                shm.close()
+            except BufferError as e:
+                print(f"[ERROR] 공유 메모리 해제 실패 (버퍼 참조가 남아 있음): {e}")
+
+        await self.send_text(writer, request_code, text)
+        return True
+
+    async def handle_stt_request(self, reader, writer, request_code):
+        """오디오 바이트 인식 요청 처리"""
+        fmt_byte = await self.receive_data_with_timeout(reader, 1, "Format Code")
+        if fmt_byte is None:
+            return False
+        fmt_code = fmt_byte[0]
+        if fmt_code not in proto.FORMAT_NAMES:
+            await self.send_status(writer, request_code, self.ERR_INVALID_FORMAT)
+            return False
+        fmt_str = proto.FORMAT_NAMES[fmt_code]
+        size_b = await self.receive_data_with_timeout(reader, proto.LENGTH.size, "Audio Size")
+        if size_b is None:
+            return False
+        size = proto.LENGTH.unpack(size_b)[0]
+        audio_bytes = await self.receive_data_with_timeout(reader, size, "Audio Data")
+        if audio_bytes is None:
+            return False
+
+        # decode with torchaudio
+        waveform, sr = decode_audio(audio_bytes, fmt_str)
+        print(f"[INFO] Decoded: sr={sr}, len={len(waveform)}")
+        text = await self.process_audio(waveform, sr)
+        await self.send_text(writer, request_code, text)
+        return True
+
+    async def handle_request(self, reader, writer, checkcode, request_code):
+        """요청 1건 처리. 연결을 계속 유지해도 되면 True 반환"""
+        if checkcode != self.checkcode:
+            await self.send_status(writer, request_code, self.ERR_CHECKCODE_MISMATCH)
+            return False
+
+        if request_code == self.REQ_PING:
+            await self.send_status(writer, request_code, self.SUCCESS)
+            return True
+
+        if request_code == self.REQ_STT_SHM:
+            return await self.handle_shm_request(reader, writer, request_code)
+
+        if request_code == self.REQ_STT:
+            return await self.handle_stt_request(reader, writer, request_code)
+
+        await self.send_status(writer, request_code, self.ERR_UNKNOWN_CODE)
+        return False
+
     async def handle_client(self, reader, writer):
         addr = writer.get_extra_info('peername')
         print(f"[INFO] 클라이언트 연결됨: {addr}")
         try:
-            header = await reader.readexactly(8)
-            checkcode, request_code = struct.unpack('!ii', header)
-            if checkcode != self.checkcode:
-                writer.write(struct.pack('!iiB', self.checkcode, request_code, self.ERR_CHECKCODE_MISMATCH))
-                await writer.drain()
-                return
-
-            if request_code == 99:
-                writer.write(struct.pack('!iiB', self.checkcode, request_code, self.SUCCESS))
-                await writer.drain()
-                return
-
-            if request_code == 0x01:
-                fmt_byte = await self.receive_data_with_timeout(reader, 1, "Format Code")
-                fmt_code = struct.unpack('!B', fmt_byte)[0]
-                fmt_map = {1:"wav",2:"mp3",3:"webm",4:"mp4"}
-                if fmt_code not in fmt_map:
-                    writer.write(struct.pack('!iiB', self.checkcode, request_code, self.ERR_INVALID_FORMAT))
-                    await writer.drain()
-                    return
-                fmt_str = fmt_map[fmt_code]
-                size_b = await self.receive_data_with_timeout(reader, 4, "Audio Size")
-                size = struct.unpack('!i', size_b)[0]
-                audio_bytes = await self.receive_data_with_timeout(reader, size, "Audio Data")
-
-                # decode with torchaudio
-                waveform, sr = decode_audio(audio_bytes, fmt_str)
-                print(f"[INFO] Decoded: sr={sr}, len={len(waveform)}")
-                text = await self.process_audio(waveform, sr)
-
-                resp = text.encode('utf-8')
-                header = struct.pack('!iiB', self.checkcode, request_code, self.SUCCESS)
-                writer.write(header + struct.pack('!i', len(resp)) + resp)
-                await writer.drain()
-                return
-
-            writer.write(struct.pack('!iiB', self.checkcode, request_code, self.ERR_UNKNOWN_CODE))
-            await writer.drain()
+            # 한 연결에서 여러 요청을 순차 처리 (persistent connection)
+            # 클라이언트가 연결을 닫거나 유휴 시간이 keepalive_timeout을 넘으면 종료
+            while True:
+                try:
+                    header = await asyncio.wait_for(reader.readexactly(proto.REQUEST_HEADER.size),
+                                                    timeout=self.keepalive_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                checkcode, request_code = proto.unpack_request(header)
+                if not await self.handle_request(reader, writer, checkcode, request_code):
+                    break
         except Exception as e:
             print(f"[ERROR] 처리 예외: {e}")
         finally:
             writer.close()
-            await writer.wait_closed()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
 
     async def run_server(self):
         server = await asyncio.start_server(self.handle_client, self.host, self.port)
         print(f"[INFO] 서버 시작: {self.host}:{self.port}, TIMEOUT={self.timeout}s, CHECKCODE={self.checkcode}")
-        async with server:
-            await server.serve_forever()
+        servers = [server]
+        if self.unix_path:
+            # 이전 실행에서 남은 소켓 파일 정리
+            if os.path.exists(self.unix_path):
+                os.remove(self.unix_path)
+            servers.append(await asyncio.start_unix_server(self.handle_client, path=self.unix_path))
+            print(f"[INFO] Unix 소켓 대기: {self.unix_path}")
+        try:
+            await asyncio.gather(*(srv.serve_forever() for srv in servers))
+        finally:
+            for srv in servers:
+                srv.close()
+            if self.unix_path and os.path.exists(self.unix_path):
+                os.remove(self.unix_path)
 
 if __name__ == "__main__":
     device = "cuda:0" if torch.cuda.is_available() else "cpu"
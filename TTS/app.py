@@ -9,6 +9,7 @@ import argparse
 import asyncio
 from dotenv import load_dotenv
 from server import TTSServer
+from tts_cache import AudioCache
 
 import torch
 import warnings
@@ -37,13 +38,19 @@ def main():
 
     print(f"[INFO] TTS 서버 설정 - 호스트: {host}, 포트: {port}, 언어: {language}, 디바이스: {device}")
     
+    # 합성 오디오 캐시 (TTS_CACHE_MEMORY_MB / TTS_CACHE_DIR / TTS_CACHE_DISK_MB)
+    cache = AudioCache.from_env()
+    if cache is not None:
+        print(f"[INFO] 오디오 캐시 사용 - {cache.stats()}")
+    
     # 4) 서버 실행
     try:
         server = TTSServer(
             host=host,
             port=port,
             language=language,
-            device=device
+            device=device,
+            cache=cache
         )
         asyncio.run(server.run_server())
     except KeyboardInterrupt:
@@ -0,0 +1,302 @@
+# filename: audio_codec.py
+# author: gbox3d
+# created: 2025-10-19
+# description: 메모리 내 오디오 인코딩 유틸 (float 파형 -> WAV / MP3 / Ogg Opus 바이트, 임시 파일 없음)
+
+import io
+import os
+import math
+import struct
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+# 프로세스 내 인코더 (없으면 pydub + ffmpeg 서브프로세스로 대체)
+try:
+    import lameenc
+except ImportError:
+    lameenc = None
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+try:
+    from scipy import signal as scipy_signal
+except ImportError:
+    scipy_signal = None
+
+DEFAULT_MP3_BITRATE = int(os.getenv("TTS_MP3_BITRATE", 192))     # kbps
+DEFAULT_OPUS_BITRATE = int(os.getenv("TTS_OPUS_BITRATE", 64))    # kbps
+# libopus가 지원하는 입력 샘플레이트
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+# 출력 샘플레이트로 허용하는 값 (MP3 표준 레이트 기준)
+SUPPORTED_SAMPLE_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)
+# 폴리페이즈 필터: 한쪽 탭 수 = 10 * max(up, down), Kaiser beta 5.0 (scipy.signal.resample_poly 기본값과 동일)
+_RESAMPLE_HALF_ZEROS = 10
+_RESAMPLE_BETA = 5.0
+# numpy 경로에서 한 번에 계산할 출력 샘플 수 (메모리 제한)
+_RESAMPLE_BLOCK = 16384
+
+# 스레드별 재사용 버퍼 (요청마다 큰 배열을 새로 할당하지 않도록)
+_local = threading.local()
+_MIN_BUFFER = 1 << 16
+
+
+def _scratch(name, size, dtype):
+    """스레드별 재사용 numpy 버퍼 (필요할 때만 확장)"""
+    buf = getattr(_local, name, None)
+    if buf is None or buf.size < size:
+        buf = np.empty(max(size, _MIN_BUFFER), dtype=dtype)
+        setattr(_local, name, buf)
+    return buf[:size]
+
+
+def float_to_pcm16(samples, out=None):
+    """
+    float 파형(-1.0 ~ 1.0)을 int16 PCM으로 변환
+    out을 주면 그 배열에 바로 기록하고, 없으면 스레드별 재사용 버퍼를 반환합니다. (같은 스레드의 다음 호출 전까지만 유효)
+    """
+    samples = np.asarray(samples).reshape(-1)
+    n = samples.size
+    tmp = _scratch("f32", n, np.float32)
+    np.multiply(samples, 32767.0, out=tmp, casting='unsafe')
+    np.clip(tmp, -32768.0, 32767.0, out=tmp)
+    np.rint(tmp, out=tmp)
+    pcm = _scratch("i16", n, np.int16) if out is None else out
+    np.copyto(pcm, tmp, casting='unsafe')
+    return pcm
+
+
+def wav_header(num_frames, sample_rate, channels=1, bits_per_sample=16):
+    """PCM WAV(RIFF) 44바이트 헤더"""
+    block_align = channels * bits_per_sample // 8
+    data_size = num_frames * block_align
+    return struct.pack('<4sI4s4sIHHIIHH4sI',
+                       b'RIFF', 36 + data_size, b'WAVE',
+                       b'fmt ', 16, 1, channels, sample_rate,
+                       sample_rate * block_align, block_align, bits_per_sample,
+                       b'data', data_size)
+
+
+def encode_wav(samples, sample_rate):
+    """
+    float 파형을 16-bit mono WAV bytes로 인코딩
+    결과는 캐시에 저장되어 여러 요청이 공유하므로 불변 bytes로 반환 (PCM 변환은 스레드별 버퍼, 헤더와 합칠 때 1회 복사)
+    """
+    pcm = float_to_pcm16(samples)
+    return b''.join((wav_header(pcm.size, sample_rate), pcm))
+
+
+@lru_cache(maxsize=32)
+def resample_filter(up, down):
+    """(up, down) 비율별 저역통과 FIR 탭 (Kaiser 윈도 sinc, DC 이득 1) - 레이트 쌍마다 한 번만 설계"""
+    max_rate = max(up, down)
+    half_len = _RESAMPLE_HALF_ZEROS * max_rate
+    n = np.arange(-half_len, half_len + 1, dtype=np.float64)
+    taps = np.sinc(n / max_rate) * np.kaiser(2 * half_len + 1, _RESAMPLE_BETA)
+    taps /= taps.sum()
+    taps.setflags(write=False)
+    return taps
+
+
+@lru_cache(maxsize=32)
+def _polyphase_bank(up, down):
+    """탭을 up개의 위상으로 분해한 (up, K) 행렬 (numpy 경로용), 이득 보정(x up) 포함"""
+    taps = resample_filter(up, down)
+    k = -(-taps.size // up)
+    padded = np.zeros(k * up, dtype=np.float64)
+    padded[:taps.size] = taps * up
+    bank = padded.reshape(k, up).T.astype(np.float32)
+    bank.setflags(write=False)
+    return bank
+
+
+def _resample_poly_numpy(x, up, down):
+    """폴리페이즈 리샘플링 (scipy 없이): y[n] = sum_i bank[q][i] * x[base - i], t = n*down + delay"""
+    taps = resample_filter(up, down)
+    bank = _polyphase_bank(up, down)
+    k = bank.shape[1]
+    delay = (taps.size - 1) // 2             # 필터 지연 보정 (출력 정렬)
+    n_out = -(-x.size * up // down)
+    # 앞쪽 k-1, 뒤쪽 k개의 0 패딩으로 경계 처리
+    xp = np.concatenate([np.zeros(k - 1, dtype=np.float32), x, np.zeros(k + 1, dtype=np.float32)])
+    out = np.empty(n_out, dtype=np.float32)
+    offsets = np.arange(k)
+    for start in range(0, n_out, _RESAMPLE_BLOCK):
+        n = np.arange(start, min(n_out, start + _RESAMPLE_BLOCK), dtype=np.int64)
+        t = n * down + delay
+        q = t % up
+        base = t // up + (k - 1)
+        idx = np.clip(base[:, None] - offsets[None, :], 0, xp.size - 1)
+        out[start:start + n.size] = np.einsum('ij,ij->i', xp[idx], bank[q])
+    return out
+
+
+def resample(samples, src_rate, dst_rate):
+    """
+    폴리페이즈 리샘플링 (float 파형)
+    레이트 쌍별 필터는 캐시되며, scipy가 있으면 scipy.signal.resample_poly에 캐시된 탭을 넘겨 사용합니다.
+    """
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    if src_rate == dst_rate or samples.size == 0:
+        return samples
+    g = math.gcd(int(src_rate), int(dst_rate))
+    up, down = int(dst_rate) // g, int(src_rate) // g
+    if scipy_signal is not None:
+        return scipy_signal.resample_poly(samples, up, down, window=resample_filter(up, down)).astype(np.float32)
+    return _resample_poly_numpy(samples, up, down)
+
+
+def _export_with_ffmpeg(samples, sample_rate, audio_format, bitrate, **export_args):
+    """대체 경로: pydub(ffmpeg 서브프로세스)로 인코딩"""
+    from pydub import AudioSegment
+    pcm = float_to_pcm16(samples)
+    segment = AudioSegment(pcm.tobytes(), frame_rate=sample_rate, sample_width=2, channels=1)
+    out_buf = io.BytesIO()
+    segment.export(out_buf, format=audio_format, bitrate=f"{bitrate}k", **export_args)
+    return out_buf.getvalue()
+
+
+def wav_to_mp3_ffmpeg(wav_bytes, bitrate=None):
+    """WAV 바이트 → MP3 바이트 (pydub/ffmpeg 경로)"""
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(io.BytesIO(wav_bytes), format="wav")
+    out_buf = io.BytesIO()
+    audio.export(out_buf, format="mp3", bitrate=f"{bitrate or DEFAULT_MP3_BITRATE}k")
+    return out_buf.getvalue()
+
+
+def encode_mp3(samples, sample_rate, bitrate=None):
+    """float 파형 → MP3 바이트 (lameenc 사용, 없으면 ffmpeg 대체 경로)"""
+    bitrate = bitrate or DEFAULT_MP3_BITRATE
+    if lameenc is None:
+        return _export_with_ffmpeg(samples, sample_rate, "mp3", bitrate)
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(bitrate)
+    encoder.set_in_sample_rate(sample_rate)
+    encoder.set_channels(1)
+    encoder.set_quality(2)  # 2: 고품질, 7: 고속
+    pcm = float_to_pcm16(samples)
+    return bytes(encoder.encode(pcm.tobytes()) + encoder.flush())
+
+
+def _opus_compression_level(bitrate):
+    """libsndfile Opus 압축 레벨(0~1)은 256kbps ~ 6kbps 구간에 선형 대응"""
+    return float(min(1.0, max(0.0, (256 - bitrate) / 250.0)))
+
+
+def encode_opus(samples, sample_rate, bitrate=None):
+    """
+    float 파형 → Ogg Opus 바이트 (soundfile/libsndfile 사용, 없으면 ffmpeg 대체 경로)
+    Opus 미지원 샘플레이트(예: 44100)는 48000으로 변환 후 인코딩합니다.
+    """
+    bitrate = bitrate or DEFAULT_OPUS_BITRATE
+    if sample_rate not in OPUS_SAMPLE_RATES:
+        samples = resample(samples, sample_rate, 48000)
+        sample_rate = 48000
+    if soundfile is None or 'OPUS' not in soundfile.available_subtypes('OGG'):
+        return _export_with_ffmpeg(samples, sample_rate, "ogg", bitrate, codec="libopus")
+    pcm = float_to_pcm16(samples)
+    out_buf = io.BytesIO()
+    try:
+        soundfile.write(out_buf, pcm, sample_rate, format='OGG', subtype='OPUS',
+                        compression_level=_opus_compression_level(bitrate))
+    except TypeError:
+        # soundfile < 0.13: 압축 레벨 지정 불가 (libsndfile 기본 비트레이트)
+        out_buf = io.BytesIO()
+        soundfile.write(out_buf, pcm, sample_rate, format='OGG', subtype='OPUS')
+    return out_buf.getvalue()
+
+
+def wav_stream_header(sample_rate, channels=1, bits_per_sample=16):
+    """길이를 모르는 스트리밍용 WAV 헤더 (RIFF/data 크기 0xFFFFFFFF)"""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack('<4sI4s4sIHHIIHH4sI',
+                       b'RIFF', 0xFFFFFFFF, b'WAVE',
+                       b'fmt ', 16, 1, channels, sample_rate,
+                       sample_rate * block_align, block_align, bits_per_sample,
+                       b'data', 0xFFFFFFFF)
+
+
+class StreamEncoder:
+    """
+    청크 단위 증분 인코더 (start → feed* → close 순서로 호출, 각 호출은 바로 보낼 바이트 반환)
+    pcm: 16-bit LE mono raw / wav: 스트리밍 헤더 + PCM / mp3: lameenc 연속 인코딩 / ogg: Ogg Opus 페이지
+    """
+
+    MEDIA_TYPES = {
+        "pcm": "application/octet-stream",
+        "wav": "audio/wav",
+        "mp3": "audio/mpeg",
+        "ogg": "audio/ogg",
+    }
+
+    def __init__(self, audio_format, sample_rate, bitrate=None):
+        if audio_format not in self.MEDIA_TYPES:
+            raise ValueError(f"지원하지 않는 스트리밍 포맷: {audio_format}")
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate
+        self._mp3 = None
+        self._ogg = None
+        self._ogg_buf = None
+        self._ogg_sent = 0
+        self._ogg_rate = sample_rate if sample_rate in OPUS_SAMPLE_RATES else 48000
+
+    @property
+    def media_type(self):
+        return self.MEDIA_TYPES[self.audio_format]
+
+    def start(self):
+        if self.audio_format == "wav":
+            return wav_stream_header(self.sample_rate)
+        if self.audio_format == "mp3" and lameenc is not None:
+            self._mp3 = lameenc.Encoder()
+            self._mp3.set_bit_rate(self.bitrate or DEFAULT_MP3_BITRATE)
+            self._mp3.set_in_sample_rate(self.sample_rate)
+            self._mp3.set_channels(1)
+            self._mp3.set_quality(2)
+        if self.audio_format == "ogg":
+            if soundfile is None or 'OPUS' not in soundfile.available_subtypes('OGG'):
+                raise ValueError("Ogg Opus 스트리밍에는 libsndfile(Opus 지원) soundfile이 필요합니다.")
+            self._ogg_buf = io.BytesIO()
+            try:
+                self._ogg = soundfile.SoundFile(
+                    self._ogg_buf, 'w', samplerate=self._ogg_rate, channels=1, format='OGG', subtype='OPUS',
+                    compression_level=_opus_compression_level(self.bitrate or DEFAULT_OPUS_BITRATE))
+            except TypeError:
+                self._ogg_buf = io.BytesIO()
+                self._ogg = soundfile.SoundFile(self._ogg_buf, 'w', samplerate=self._ogg_rate, channels=1,
+                                                format='OGG', subtype='OPUS')
+        return b''
+
+    def _drain_ogg(self):
+        with self._ogg_buf.getbuffer() as view:
+            data = view[self._ogg_sent:].tobytes()
+        self._ogg_sent += len(data)
+        return data
+
+    def feed(self, samples):
+        if self.audio_format in ("pcm", "wav"):
+            return float_to_pcm16(samples).tobytes()
+        if self.audio_format == "mp3":
+            if self._mp3 is None:
+                return encode_mp3(samples, self.sample_rate, self.bitrate)
+            return bytes(self._mp3.encode(float_to_pcm16(samples).tobytes()))
+        self._ogg.write(float_to_pcm16(resample(samples, self.sample_rate, self._ogg_rate)))
+        self._ogg.flush()
+        return self._drain_ogg()
+
+    def close(self):
+        """남은 바이트 반환 (두 번째 호출부터는 b'')"""
+        if self._mp3 is not None:
+            mp3, self._mp3 = self._mp3, None
+            return bytes(mp3.flush())
+        if self._ogg is not None:
+            ogg, self._ogg = self._ogg, None
+            ogg.close()
+            return self._drain_ogg()
+        return b''
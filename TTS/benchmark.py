@@ -0,0 +1,327 @@
+# filename: benchmark.py
+# author: gbox3d
+# created: 2025-10-19
+# description: TTS 벤치마크 (고정 한국어 코퍼스로 RTF / TTFB / p50·p95·p99 / 메모리 측정, JSON 저장)
+#
+# 모드
+#   inprocess : 이 프로세스에서 TTSServer를 만들어 직접 합성 (torch 스레드 수별 측정 가능)
+#   tcp       : 실행 중인 TTS 서버에 스트리밍 요청(FLAGS=STREAM)으로 측정
+#
+# 사용 예:
+#   python benchmark.py --mode inprocess --device cpu --threads 1,2,4 --formats wav,mp3 --concurrency 1,4 --out bench_tts.json
+#   python benchmark.py --mode inprocess --backends melo,onnx --formats wav --concurrency 1   # MeloTTS eager vs ONNX RTF 비교
+#   python benchmark.py --mode tcp --host 127.0.0.1 --port 2501 --concurrency 1,4,8 --out bench_tts_tcp.json
+
+import os
+import sys
+import json
+import time
+import struct
+import asyncio
+import argparse
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from voice_protocol import tts as proto
+
+# 고정 코퍼스 (길이 구간별)
+CORPUS = {
+    "short": [
+        "안녕하세요.",
+        "잠시만 기다려 주세요.",
+        "네, 알겠습니다.",
+        "다시 말씀해 주세요.",
+    ],
+    "medium": [
+        "오늘 서울의 날씨는 맑고 낮 최고 기온은 이십삼 도로 예상됩니다.",
+        "요청하신 회의실 예약이 완료되었습니다. 오후 세 시에 삼층 회의실로 오시면 됩니다.",
+        "주문하신 상품은 내일 오전 중에 도착할 예정이며, 배송 조회는 앱에서 가능합니다.",
+    ],
+    "long": [
+        "음성 합성 서버의 성능을 측정하기 위한 긴 문단입니다. "
+        "여러 문장으로 이루어진 텍스트를 입력하면 서버는 문장 단위로 나누어 합성합니다. "
+        "첫 번째 오디오가 도착하기까지의 시간과 전체 합성 시간을 함께 기록합니다. "
+        "이 결과를 바탕으로 서버 한 대가 감당할 수 있는 동시 요청 수를 산정할 수 있습니다.",
+        "고객님, 문의하신 내용에 대해 안내해 드리겠습니다. "
+        "현재 요금제는 매월 오십 기가바이트의 데이터를 제공하며, 초과 시 속도가 제한됩니다. "
+        "다음 달부터 변경을 원하시면 이번 달 말일까지 신청해 주시기 바랍니다. "
+        "추가로 궁금하신 점이 있으시면 언제든지 말씀해 주세요.",
+    ],
+}
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def rss_mb():
+    """현재 RSS(MB), /proc 미지원 시 최대 RSS"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+    return None
+
+
+def summarize(samples, audio_seconds, wall):
+    """samples: [(ttfb, latency), ...]"""
+    ttfbs = [s[0] for s in samples]
+    latencies = [s[1] for s in samples]
+    return {
+        "requests": len(samples),
+        "audio_seconds": audio_seconds,
+        "wall_seconds": wall,
+        "rtf": wall / audio_seconds if audio_seconds else 0.0,
+        "throughput_rps": len(samples) / wall if wall else 0.0,
+        "ttfb_p50": percentile(ttfbs, 50),
+        "ttfb_p95": percentile(ttfbs, 95),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+    }
+
+
+# ──────────────────────────────────────────────
+# in-process
+# ──────────────────────────────────────────────
+def inprocess_request(server, text, audio_format):
+    """문장 단위로 합성 (TCP 스트리밍과 같은 경로) → (ttfb, latency)"""
+    start = time.perf_counter()
+    ttfb = None
+    for segment in server.segmenter.split(text):
+        server.render_audio(segment, audio_format)
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+    return ttfb or 0.0, time.perf_counter() - start
+
+
+def set_threads(server, threads):
+    """백엔드별 추론 스레드 수 설정 (melo: torch intra-op, onnx: 세션 재생성)"""
+    if server.engines.backend == 'onnx':
+        server.engine.set_threads(threads)
+    else:
+        import torch
+        torch.set_num_threads(threads)
+
+
+def run_inprocess(args, lengths, formats, concurrencies):
+    if not args.cache:
+        # 반복 측정이 캐시 적중으로 왜곡되지 않도록 front-end 특징 캐시 비활성
+        os.environ["TTS_FEATURE_CACHE_MB"] = "0"
+    results, meta = [], {}
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        rows, meta[backend] = run_backend(args, backend, lengths, formats, concurrencies)
+        results.extend(rows)
+    return results, meta
+
+
+def run_backend(args, backend, lengths, formats, concurrencies):
+    os.environ["TTS_BACKEND"] = backend
+    from server import TTSServer
+
+    load_start = time.perf_counter()
+    server = TTSServer(language=args.language, device=args.device, cache=None)
+    load_time = time.perf_counter() - load_start
+    rss_loaded = rss_mb()
+    print(f"[INFO] [{backend}] 모델 로드 {load_time:.2f}s, RSS {rss_loaded:.0f} MB")
+
+    # 텍스트별 오디오 길이 (포맷 무관, 워밍업 겸용)
+    durations = {}
+    for length in lengths:
+        for text in CORPUS[length]:
+            durations[text] = len(server.synthesize(text)) / server.sample_rate
+
+    results = []
+    for threads in [int(t) for t in args.threads.split(",") if t.strip()]:
+        set_threads(server, threads)
+        for length in lengths:
+            texts = CORPUS[length]
+            for audio_format in formats:
+                for concurrency in concurrencies:
+                    jobs = [t for _ in range(args.repeat) for t in texts] * concurrency
+                    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                        wall_start = time.perf_counter()
+                        samples = list(pool.map(
+                            lambda t: inprocess_request(server, t, audio_format), jobs))
+                        wall = time.perf_counter() - wall_start
+                    row = {
+                        "mode": "inprocess",
+                        "backend": backend,
+                        "threads": threads,
+                        "length": length,
+                        "format": audio_format,
+                        "concurrency": concurrency,
+                        **summarize(samples, sum(durations[t] for t in jobs), wall),
+                        "rss_mb": rss_mb(),
+                    }
+                    print_row(row)
+                    results.append(row)
+    return results, {"load_time": load_time, "rss_loaded_mb": rss_loaded}
+
+
+# ──────────────────────────────────────────────
+# TCP
+# ──────────────────────────────────────────────
+async def tcp_request(host, port, text, format_code):
+    """스트리밍 요청 1회 → (ttfb, latency, pcm 또는 오디오 바이트 수)"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.writelines(proto.request_frames(proto.REQ_TTS, text, fmt=format_code, flags=proto.FLAG_STREAM))
+        await writer.drain()
+        ttfb = None
+        total = 0
+        while True:
+            resp = await proto.read_header(reader)
+            if resp.code != proto.SUCCESS:
+                raise RuntimeError(f"서버 오류 코드 {resp.code}")
+            if resp.flags & proto.FLAG_END:
+                break
+            size = resp.payload_size
+            await reader.readexactly(size)
+            total += size
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+        return ttfb or 0.0, time.perf_counter() - start, total
+    finally:
+        writer.close()
+
+
+async def tcp_duration(host, port, text):
+    """WAV로 한 번 받아 오디오 길이 계산 (WAV 청크마다 44바이트 헤더, 16-bit mono)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.writelines(proto.request_frames(proto.REQ_TTS, text, fmt=proto.FORMAT_CODES["wav"]))
+        await writer.drain()
+        resp, wav = await proto.read_frame(reader)
+        if resp.code != proto.SUCCESS:
+            raise RuntimeError(f"서버 오류 코드 {resp.code}")
+        sample_rate = struct.unpack_from("<I", wav, 24)[0]
+        return (len(wav) - 44) / 2 / sample_rate
+    finally:
+        writer.close()
+
+
+async def run_tcp_case(args, texts, format_code, concurrency):
+    queue = asyncio.Queue()
+    for _ in range(args.repeat * concurrency):
+        for text in texts:
+            queue.put_nowait(text)
+    samples, errors = [], 0
+    done_texts = []
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            text = queue.get_nowait()
+            try:
+                ttfb, latency, _ = await tcp_request(args.host, args.port, text, format_code)
+                samples.append((ttfb, latency))
+                done_texts.append(text)
+            except Exception as e:
+                errors += 1
+                print(f"[WARNING] 요청 실패: {e}")
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return samples, done_texts, errors, time.perf_counter() - wall_start
+
+
+async def run_tcp(args, lengths, formats, concurrencies):
+    durations = {}
+    for length in lengths:
+        for text in CORPUS[length]:
+            durations[text] = await tcp_duration(args.host, args.port, text)
+    results = []
+    for length in lengths:
+        for audio_format in formats:
+            for concurrency in concurrencies:
+                samples, done, errors, wall = await run_tcp_case(
+                    args, CORPUS[length], proto.FORMAT_CODES[audio_format], concurrency)
+                row = {
+                    "mode": "tcp",
+                    "backend": None,
+                    "threads": None,
+                    "length": length,
+                    "format": audio_format,
+                    "concurrency": concurrency,
+                    **summarize(samples, sum(durations[t] for t in done), wall),
+                    "errors": errors,
+                }
+                print_row(row)
+                results.append(row)
+    return results, {"host": args.host, "port": args.port}
+
+
+def print_row(r):
+    print(f"{r['mode']:<9} {r['backend'] or '-':<5} thr={str(r['threads']):>4} {r['length']:<6} {r['format']:<4} c={r['concurrency']:<3} "
+          f"RTF {r['rtf']:.3f}  TTFB p50 {r['ttfb_p50'] * 1000:7.1f}ms  "
+          f"p50 {r['latency_p50']:.3f}s p95 {r['latency_p95']:.3f}s p99 {r['latency_p99']:.3f}s"
+          + (f"  RSS {r['rss_mb']:.0f}MB" if r.get('rss_mb') else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS 벤치마크")
+    parser.add_argument('--mode', choices=['inprocess', 'tcp'], default='inprocess')
+    parser.add_argument('--language', default='KR')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2501)
+    parser.add_argument('--lengths', default='short,medium,long', help="코퍼스 길이 구간 (콤마 구분)")
+    parser.add_argument('--formats', default='wav,mp3', help=f"오디오 포맷 ({','.join(proto.FORMAT_CODES)})")
+    parser.add_argument('--concurrency', default='1,4')
+    parser.add_argument('--threads', default=str(os.cpu_count() or 1), help="inprocess: 추론 스레드 수 목록")
+    parser.add_argument('--backends', default='melo', help="inprocess: 비교할 합성 백엔드 (melo,onnx)")
+    parser.add_argument('--repeat', type=int, default=2)
+    parser.add_argument('--cache', action='store_true', help="inprocess: front-end 특징 캐시 사용")
+    parser.add_argument('--out', default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    lengths = [l.strip() for l in args.lengths.split(",") if l.strip() in CORPUS]
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in proto.FORMAT_CODES]
+    if unknown or not formats:
+        parser.error(f"--formats 값이 잘못됨: {args.formats!r} (사용 가능: {','.join(proto.FORMAT_CODES)})")
+    concurrencies = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    if args.mode == 'inprocess':
+        results, meta = run_inprocess(args, lengths, formats, concurrencies)
+    else:
+        results, meta = asyncio.run(run_tcp(args, lengths, formats, concurrencies))
+
+    report = {
+        "meta": {
+            "mode": args.mode,
+            "language": args.language,
+            "device": args.device if args.mode == 'inprocess' else None,
+            "repeat": args.repeat,
+            "cpu_count": os.cpu_count(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "timestamp": int(time.time()),
+            **meta,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# filename: engine_registry.py
+# author: gbox3d
+# created: 2025-10-19
+# description: 언어별 합성 엔진 레지스트리 (MeloTTS 또는 ONNX VITS, 첫 요청 시 지연 로드, 메모리 예산 초과 시 LRU 해제)
+
+import gc
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import torch
+from melo.api import TTS
+
+from melo_engine import MeloEngine, BatchScheduler
+
+# 합성 백엔드 (TTS_BACKEND)
+BACKENDS = ('melo', 'onnx')
+
+# 요청 헤더 byte 30 (LANG) 코드 → MeloTTS 언어 (0은 서버 기본 언어)
+LANGUAGE_CODES = {1: 'KR', 2: 'EN', 3: 'JP', 4: 'ZH', 5: 'ES', 6: 'FR'}
+
+
+class VoiceError(ValueError):
+    """지원하지 않는 언어/화자 요청 (서버는 ERR_INVALID_PARAMETER로 응답)"""
+
+
+def model_nbytes(tts):
+    """엔진 메모리 추정치 (모델 파라미터 + 버퍼 바이트)"""
+    model = tts.model
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class EngineSlot:
+    """로드된 언어 엔진 하나 (MeloTTS + 배치 엔진 또는 ONNX 엔진 + 사용 중 카운트)"""
+
+    def __init__(self, language, tts, engine, batcher, nbytes, pinned=False):
+        self.language = language
+        self.tts = tts
+        self.engine = engine
+        self.batcher = batcher
+        self.nbytes = nbytes
+        self.pinned = pinned
+        self.sample_rate = engine.sample_rate
+        self.n_speakers = engine.n_speakers
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        self.requests = 0
+
+    def synthesize(self, text, spk_id=0, speed=1.0):
+        if not 0 <= spk_id < self.n_speakers:
+            raise VoiceError(f"{self.language} 화자 ID 범위 초과: {spk_id} (화자 {self.n_speakers}명)")
+        if self.batcher is not None:
+            return self.batcher.synthesize(text, spk_id, speed)
+        return self.engine.synthesize(text, spk_id, speed)
+
+    def release(self):
+        if self.batcher is not None:
+            self.batcher.close()
+        self.tts = self.engine = self.batcher = None
+
+
+class EngineRegistry:
+    """
+    언어 → EngineSlot
+    기본 언어 엔진은 시작 시 로드되어 해제되지 않으며, 나머지는 첫 요청 때 로드됩니다.
+    총 메모리 추정치가 memory_budget을 넘으면 사용 중이 아닌 엔진부터 오래 쓰지 않은 순으로 해제합니다.
+    """
+
+    def __init__(self, device, default_language, languages=None, memory_budget=0, backend='melo'):
+        if backend not in BACKENDS:
+            raise ValueError(f"지원하지 않는 TTS 백엔드: {backend} (가능: {', '.join(BACKENDS)})")
+        self.device = device
+        self.backend = backend
+        self.default_language = default_language
+        self.languages = set(languages or LANGUAGE_CODES.values()) | {default_language}
+        self.memory_budget = memory_budget
+        self.loads = 0
+        self.evictions = 0
+        self._slots = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._slots[default_language] = self._load(default_language, pinned=True)
+
+    @classmethod
+    def from_env(cls, device, default_language):
+        """TTS_LANGUAGES (허용 언어, 콤마 구분, 기본: 전체) / TTS_ENGINE_MEMORY_MB (0이면 제한 없음) / TTS_BACKEND (melo, onnx)"""
+        languages = [l.strip().upper() for l in os.getenv("TTS_LANGUAGES", "").split(",") if l.strip()]
+        budget_mb = float(os.getenv("TTS_ENGINE_MEMORY_MB", 0))
+        backend = os.getenv("TTS_BACKEND", "melo").lower()
+        return cls(device, default_language, languages or None, int(budget_mb * 1024 * 1024), backend)
+
+    @property
+    def default(self):
+        return self._slots[self.default_language]
+
+    def resolve(self, lang_code):
+        """헤더 LANG 코드 → 언어 문자열 (0이면 기본 언어)"""
+        if lang_code == 0:
+            return self.default_language
+        language = LANGUAGE_CODES.get(lang_code)
+        if language is None or language not in self.languages:
+            raise VoiceError(f"지원하지 않는 언어 코드: {lang_code}")
+        return language
+
+    def _load(self, language, pinned=False):
+        start = time.perf_counter()
+        if self.backend == 'onnx':
+            # ONNX Runtime CPU 세션 (배치 스케줄러 없이 워커 스레드에서 세션 공유)
+            from onnx_engine import OnnxVitsEngine
+            engine = OnnxVitsEngine.from_env(language)
+            slot = EngineSlot(language, None, engine, None, engine.nbytes, pinned)
+        else:
+            tts = TTS(language=language, device=self.device)
+            engine = MeloEngine.from_env(tts)
+            slot = EngineSlot(language, tts, engine, BatchScheduler.from_env(engine), model_nbytes(tts), pinned)
+        self.loads += 1
+        print(f"[INFO] TTS 엔진 로드: {language} [{self.backend}] ({slot.nbytes / 1024 / 1024:.0f} MB, "
+              f"{time.perf_counter() - start:.1f}s)")
+        return slot
+
+    def _evict_for(self, incoming):
+        """incoming 바이트를 더 올릴 수 있도록 LRU 순으로 슬롯을 빼서 반환 (lock 보유 상태에서 호출, 해제는 _release_evicted)"""
+        if self.memory_budget <= 0:
+            return []
+        used = sum(s.nbytes for s in self._slots.values())
+        candidates = sorted((s for s in self._slots.values() if not s.pinned and s.in_use == 0),
+                            key=lambda s: s.last_used)
+        evicted = []
+        for slot in candidates:
+            if used + incoming <= self.memory_budget:
+                break
+            del self._slots[slot.language]
+            used -= slot.nbytes
+            evicted.append(slot)
+        self.evictions += len(evicted)
+        return evicted
+
+    @staticmethod
+    def _release_evicted(evicted):
+        """뺀 슬롯의 모델 해제 (lock 밖에서 호출, GC/CUDA 캐시 정리 동안 다른 언어 조회를 막지 않음)"""
+        if not evicted:
+            return
+        for slot in evicted:
+            slot.release()
+            print(f"[INFO] TTS 엔진 해제 (LRU): {slot.language}")
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _acquire(self, language):
+        if language not in self.languages:
+            raise VoiceError(f"지원하지 않는 언어: {language}")
+        with self._lock:
+            slot = self._slots.get(language)
+            if slot is not None:
+                slot.in_use += 1
+                return slot
+            load_lock = self._load_locks.setdefault(language, threading.Lock())
+        # 같은 언어의 동시 첫 요청은 한 번만 로드
+        with load_lock:
+            with self._lock:
+                slot = self._slots.get(language)
+                if slot is not None:
+                    slot.in_use += 1
+                    return slot
+                # 추정치가 없으므로 기본 엔진 크기로 자리 확보
+                evicted = self._evict_for(self.default.nbytes)
+            self._release_evicted(evicted)
+            slot = self._load(language)
+            with self._lock:
+                self._slots[language] = slot
+                slot.in_use += 1
+                evicted = self._evict_for(0)
+            self._release_evicted(evicted)
+            return slot
+
+    @contextmanager
+    def use(self, language=None):
+        """with registry.use("EN") as slot: ... (사용 중인 엔진은 해제되지 않음)"""
+        slot = self._acquire(language or self.default_language)
+        try:
+            yield slot
+        finally:
+            with self._lock:
+                slot.in_use -= 1
+                slot.last_used = time.monotonic()
+                slot.requests += 1
+
+    def stats(self):
+        with self._lock:
+            slots = list(self._slots.values())
+        return {
+            "backend": self.backend,
+            "default": self.default_language,
+            "languages": sorted(self.languages),
+            "memory_budget": self.memory_budget,
+            "memory_used": sum(s.nbytes for s in slots),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "loaded": {
+                s.language: {"bytes": s.nbytes, "in_use": s.in_use, "requests": s.requests,
+                             "speakers": s.n_speakers, "pinned": s.pinned}
+                for s in slots
+            },
+        }
@@ -0,0 +1,92 @@
+# 순차 합성(tts_to_file)과 배치 합성(MeloEngine / BatchScheduler)의 처리량 비교 벤치마크
+# 실행: cd TTS && python example/bench_batch.py --device cpu --counts 1,2,4,8,16 --batch 4 --repeat 3
+#%%
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from melo.api import TTS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from melo_engine import MeloEngine, BatchScheduler
+
+SENTENCES = [
+    "안녕하세요, 무엇을 도와드릴까요?",
+    "오늘 서울의 날씨는 맑고 기온은 이십삼 도입니다.",
+    "잠시만 기다려 주세요.",
+    "요청하신 내용을 확인하고 있습니다.",
+    "다시 한 번 말씀해 주시겠어요?",
+    "회의는 오후 세 시에 시작됩니다.",
+    "감사합니다. 좋은 하루 되세요.",
+    "주문하신 상품은 내일 도착할 예정입니다.",
+]
+
+
+def make_text(count):
+    return " ".join(SENTENCES[i % len(SENTENCES)] for i in range(count))
+
+
+def timed(fn, repeat):
+    """(중앙값 시간, 생성 오디오 길이 샘플 수)"""
+    times, samples = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        audio = fn()
+        times.append(time.perf_counter() - start)
+        samples = len(audio)
+    return statistics.median(times), samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--language", default="KR")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--counts", default="1,2,4,8,16", help="요청당 문장 수 목록")
+    parser.add_argument("--batch", type=int, default=4, help="최대 배치 크기")
+    parser.add_argument("--clients", type=int, default=4, help="동시 요청 시나리오의 요청 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--feature-cache-mb", type=float, default=0,
+                        help="배치 경로의 front-end 특징 캐시 (기본 0: 순차 기준선과 같은 조건으로 매번 재계산)")
+    args = parser.parse_args()
+
+    tts = TTS(language=args.language, device=args.device)
+    sr = tts.hps.data.sampling_rate
+    # 특징 캐시가 켜져 있으면 워밍업/반복 측정에서 BERT/G2P 결과를 재사용해 배치 속도가 부풀려짐
+    engine = MeloEngine(tts, args.batch, feature_cache_bytes=int(args.feature_cache_mb * 1024 * 1024))
+    if engine.features is not None:
+        print(f"[WARNING] 특징 캐시 사용 중 ({args.feature_cache_mb} MB): batch 수치는 캐시 적중을 포함합니다.")
+    scheduler = BatchScheduler(engine, wait_ms=5)
+
+    # 워밍업
+    tts.tts_to_file(SENTENCES[0], 0, None, quiet=True)
+    engine.synthesize(SENTENCES[0])
+
+    # 1) 한 요청 안의 여러 문장
+    print(f"{'sentences':>9} {'audio(s)':>9} {'serial(s)':>10} {'batch(s)':>10} {'speedup':>8} {'xRT serial':>11} {'xRT batch':>10}")
+    for count in [int(c) for c in args.counts.split(",") if c.strip()]:
+        text = make_text(count)
+        t_serial, n = timed(lambda: tts.tts_to_file(text, 0, None, quiet=True), args.repeat)
+        t_batch, _ = timed(lambda: engine.synthesize(text), args.repeat)
+        audio_sec = n / sr
+        print(f"{count:>9} {audio_sec:>9.2f} {t_serial:>10.3f} {t_batch:>10.3f} {t_serial / t_batch:>8.2f} "
+              f"{audio_sec / t_serial:>11.2f} {audio_sec / t_batch:>10.2f}")
+
+    # 2) 동시 요청 (한 문장씩 clients개) : 순차 vs 스케줄러 교차 요청 배치
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(args.clients)]
+    start = time.perf_counter()
+    for t in texts:
+        tts.tts_to_file(t, 0, None, quiet=True)
+    t_serial = time.perf_counter() - start
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        start = time.perf_counter()
+        list(pool.map(scheduler.synthesize, texts))
+        t_sched = time.perf_counter() - start
+    print(f"\n동시 요청 {args.clients}개: serial {t_serial:.3f}s / scheduler {t_sched:.3f}s "
+          f"(x{t_serial / t_sched:.2f}), {scheduler.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# 임시 파일 경유 합성(기존)과 메모리 내 합성/인코딩의 요청당 시간 비교 벤치마크
+# 실행: cd TTS && python example/bench_inmemory.py --device cpu --repeat 20
+#%%
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+import soundfile
+from melo.api import TTS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from audio_codec import encode_wav, encode_mp3, wav_to_mp3_ffmpeg, lameenc
+
+SHORT_PROMPTS = [
+    "안녕하세요.",
+    "네, 알겠습니다.",
+    "잠시만 기다려 주세요.",
+    "다시 한 번 말씀해 주세요.",
+    "감사합니다. 좋은 하루 되세요.",
+]
+
+
+def via_tempfile(tts, text, spk_id, speed):
+    """기존 경로: 파일로 합성 → 읽기 → 삭제"""
+    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    path = tmp.name
+    tmp.close()
+    tts.tts_to_file(text, spk_id, path, speed=speed, quiet=True)
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+    return data
+
+
+def via_memory(tts, text, spk_id, speed):
+    """새 경로: 파형을 메모리로 받아 WAV 인코딩"""
+    audio = tts.tts_to_file(text, spk_id, None, speed=speed, quiet=True)
+    return encode_wav(audio, tts.hps.data.sampling_rate)
+
+
+def encode_only_tempfile(audio, sr):
+    """합성 이후 구간만: soundfile 파일 쓰기 → 읽기 → 삭제"""
+    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    path = tmp.name
+    tmp.close()
+    soundfile.write(path, audio, sr)
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+    return data
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        for text in SHORT_PROMPTS:
+            start = time.perf_counter()
+            fn(text)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--language", default="KR")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tts = TTS(language=args.language, device=args.device)
+    sr = tts.hps.data.sampling_rate
+    spk_id = 0
+
+    # 워밍업
+    for text in SHORT_PROMPTS:
+        via_memory(tts, text, spk_id, 1.0)
+
+    # 1) 전체 요청 경로 (합성 포함)
+    t_file = measure(lambda t: via_tempfile(tts, t, spk_id, 1.0), args.repeat)
+    t_mem = measure(lambda t: via_memory(tts, t, spk_id, 1.0), args.repeat)
+
+    # 2) 합성 이후 구간만 (같은 파형으로 I/O 차이만 측정)
+    audios = [tts.tts_to_file(t, spk_id, None, quiet=True) for t in SHORT_PROMPTS]
+    e_file, e_mem = [], []
+    for _ in range(args.repeat):
+        for audio in audios:
+            start = time.perf_counter()
+            encode_only_tempfile(audio, sr)
+            e_file.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            encode_wav(audio, sr)
+            e_mem.append(time.perf_counter() - start)
+
+    def ms(values):
+        return statistics.median(values) * 1000
+
+    # 3) MP3 인코딩: pydub(ffmpeg 서브프로세스) vs 프로세스 내 lameenc
+    m_ffmpeg, m_inproc = [], []
+    for _ in range(args.repeat):
+        for audio in audios:
+            start = time.perf_counter()
+            wav_to_mp3_ffmpeg(encode_wav(audio, sr))
+            m_ffmpeg.append(time.perf_counter() - start)
+            if lameenc is not None:
+                start = time.perf_counter()
+                encode_mp3(audio, sr)
+                m_inproc.append(time.perf_counter() - start)
+
+    print(f"{'경로':<24} {'tempfile(ms)':>14} {'memory(ms)':>12} {'saving(ms)':>12}")
+    print(f"{'합성+인코딩 (p50)':<24} {ms(t_file):>14.2f} {ms(t_mem):>12.2f} {ms(t_file) - ms(t_mem):>12.2f}")
+    print(f"{'인코딩/IO만 (p50)':<24} {ms(e_file):>14.3f} {ms(e_mem):>12.3f} {ms(e_file) - ms(e_mem):>12.3f}")
+    if m_inproc:
+        print(f"{'MP3 ffmpeg vs lameenc':<24} {ms(m_ffmpeg):>14.3f} {ms(m_inproc):>12.3f} {ms(m_ffmpeg) - ms(m_inproc):>12.3f}")
+    else:
+        print(f"[WARNING] lameenc 미설치 - MP3 ffmpeg 경로만 측정: p50 {ms(m_ffmpeg):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
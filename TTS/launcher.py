@@ -0,0 +1,196 @@
+# filename: launcher.py
+# author: gbox3d
+# created: 2025-10-19
+# description: 멀티 레플리카 TTS 서버 런처 (같은 포트를 SO_REUSEPORT로 공유, 워커별 torch 스레드/CPU 고정, 감시 및 재시작)
+#
+# 사용 예:
+#   python launcher.py --env ../.env                       # 코어 수에 맞춰 자동 분할
+#   python launcher.py --env ../.env --replicas 4 --threads 4
+
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import multiprocessing as mp
+
+from dotenv import load_dotenv
+
+# 자동 분할 시 레플리카당 torch intra-op 스레드 수
+DEFAULT_THREADS_PER_REPLICA = 4
+# 재시작 백오프 (연속 비정상 종료 시 최대 대기)
+RESTART_BACKOFF_MAX = 30.0
+# 이 시간(초) 이상 정상 동작한 뒤 종료되면 연속 재시작 횟수를 초기화 (TTS_RESTART_STABLE_SECONDS)
+RESTART_STABLE_SECONDS = 300.0
+
+
+def available_cpus():
+    """이 프로세스가 사용할 수 있는 CPU 목록"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_replicas(cpus, replicas=0, threads=0, use_cuda=False):
+    """
+    (레플리카 수, 레플리카당 스레드 수) 결정
+    GPU 사용 시 기본 1개 (모델이 GPU 메모리를 복제하므로), CPU는 코어 수 / 레플리카당 스레드
+    """
+    n_cpu = len(cpus)
+    if replicas <= 0:
+        if use_cuda:
+            replicas = 1
+        else:
+            replicas = max(1, n_cpu // (threads or DEFAULT_THREADS_PER_REPLICA))
+    if threads <= 0:
+        threads = max(1, n_cpu // replicas)
+    return replicas, threads
+
+
+def cpu_slices(cpus, replicas, threads):
+    """레플리카별로 겹치지 않는 CPU 묶음 (replicas x threads가 CPU 수를 넘으면 ValueError)"""
+    if replicas * threads > len(cpus):
+        raise ValueError(f"레플리카 {replicas}개 x 스레드 {threads}개가 CPU {len(cpus)}개를 초과합니다.")
+    return [cpus[i * threads:(i + 1) * threads] for i in range(replicas)]
+
+
+def run_worker(index, env_path, cpus, threads, pin, device):
+    """워커 프로세스: CPU 고정 → torch 스레드 설정 → TTSServer 실행"""
+    if env_path and os.path.exists(env_path):
+        load_dotenv(dotenv_path=env_path)
+    if pin and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    # torch import 전에 OpenMP/MKL 스레드 수 고정
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    import asyncio
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    from server import TTSServer
+    from tts_cache import AudioCache
+
+    host = os.getenv("TTS_HOST", "0.0.0.0")
+    port = int(os.getenv("TTS_PORT", "2501"))
+    language = os.getenv("TTS_LANGUAGE", "KR")
+    print(f"[INFO] 레플리카 {index} 시작 - pid={os.getpid()}, threads={threads}, "
+          f"cpus={cpus if pin else 'all'}, device={device}")
+    server = TTSServer(host=host, port=port, language=language, device=device, cache=AudioCache.from_env())
+    try:
+        asyncio.run(server.run_server(reuse_port=True))
+    except KeyboardInterrupt:
+        pass
+
+
+class ReplicaSupervisor:
+    """레플리카 프로세스 시작/감시/재시작"""
+
+    def __init__(self, env_path, replicas, threads, pin=True, device="cpu"):
+        self.env_path = env_path
+        self.device = device
+        self.pin = pin
+        self.threads = threads
+        self.slices = cpu_slices(available_cpus(), replicas, threads) if pin else [None] * replicas
+        self.ctx = mp.get_context("spawn")  # torch/CUDA 상태를 부모에서 물려받지 않도록
+        self.procs = [None] * replicas
+        self.restarts = [0] * replicas
+        self.started_at = [0.0] * replicas
+        self.stable_seconds = float(os.getenv("TTS_RESTART_STABLE_SECONDS", RESTART_STABLE_SECONDS))
+        self.next_start = [0.0] * replicas
+        self.running = True
+
+    def start(self, index):
+        proc = self.ctx.Process(
+            target=run_worker,
+            args=(index, self.env_path, self.slices[index], self.threads, self.pin, self.device),
+            name=f"tts-replica-{index}",
+        )
+        proc.start()
+        self.procs[index] = proc
+        self.started_at[index] = time.monotonic()
+
+    def stop(self, *_):
+        self.running = False
+
+    def supervise(self):
+        for i in range(len(self.procs)):
+            self.start(i)
+        while self.running:
+            now = time.monotonic()
+            for i, proc in enumerate(self.procs):
+                if proc.is_alive():
+                    continue
+                if self.next_start[i] == 0.0:
+                    if now - self.started_at[i] >= self.stable_seconds:
+                        # 한동안 정상 동작했다면 가끔 발생하는 종료로 보고 백오프를 처음부터
+                        self.restarts[i] = 0
+                    # 연속 재시작일수록 오래 대기 (모델 로드 실패 시 과도한 재시작 방지)
+                    delay = min(RESTART_BACKOFF_MAX, 2 ** min(self.restarts[i], 5))
+                    print(f"[WARNING] 레플리카 {i} 종료 (exitcode={proc.exitcode}), {delay:.0f}초 후 재시작")
+                    self.next_start[i] = now + delay
+                elif now >= self.next_start[i]:
+                    self.restarts[i] += 1
+                    self.next_start[i] = 0.0
+                    self.start(i)
+            time.sleep(1.0)
+        self.shutdown()
+
+    def shutdown(self):
+        print("[INFO] 레플리카 종료 중...")
+        for proc in self.procs:
+            if proc is not None and proc.is_alive():
+                proc.terminate()
+        for proc in self.procs:
+            if proc is not None:
+                proc.join(timeout=10)
+                if proc.is_alive():
+                    proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="멀티 레플리카 TTS 서버 런처")
+    parser.add_argument('--env', default='.env', help="Path to the .env file (default: .env)")
+    parser.add_argument('--replicas', type=int, default=None, help="레플리카 수 (기본: TTS_REPLICAS 또는 자동)")
+    parser.add_argument('--threads', type=int, default=None, help="레플리카당 torch 스레드 (기본: TTS_TORCH_THREADS 또는 자동)")
+    parser.add_argument('--no-pin', action='store_true', help="CPU 고정 사용 안 함")
+    args = parser.parse_args()
+
+    if os.path.exists(args.env):
+        load_dotenv(dotenv_path=args.env)
+        print(f"[INFO] Loaded environment file: {args.env}")
+    else:
+        print(f"[WARNING] .env file not found: {args.env}")
+
+    import torch
+    use_cuda = torch.cuda.is_available()
+    device = "cuda:0" if use_cuda else "cpu"
+
+    replicas = args.replicas if args.replicas is not None else int(os.getenv("TTS_REPLICAS", 0))
+    threads = args.threads if args.threads is not None else int(os.getenv("TTS_TORCH_THREADS", 0))
+    pin = not args.no_pin and os.getenv("TTS_PIN_CPUS", "1") != "0"
+    cpus = available_cpus()
+    replicas, threads = plan_replicas(cpus, replicas, threads, use_cuda)
+
+    if replicas > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        print("[WARNING] 이 플랫폼은 SO_REUSEPORT를 지원하지 않습니다. 레플리카 1개로 실행합니다.")
+        replicas, threads = 1, len(cpus)
+
+    if pin and replicas * threads > len(cpus):
+        # CPU 묶음이 겹치면 고정이 오히려 경합을 만들므로 고정 없이 실행
+        print(f"[WARNING] 레플리카 {replicas}개 x 스레드 {threads}개가 CPU {len(cpus)}개를 초과합니다. "
+              f"CPU 고정 없이 실행합니다.")
+        pin = False
+
+    print(f"[INFO] CPU {len(cpus)}개 → 레플리카 {replicas}개 x 스레드 {threads}개 (pin={pin}, device={device})")
+    supervisor = ReplicaSupervisor(args.env, replicas, threads, pin, device)
+    signal.signal(signal.SIGINT, supervisor.stop)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    supervisor.supervise()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# filename: melo_engine.py
+# author: gbox3d
+# created: 2025-10-19
+# description: MeloTTS 배치 합성 엔진 (여러 문장을 패딩해 한 번의 forward로 합성)
+#
+# tts_to_file()은 문장을 하나씩 순서대로 추론합니다.
+# MeloEngine은 문장별 front-end 특징(음소/톤/BERT)을 만든 뒤 길이가 비슷한 문장끼리 묶어
+# 한 번에 model.infer()를 실행하고, y_mask로 문장별 출력 길이를 잘라 다시 이어 붙입니다.
+# BatchScheduler는 동시에 들어온 여러 요청의 문장도 짧은 대기 시간 동안 모아 같은 배치로 처리합니다.
+# 문장별 front-end 특징(정규화/G2P/BERT)은 LRU로 캐시해 반복 문장의 전처리를 생략합니다.
+
+import os
+import re
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import torch
+from melo import utils
+
+from tts_cache import MemoryCache, normalize_text
+
+# tts_to_file() 기본 추론 파라미터
+SDP_RATIO = 0.2
+NOISE_SCALE = 0.6
+NOISE_SCALE_W = 0.8
+
+
+def feature_nbytes(features):
+    """front-end 특징 튜플의 텐서 바이트 합계"""
+    return sum(t.element_size() * t.nelement() for t in features)
+
+
+class MeloEngine:
+    """MeloTTS 모델을 직접 호출하는 배치 합성기"""
+
+    def __init__(self, tts, max_batch=4, feature_cache_bytes=128 * 1024 * 1024):
+        self.tts = tts
+        self.model = tts.model
+        self.hps = tts.hps
+        self.device = tts.device
+        self.language = tts.language
+        self.max_batch = max(1, int(max_batch))
+        self.hop_length = self.hps.data.hop_length
+        self.sample_rate = self.hps.data.sampling_rate
+        self.n_speakers = len(self.hps.data.spk2id)
+        # 문장 → front-end 특징 LRU (속도/포맷과 무관하므로 오디오 캐시가 빗나가도 재사용)
+        self.features = MemoryCache(feature_cache_bytes, sizeof=feature_nbytes) if feature_cache_bytes > 0 else None
+
+    @classmethod
+    def from_env(cls, tts):
+        """TTS_BATCH_SIZE (기본 4) / TTS_FEATURE_CACHE_MB (기본 128, 0이면 비활성)"""
+        max_batch = int(os.getenv("TTS_BATCH_SIZE", 4))
+        cache_mb = float(os.getenv("TTS_FEATURE_CACHE_MB", 128))
+        return cls(tts, max_batch, int(cache_mb * 1024 * 1024))
+
+    def split_sentences(self, text):
+        """MeloTTS와 같은 규칙으로 문장 분할"""
+        return self.tts.split_sentences_into_pieces(text, self.language, True)
+
+    def prepare(self, sentence):
+        """문장 → front-end 특징 (bert, ja_bert, phones, tones, lang_ids), 캐시 적중 시 재계산 생략"""
+        if self.language in ['EN', 'ZH_MIX_EN']:
+            sentence = re.sub(r'([a-z])([A-Z])', r'\1 \2', sentence)
+        if self.features is None:
+            return utils.get_text_for_tts_infer(sentence, self.language, self.hps, self.device, self.tts.symbol_to_id)
+        key = (self.language, normalize_text(sentence))
+        cached = self.features.get(key)
+        if cached is not None:
+            return cached
+        features = utils.get_text_for_tts_infer(sentence, self.language, self.hps, self.device, self.tts.symbol_to_id)
+        # GPU 메모리를 점유하지 않도록 CPU에 보관 (infer_batch에서 디바이스로 이동)
+        features = tuple(t.detach().cpu() for t in features)
+        self.features.put(key, features)
+        return features
+
+    @staticmethod
+    def _pad_stack(tensors, length):
+        """마지막 축을 length로 0 패딩 후 배치 축으로 쌓기"""
+        return torch.stack([
+            torch.nn.functional.pad(t, (0, length - t.shape[-1])) for t in tensors
+        ])
+
+    def infer_batch(self, features, spk_id=0, speed=1.0):
+        """특징 목록을 한 번의 forward로 합성 → 문장별 float32 파형 목록"""
+        lengths = [f[2].size(0) for f in features]
+        max_len = max(lengths)
+        bert = self._pad_stack([f[0] for f in features], max_len).to(self.device)
+        ja_bert = self._pad_stack([f[1] for f in features], max_len).to(self.device)
+        phones = self._pad_stack([f[2] for f in features], max_len).to(self.device)
+        tones = self._pad_stack([f[3] for f in features], max_len).to(self.device)
+        lang_ids = self._pad_stack([f[4] for f in features], max_len).to(self.device)
+        x_lengths = torch.LongTensor(lengths).to(self.device)
+        speakers = torch.LongTensor([spk_id] * len(features)).to(self.device)
+        with torch.no_grad():
+            o, _, y_mask, _ = self.model.infer(
+                phones, x_lengths, speakers, tones, lang_ids, bert, ja_bert,
+                sdp_ratio=SDP_RATIO, noise_scale=NOISE_SCALE, noise_scale_w=NOISE_SCALE_W,
+                length_scale=1. / speed)
+            frames = y_mask.sum(dim=(1, 2)).long().tolist()
+            audio = o[:, 0].float().cpu().numpy()
+        return [audio[i, :frames[i] * self.hop_length] for i in range(len(features))]
+
+    def infer_many(self, features, spk_id=0, speed=1.0):
+        """길이순으로 정렬해 max_batch 단위로 묶어 추론 (패딩 최소화), 원래 순서로 반환"""
+        order = sorted(range(len(features)), key=lambda i: features[i][2].size(0))
+        results = [None] * len(features)
+        for start in range(0, len(order), self.max_batch):
+            chunk = order[start:start + self.max_batch]
+            for idx, audio in zip(chunk, self.infer_batch([features[i] for i in chunk], spk_id, speed)):
+                results[idx] = audio
+        return results
+
+    def synthesize(self, text, spk_id=0, speed=1.0):
+        """텍스트 → float32 파형 (tts_to_file(text, spk, None)과 같은 출력 형식)"""
+        features = [self.prepare(s) for s in self.split_sentences(text)]
+        if not features:
+            return self.tts.audio_numpy_concat([], sr=self.sample_rate, speed=speed)
+        audio_list = self.infer_many(features, spk_id, speed)
+        return self.tts.audio_numpy_concat(audio_list, sr=self.sample_rate, speed=speed)
+
+
+class BatchScheduler:
+    """
+    여러 요청의 문장을 모아 배치 추론하는 스케줄러 (전용 추론 스레드 1개)
+    첫 작업이 도착하면 wait_ms 동안 또는 max_batch개가 찰 때까지 모은 뒤 (화자, 속도)별로 묶어 추론합니다.
+    """
+
+    def __init__(self, engine, wait_ms=5):
+        self.engine = engine
+        self.wait = max(0.0, wait_ms / 1000.0)
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="tts-batch", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, engine):
+        """TTS_BATCH_WAIT_MS (기본 5), engine.max_batch가 1이면 None (배치 비활성)"""
+        if engine.max_batch <= 1:
+            return None
+        return cls(engine, float(os.getenv("TTS_BATCH_WAIT_MS", 5)))
+
+    @property
+    def sample_rate(self):
+        return self.engine.sample_rate
+
+    def submit(self, features, spk_id=0, speed=1.0):
+        """문장 특징 하나를 배치 대기열에 넣고 Future(파형) 반환"""
+        future = Future()
+        self._queue.put((features, spk_id, speed, future))
+        return future
+
+    def synthesize(self, text, spk_id=0, speed=1.0):
+        """호출 스레드에서 front-end 처리 → 추론은 배치 스레드에 위임 → 이어 붙이기"""
+        features = [self.engine.prepare(s) for s in self.engine.split_sentences(text)]
+        futures = [self.submit(f, spk_id, speed) for f in features]
+        audio_list = [f.result() for f in futures]
+        return self.engine.tts.audio_numpy_concat(audio_list, sr=self.engine.sample_rate, speed=speed)
+
+    def close(self):
+        """추론 스레드 종료 (엔진 해제 시)"""
+        self._queue.put(None)
+
+    def _collect(self):
+        """첫 작업 도착 후 wait 시간 안에 들어온 작업을 max_batch개까지 수집 (종료 신호면 None)"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        jobs = [first]
+        deadline = time.monotonic() + self.wait
+        while len(jobs) < self.engine.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)  # 수집한 작업을 처리한 뒤 종료
+                break
+            jobs.append(job)
+        return jobs
+
+    def _loop(self):
+        while True:
+            jobs = self._collect()
+            if jobs is None:
+                return
+            groups = {}
+            for job in jobs:
+                groups.setdefault((job[1], job[2]), []).append(job)
+            for (spk_id, speed), group in groups.items():
+                try:
+                    audios = self.engine.infer_many([j[0] for j in group], spk_id, speed)
+                    for job, audio in zip(group, audios):
+                        job[3].set_result(audio)
+                except Exception as e:
+                    for job in group:
+                        job[3].set_exception(e)
+                self.batches += 1
+                self.items += len(group)
+
+    def stats(self):
+        return {
+            "max_batch": self.engine.max_batch,
+            "wait_ms": self.wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": self.items / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,90 @@
+# filename: onnx_engine.py
+# author: gbox3d
+# created: 2025-10-19
+# description: ONNX Runtime VITS 합성 엔진 (onnx_export.py로 내보낸 MMS-TTS 그래프를 CPU 그래프 최적화로 실행, int8 양자화 모델 선택 가능)
+#
+# 모델 디렉터리 구성 (onnx_export.py 출력):
+#   model.onnx / model.int8.onnx   입력 input_ids(int64 [1, T]), attention_mask(int64 [1, T]), speaking_rate(float32 [])
+#                                  출력 waveform(float32 [1, N])
+#   onnx_config.json               {"sampling_rate", "source", ...}
+#   tokenizer 파일                  transformers VitsTokenizer (uroman 설치 시 한국어 자동 로마자화)
+
+import os
+import json
+
+import numpy as np
+import onnxruntime as ort
+from transformers import VitsTokenizer
+
+from text_segmenter import Segmenter
+
+# 문장 사이 무음 (초) - MeloTTS 문장 연결과 같은 간격
+SENTENCE_GAP = 0.05
+
+
+class OnnxVitsEngine:
+    """MeloEngine과 같은 synthesize(text, spk_id, speed) 인터페이스의 ONNX Runtime 엔진 (단일 화자)"""
+
+    def __init__(self, model_dir, quantized=False, threads=0):
+        self.model_dir = model_dir
+        self.quantized = quantized
+        with open(os.path.join(model_dir, "onnx_config.json"), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.sample_rate = int(self.config["sampling_rate"])
+        self.n_speakers = 1
+        # 오디오 캐시/통계 호환용 (front-end 특징 캐시 없음)
+        self.features = None
+        self.model_path = os.path.join(model_dir, "model.int8.onnx" if quantized else "model.onnx")
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"ONNX 모델이 없습니다: {self.model_path} (onnx_export.py로 내보내기)")
+        self.nbytes = os.path.getsize(self.model_path)
+        self.tokenizer = VitsTokenizer.from_pretrained(model_dir)
+        # 긴 입력은 문장/절 경계로 나누어 그래프 입력 길이를 제한
+        self.segmenter = Segmenter(first_chars=int(self.config.get("max_chars", 200)),
+                                   max_chars=int(self.config.get("max_chars", 200)))
+        self.set_threads(threads)
+
+    @classmethod
+    def from_env(cls, language):
+        """TTS_ONNX_MODEL_DIR ({language} 치환 가능) / TTS_ONNX_QUANTIZED (int8 모델 사용) / TTS_ONNX_THREADS (0이면 코어 수)"""
+        model_dir = os.getenv("TTS_ONNX_MODEL_DIR", "models/mms-tts-{language}").format(language=language.lower())
+        quantized = os.getenv("TTS_ONNX_QUANTIZED", "0").lower() in ("1", "true", "yes")
+        return cls(model_dir, quantized, int(os.getenv("TTS_ONNX_THREADS", 0)))
+
+    def set_threads(self, threads=0):
+        """intra-op 스레드 수를 바꿔 세션 재생성 (0이면 ONNX Runtime 기본값)"""
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        # 여러 워커 스레드가 세션을 공유하므로 유휴 스핀 대기로 코어를 점유하지 않도록
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        self.threads = threads
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def infer(self, text, speed=1.0):
+        """문장 하나 → float32 파형"""
+        inputs = self.tokenizer(text, return_tensors="np")
+        input_ids = inputs["input_ids"].astype(np.int64)
+        if input_ids.shape[1] == 0:
+            return np.zeros(0, dtype=np.float32)
+        feeds = {"input_ids": input_ids,
+                 "attention_mask": inputs.get("attention_mask", np.ones_like(input_ids)).astype(np.int64)}
+        if "speaking_rate" in self.input_names:
+            feeds["speaking_rate"] = np.array(speed, dtype=np.float32)
+        waveform = self.session.run(["waveform"], feeds)[0]
+        return waveform.reshape(-1).astype(np.float32, copy=False)
+
+    def synthesize(self, text, spk_id=0, speed=1.0):
+        """텍스트 → float32 파형 (문장 사이 짧은 무음)"""
+        gap = np.zeros(int(self.sample_rate * SENTENCE_GAP), dtype=np.float32)
+        pieces = []
+        for sentence in self.segmenter.split(text):
+            audio = self.infer(sentence, speed)
+            if audio.size:
+                if pieces:
+                    pieces.append(gap)
+                pieces.append(audio)
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
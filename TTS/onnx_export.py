@@ -0,0 +1,106 @@
+# filename: onnx_export.py
+# author: gbox3d
+# created: 2025-10-19
+# description: MMS-TTS(VITS) 모델을 ONNX로 내보내기 (속도 입력 포함, 선택적 int8 동적 양자화, ONNX Runtime 검증)
+#
+# 사용 예:
+#   python onnx_export.py --model facebook/mms-tts-kor --out models/mms-tts-kr
+#   python onnx_export.py --model facebook/mms-tts-kor --out models/mms-tts-kr --quantize
+#
+# 서버 설정: TTS_BACKEND=onnx, TTS_ONNX_MODEL_DIR=models/mms-tts-{language}, TTS_ONNX_QUANTIZED=1
+
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import torch
+from transformers import VitsTokenizer, VitsModel
+
+OPSET = 17
+CHECK_TEXT = "안녕하세요, 음성 합성 모델 변환을 확인합니다."
+
+
+class VitsExportWrapper(torch.nn.Module):
+    """speaking_rate를 그래프 입력으로 받도록 감싼 VitsModel (VITS의 length_scale = 1 / speaking_rate)"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, speaking_rate):
+        self.model.speaking_rate = speaking_rate
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).waveform
+
+
+def export(model_name, out_dir, quantize=False, quantize_ops="MatMul,Gemm", max_chars=200):
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = VitsTokenizer.from_pretrained(model_name)
+    model = VitsModel.from_pretrained(model_name).eval()
+
+    inputs = tokenizer(CHECK_TEXT, return_tensors="pt")
+    input_ids = inputs["input_ids"].long()
+    attention_mask = inputs.get("attention_mask", torch.ones_like(input_ids)).long()
+    speaking_rate = torch.tensor(1.0)
+
+    onnx_path = os.path.join(out_dir, "model.onnx")
+    start = time.perf_counter()
+    with torch.no_grad():
+        torch.onnx.export(
+            VitsExportWrapper(model), (input_ids, attention_mask, speaking_rate), onnx_path,
+            input_names=["input_ids", "attention_mask", "speaking_rate"],
+            output_names=["waveform"],
+            dynamic_axes={"input_ids": {1: "tokens"}, "attention_mask": {1: "tokens"}, "waveform": {1: "samples"}},
+            opset_version=OPSET,
+            do_constant_folding=True,
+        )
+    print(f"[INFO] ONNX 내보내기 완료: {onnx_path} ({os.path.getsize(onnx_path) / 1024 / 1024:.1f} MB, "
+          f"{time.perf_counter() - start:.1f}s)")
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        int8_path = os.path.join(out_dir, "model.int8.onnx")
+        ops = [op.strip() for op in quantize_ops.split(",") if op.strip()]
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8, op_types_to_quantize=ops)
+        print(f"[INFO] int8 양자화 완료: {int8_path} ({os.path.getsize(int8_path) / 1024 / 1024:.1f} MB, ops={ops})")
+
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "onnx_config.json"), "w", encoding="utf-8") as f:
+        json.dump({"source": model_name, "sampling_rate": model.config.sampling_rate,
+                   "opset": OPSET, "max_chars": max_chars}, f, ensure_ascii=False, indent=2)
+    return onnx_path
+
+
+def verify(out_dir, quantized=False):
+    """ONNX Runtime으로 합성해 길이/진폭 확인 (노이즈 샘플링 때문에 파형 자체는 eager와 일치하지 않음)"""
+    from onnx_engine import OnnxVitsEngine
+    engine = OnnxVitsEngine(out_dir, quantized)
+    for speed in (1.0, 1.5):
+        start = time.perf_counter()
+        audio = engine.synthesize(CHECK_TEXT, 0, speed)
+        elapsed = time.perf_counter() - start
+        seconds = audio.size / engine.sample_rate
+        print(f"[INFO] 검증 ({'int8' if quantized else 'fp32'}, speed={speed}): {seconds:.2f}s 오디오, "
+              f"RTF {elapsed / seconds if seconds else 0:.3f}, peak {np.abs(audio).max() if audio.size else 0:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MMS-TTS(VITS) → ONNX 내보내기")
+    parser.add_argument('--model', default="facebook/mms-tts-kor", help="Hugging Face 모델 이름 또는 로컬 경로")
+    parser.add_argument('--out', required=True, help="출력 디렉터리")
+    parser.add_argument('--quantize', action='store_true', help="int8 동적 양자화 모델(model.int8.onnx)도 생성")
+    parser.add_argument('--quantize-ops', default="MatMul,Gemm", help="양자화할 연산 (Conv 추가 시 더 작고 빠르지만 음질 저하 가능)")
+    parser.add_argument('--max-chars', type=int, default=200, help="추론 1회당 최대 글자 수 (긴 입력은 분할)")
+    parser.add_argument('--no-verify', action='store_true')
+    args = parser.parse_args()
+
+    export(args.model, args.out, args.quantize, args.quantize_ops, args.max_chars)
+    if not args.no_verify:
+        verify(args.out)
+        if args.quantize:
+            verify(args.out, quantized=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# filename: prompt_library.py
+# author: gbox3d
+# created: 2025-10-19
+# description: 사전 렌더링 프롬프트 라이브러리 (매니페스트 → 단일 mmap 팩 파일, 합성 없이 즉시 재생)
+#
+# 매니페스트 (JSON): { "<prompt_id>": {"text": "...", "speaker": 0, "speed": 1.0}, "<id2>": "텍스트만", ... }
+# 팩 파일 구조:
+#   [MAGIC 'TTSP'(4) | VERSION(2) | pad(2) | INDEX_LEN(4)] [INDEX JSON] [PCM 16-bit LE mono 데이터 ...]
+#   INDEX: {"language", "sample_rate", "entries": {id: {"offset", "frames", "digest"}}}  (offset은 데이터 영역 기준)
+
+import os
+import json
+import mmap
+import struct
+import threading
+
+import numpy as np
+
+from audio_codec import float_to_pcm16
+from tts_cache import make_cache_key
+
+PACK_MAGIC = b'TTSP'
+PACK_VERSION = 1
+_PACK_HEADER = struct.Struct('!4sHxxI')
+
+
+def load_manifest(path):
+    """매니페스트 파일 → {id: {"text", "speaker", "speed"}}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    manifest = {}
+    for prompt_id, entry in raw.items():
+        if isinstance(entry, str):
+            entry = {"text": entry}
+        manifest[str(prompt_id)] = {
+            "text": entry["text"],
+            "speaker": int(entry.get("speaker", 0)),
+            "speed": float(entry.get("speed", 1.0)),
+        }
+    return manifest
+
+
+class PromptLibrary:
+    """프롬프트 ID → 사전 렌더링된 PCM (mmap 팩 파일에서 복사 없이 조회)"""
+
+    def __init__(self, manifest_path, pack_path, language, sample_rate):
+        self.manifest_path = manifest_path
+        self.pack_path = pack_path
+        self.language = language
+        self.sample_rate = sample_rate
+        self.manifest = {}
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._mm = None
+        self._data_start = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, language, sample_rate):
+        """TTS_PROMPT_MANIFEST (없으면 None) / TTS_PROMPT_PACK (기본: <매니페스트>.pack)"""
+        manifest_path = os.getenv("TTS_PROMPT_MANIFEST")
+        if not manifest_path:
+            return None
+        pack_path = os.getenv("TTS_PROMPT_PACK") or f"{os.path.splitext(manifest_path)[0]}.pack"
+        return cls(manifest_path, pack_path, language, sample_rate)
+
+    def digest(self, entry):
+        """렌더링 결과를 결정하는 값의 해시 (텍스트/화자/속도/언어/샘플레이트)"""
+        return make_cache_key(entry["text"], entry["speaker"], entry["speed"], self.language,
+                              "pcm16", rate=self.sample_rate)
+
+    def _open_pack(self):
+        """팩 파일을 mmap으로 열어 (mmap, data_start, entries) 반환 (없거나 손상 시 None)"""
+        if not os.path.exists(self.pack_path):
+            return None
+        with open(self.pack_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _PACK_HEADER.size:
+                return None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_len = _PACK_HEADER.unpack_from(mm, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            print(f"[WARNING] 프롬프트 팩 형식이 맞지 않아 다시 만듭니다: {self.pack_path}")
+            mm.close()
+            return None
+        index = json.loads(bytes(mm[_PACK_HEADER.size:_PACK_HEADER.size + index_len]).decode('utf-8'))
+        if index.get("sample_rate") != self.sample_rate or index.get("language") != self.language:
+            mm.close()
+            return None
+        return mm, _PACK_HEADER.size + index_len, index["entries"]
+
+    def _view(self, mm, data_start, entry):
+        return np.frombuffer(mm, dtype='<i2', count=entry["frames"], offset=data_start + entry["offset"])
+
+    def build(self, render):
+        """
+        매니페스트를 읽어 팩 파일을 갱신하고 mmap으로 로드
+        render(text, speaker, speed) -> float 파형 (이미 같은 digest로 팩에 있는 항목은 재사용)
+        반환: (렌더링한 수, 재사용한 수)
+        """
+        self.manifest = load_manifest(self.manifest_path)
+        old = self._open_pack()
+        old_entries = old[2] if old else {}
+
+        index = {"language": self.language, "sample_rate": self.sample_rate, "entries": {}}
+        chunks, offset, rendered, reused = [], 0, 0, 0
+        for prompt_id, entry in self.manifest.items():
+            digest = self.digest(entry)
+            prev = old_entries.get(prompt_id)
+            if prev is not None and prev["digest"] == digest:
+                pcm = self._view(old[0], old[1], prev).copy()
+                reused += 1
+            else:
+                pcm = float_to_pcm16(render(entry["text"], entry["speaker"], entry["speed"])).copy()
+                rendered += 1
+            index["entries"][prompt_id] = {"offset": offset, "frames": int(pcm.size), "digest": digest}
+            chunks.append(pcm.astype('<i2', copy=False).tobytes())
+            offset += pcm.nbytes
+
+        index_bytes = json.dumps(index, ensure_ascii=False).encode('utf-8')
+        tmp_path = f"{self.pack_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index_bytes)))
+            f.write(index_bytes)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, self.pack_path)
+        if old:
+            # 재사용 항목은 위에서 복사했으므로 비교용으로 연 팩은 바로 닫음
+            self._close_map(old[0])
+
+        mm, data_start, entries = self._open_pack()
+        with self._lock:
+            prev, self._mm, self._data_start, self._entries = self._mm, mm, data_start, entries
+        self._close_map(prev)
+        print(f"[INFO] 프롬프트 팩 로드: {self.pack_path} (항목 {len(entries)}개, 렌더링 {rendered}, 재사용 {reused})")
+        return rendered, reused
+
+    @staticmethod
+    def _close_map(mm):
+        """교체된 mmap 닫기 (전송 중인 PCM 뷰가 남아 있으면 닫을 수 없으므로 뷰가 사라질 때 GC가 해제)"""
+        if mm is None:
+            return
+        try:
+            mm.close()
+        except BufferError:
+            pass
+
+    def get(self, prompt_id):
+        """프롬프트 ID → int16 PCM 뷰 (mmap, 복사 없음), 없으면 None"""
+        with self._lock:
+            entry = self._entries.get(prompt_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # 뷰를 lock 안에서 만들어 두면 reload가 이 mmap을 닫지 못함 (BufferError → GC에 맡김)
+            return self._view(self._mm, self._data_start, entry)
+
+    def ids(self):
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "manifest": self.manifest_path,
+                "pack": self.pack_path,
+                "entries": len(self._entries),
+                "pack_bytes": len(self._mm) if self._mm is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -5,148 +5,461 @@
 
 import os
 import asyncio
-import struct
-import io
 import sys
 import time
-import tempfile
+import json
 
-from melo.api import TTS             # MeloTTS 기본 한국어 TTS 엔진
-from pydub import AudioSegment
+import numpy as np
+
+from voice_protocol import tts as proto
+
+from audio_codec import (encode_wav, encode_mp3, encode_opus, float_to_pcm16, resample, wav_header,
+                         wav_to_mp3_ffmpeg, DEFAULT_MP3_BITRATE, DEFAULT_OPUS_BITRATE,
+                         OPUS_SAMPLE_RATES, SUPPORTED_SAMPLE_RATES)
+from tts_cache import AudioCache, make_cache_key
+from tts_executor import SynthesisExecutor, ExecutorBusy
+from engine_registry import EngineRegistry, VoiceError
+from prompt_library import PromptLibrary
+from text_segmenter import Segmenter
+from tts_stats import ServerStats
+
+# 워밍업 문장 (짧은/긴 문장, 숫자 포함 - BERT/G2P/모델/인코더 초기화용)
+WARMUP_TEXTS = {
+    "KR": ["안녕하세요.", "오늘 날씨는 맑고 기온은 이십삼 도입니다. 잠시만 기다려 주세요.", "주문 번호 1234번 확인되었습니다."],
+    "EN": ["Hello.", "The weather is clear today and the temperature is twenty three degrees. Please wait a moment."],
+    "JP": ["こんにちは。", "今日は晴れです。少々お待ちください。"],
+    "ZH": ["你好。", "今天天气晴朗，请稍等。"],
+    "ES": ["Hola.", "Hoy hace buen tiempo. Espere un momento, por favor."],
+    "FR": ["Bonjour.", "Il fait beau aujourd'hui. Veuillez patienter un instant."],
+}
 
 class TTSServer:
     # 상태 코드 정의
-    SUCCESS = 0
-    ERR_CHECKCODE_MISMATCH = 1
-    ERR_INVALID_DATA = 2
-    ERR_INVALID_REQUEST = 3
-    ERR_INVALID_PARAMETER = 4
-    ERR_INVALID_FORMAT = 5
-    ERR_UNKNOWN_CODE = 8
-    ERR_EXCEPTION = 9
-    ERR_TIMEOUT = 10
+    SUCCESS = proto.SUCCESS
+    ERR_CHECKCODE_MISMATCH = proto.ERR_CHECKCODE_MISMATCH
+    ERR_INVALID_DATA = proto.ERR_INVALID_DATA
+    ERR_INVALID_REQUEST = proto.ERR_INVALID_REQUEST
+    ERR_INVALID_PARAMETER = proto.ERR_INVALID_PARAMETER
+    ERR_INVALID_FORMAT = proto.ERR_INVALID_FORMAT
+    ERR_NOT_FOUND = proto.ERR_NOT_FOUND
+    ERR_UNKNOWN_CODE = proto.ERR_UNKNOWN_CODE
+    ERR_EXCEPTION = proto.ERR_EXCEPTION
+    ERR_TIMEOUT = proto.ERR_TIMEOUT
+    ERR_BUSY = proto.ERR_BUSY
+    ERR_NOT_READY = proto.ERR_NOT_READY
     
     # 요청 코드 정의
-    REQ_TTS = 0x01
-    REQ_PING = 99
-    
-    # 헤더 사이즈
-    HEADER_SIZE = 32
+    REQ_TTS = proto.REQ_TTS
+    REQ_ADMIN = proto.REQ_ADMIN
+    REQ_PROMPT = proto.REQ_PROMPT
+    REQ_STATS = proto.REQ_STATS
+    REQ_PING = proto.REQ_PING
+    # 통계용 요청 이름
+    REQUEST_NAMES = {REQ_TTS: 'tts', REQ_ADMIN: 'admin', REQ_PROMPT: 'prompt', REQ_STATS: 'stats', REQ_PING: 'ping'}
     
-    # 체크코드 (고정값)
-    CHECKCODE = b'TTS1'
+    # 헤더 FLAGS (byte 6) 비트
+    FLAG_STREAM = proto.FLAG_STREAM     # 요청: 문장 단위 스트리밍 / 응답: 스트림 청크
+    FLAG_END = proto.FLAG_END           # 응답: 스트림 종료 프레임
 
-    def __init__(self, host="0.0.0.0", port=2501, language="KR", device="cuda"):
+    # 속도 허용 범위 (요청 헤더 bytes 28-29 : speed x 100)
+    MIN_SPEED = 0.5
+    MAX_SPEED = 2.0
+
+    # FMT 코드 → 출력 포맷 (그 외 값은 mp3)
+    FORMAT_MAP = {1: 'wav', 2: 'mp3', 3: 'ogg', 4: 'pcm'}
+    # 요청 SAMPLE_RATE (bytes 20-23, 0이면 원본) 허용 값
+    SAMPLE_RATES = SUPPORTED_SAMPLE_RATES
+
+    def __init__(self, host="0.0.0.0", port=2501, language="KR", device="cuda", cache=None, executor=None):
         self.host = host
         self.port = port
-        # MeloTTS 모델 초기화
-        self.tts = TTS(language=language, device=device)
+        self.language = language
+        # 언어별 합성 엔진 (기본 언어는 즉시 로드, 나머지는 요청 시 로드 / TTS_BACKEND, TTS_LANGUAGES, TTS_ENGINE_MEMORY_MB)
+        self.engines = EngineRegistry.from_env(device, language)
+        self.tts = self.engines.default.tts
+        # 합성 오디오 캐시 (AudioCache, None이면 사용 안 함)
+        self.cache = cache
+        # 합성/인코딩 워커 풀 (TTS_WORKERS / TTS_QUEUE_LIMIT)
+        self.executor = executor or SynthesisExecutor.from_env()
+        # 스트리밍 구간 분할 (TTS_SEGMENT_*)
+        self.segmenter = Segmenter.from_env()
+        # 관리 요청 토큰 (설정 시 ADMIN 요청 JSON에 "token" 필요)
+        self.admin_token = os.getenv("TTS_ADMIN_TOKEN") or None
         # 기본 화자 ID (단일/기본 화자 사용)
         self.spk_id = 0
+        # 모델 출력 샘플레이트 (MeloTTS: 44.1kHz, MMS-TTS: 16kHz)
+        self.sample_rate = self.engines.default.sample_rate
+        self.mp3_bitrate = DEFAULT_MP3_BITRATE
+        self.opus_bitrate = DEFAULT_OPUS_BITRATE
+        # 기본 언어 합성 엔진 (front-end 특징 캐시 TTS_FEATURE_CACHE_MB, 배치 TTS_BATCH_SIZE / TTS_BATCH_WAIT_MS)
+        self.engine = self.engines.default.engine
+        self.batcher = self.engines.default.batcher
+        # 사전 렌더링 프롬프트 (TTS_PROMPT_MANIFEST / TTS_PROMPT_PACK), 시작 시 팩 파일 갱신 후 mmap 로드
+        self.prompts = PromptLibrary.from_env(language, self.sample_rate)
+        if self.prompts is not None:
+            self.prompts.build(self.render_prompt)
+        # 런타임 통계 (STATS 요청)
+        self.stats = ServerStats({v: k for k, v in vars(TTSServer).items()
+                                  if k == 'SUCCESS' or k.startswith('ERR_')})
+        # 준비 상태 (워밍업 완료 전까지 PING/TTS/PROMPT는 ERR_NOT_READY)
+        self.ready = False
+        self.warmup_time = None
+
+    def load_warmup_texts(self):
+        """TTS_WARMUP_FILE (한 줄에 한 문장) 또는 기본 언어의 내장 문장"""
+        path = os.getenv("TTS_WARMUP_FILE")
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                texts = [line.strip() for line in f if line.strip()]
+            if texts:
+                return texts
+        return WARMUP_TEXTS.get(self.language, WARMUP_TEXTS["KR"])
+
+    def warmup(self, rounds=2):
+        """대표 문장으로 합성/인코딩 경로를 미리 실행 (오디오 캐시는 채우지 않음), 소요 시간(초) 반환"""
+        texts = self.load_warmup_texts()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                audio = self.synthesize(text)
+                for audio_format in ('wav', 'mp3'):
+                    self.encode_audio(audio, audio_format)
+        return time.perf_counter() - start
+
+    async def run_warmup(self):
+        """TTS_WARMUP (기본 1) / TTS_WARMUP_ROUNDS (기본 2) - 완료 후 ready 전환"""
+        if os.getenv("TTS_WARMUP", "1").lower() in ("0", "false", "no"):
+            self.ready = True
+            return
+        rounds = int(os.getenv("TTS_WARMUP_ROUNDS", 2))
+        print(f"[INFO] TTS 워밍업 시작 (rounds={rounds})")
+        try:
+            # 합성 워커 풀에서 실행 (워커 한도에 포함)
+            self.warmup_time = await self.executor.run(self.warmup, rounds)
+            print(f"[INFO] TTS 워밍업 완료: {self.warmup_time:.2f}s")
+        except Exception as e:
+            print(f"[ERROR] TTS 워밍업 실패 (준비 상태로 전환): {e}")
+        self.ready = True
+
+    def synthesize(self, text, speed=1.0, language=None, speaker=None):
+        """텍스트를 float32 파형(numpy)으로 합성 (front-end 특징 캐시 + 배치 추론, 기본 언어 원본 레이트)"""
+        with self.engines.use(language) as slot:
+            # 문장들을 (동시 요청의 문장과 함께) 배치로 묶어 한 번에 추론
+            return slot.synthesize(text, self.spk_id if speaker is None else speaker, speed)
 
     def generate_wav_bytes(self, text, speed=1.0):
-        """텍스트에서 WAV 포맷 바이트를 생성"""
-        # 임시 파일 생성
-        tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        tmp_path = tmp.name
-        tmp.close()
-        # 파일로 합성
-        self.tts.tts_to_file(text, self.spk_id, tmp_path, 
-                             speed=speed, # 속도 조절
-                             quiet=True # 조용히 합성
-                             )
-        # 파일 읽기
-        with open(tmp_path, 'rb') as f:
-            wav_bytes = f.read()
-        os.remove(tmp_path)
-        return wav_bytes
+        """텍스트에서 WAV 포맷 바이트를 생성 (임시 파일 없이 메모리에서 인코딩)"""
+        return encode_wav(self.synthesize(text, speed), self.sample_rate)
 
     def convert_to_mp3_bytes(self, wav_bytes):
-        """WAV 바이트를 MP3 바이트로 변환"""
-        buf = io.BytesIO(wav_bytes)
-        audio = AudioSegment.from_file(buf, format="wav")
-        out_buf = io.BytesIO()
-        audio.export(out_buf, format="mp3", bitrate="192k")
-        out_buf.seek(0)
-        return out_buf.read()
-
-    def create_response_header(self, status_code, payload_size=0):
-        """응답 헤더 생성"""
-        header = bytearray(self.HEADER_SIZE)
-        header[0:4] = self.CHECKCODE
-        header[4:5] = struct.pack('!B', status_code)
-        timestamp = int(time.time())
-        header[8:16] = struct.pack('!Q', timestamp)
-        header[16:20] = struct.pack('!I', payload_size)
-        return header
-
-    async def handle_tts_request(self, reader, writer, format_code):
-        """TTS 요청 처리"""
-        size_bytes = await reader.readexactly(4)
-        text_size = int.from_bytes(size_bytes, 'big')
-        text = (await reader.readexactly(text_size)).decode('utf-8')
-        format_map = {1: 'wav', 2: 'mp3'}
-        audio_format = format_map.get(format_code, 'mp3')
+        """WAV 바이트를 MP3 바이트로 변환 (ffmpeg 경로, 하위 호환용)"""
+        return wav_to_mp3_ffmpeg(wav_bytes, self.mp3_bitrate)
+
+    def render_prompt(self, text, speaker, speed):
+        """프롬프트 팩용 합성 (매니페스트의 화자/속도 사용)"""
+        return self.engine.synthesize(text, speaker, speed)
+
+    def encode_pcm16(self, pcm, audio_format, sample_rate=0):
+        """모델 원본 레이트의 int16 PCM → 요청 포맷 페이로드 조각 리스트 (원본 레이트 wav/pcm은 복사 없이 PCM 뷰 그대로)"""
+        rate = self.output_rate(audio_format, sample_rate)
+        if rate == self.sample_rate and audio_format == 'pcm':
+            return [memoryview(pcm).cast('B')]
+        if rate == self.sample_rate and audio_format == 'wav':
+            return [wav_header(pcm.size, rate), memoryview(pcm).cast('B')]
+        return [self.encode_audio(pcm.astype(np.float32) / 32767.0, audio_format, sample_rate)]
+
+    def output_rate(self, audio_format, sample_rate=0, src_rate=None):
+        """실제 출력 샘플레이트 (요청값, 없으면 모델 원본 / ogg는 Opus 미지원 레이트면 48000)"""
+        rate = sample_rate or src_rate or self.sample_rate
+        if audio_format == 'ogg' and rate not in OPUS_SAMPLE_RATES:
+            return 48000
+        return rate
+
+    def render_audio(self, text, audio_format, speed=1.0, sample_rate=0, language=None, speaker=None):
+        """텍스트를 요청 포맷 오디오 바이트로 변환 (캐시 적중 시 합성 생략)"""
+        language = language or self.language
+        speaker = self.spk_id if speaker is None else speaker
+        key = None
+        if self.cache is not None:
+            extra = {"rate": self.output_rate(audio_format, sample_rate)}
+            if audio_format == 'mp3':
+                extra["bitrate"] = self.mp3_bitrate
+            elif audio_format == 'ogg':
+                extra["bitrate"] = self.opus_bitrate
+            key = make_cache_key(text, speaker, speed, language, audio_format, **extra)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        with self.engines.use(language) as slot:
+            start = time.perf_counter()
+            audio = slot.synthesize(text, speaker, speed)
+            synthesized = time.perf_counter()
+            audio_data = self.encode_audio(audio, audio_format, sample_rate, slot.sample_rate)
+        self.stats.observe_synthesis(len(text), synthesized - start, len(audio) / slot.sample_rate)
+        self.stats.observe_encode(time.perf_counter() - synthesized)
+        if key is not None:
+            self.cache.put(key, audio_data)
+        return audio_data
+
+    def encode_audio(self, audio, audio_format, sample_rate=0, src_rate=None):
+        """float 파형(src_rate, 기본: 모델 원본)을 요청 샘플레이트로 변환 후 요청 포맷 바이트로 인코딩"""
+        src_rate = src_rate or self.sample_rate
+        rate = self.output_rate(audio_format, sample_rate, src_rate)
+        # 캐시된 폴리페이즈 필터로 리샘플링 (같은 레이트면 그대로)
+        audio = resample(audio, src_rate, rate)
+        if audio_format == 'wav':
+            return encode_wav(audio, rate)
+        if audio_format == 'ogg':
+            return encode_opus(audio, rate, self.opus_bitrate)
+        if audio_format == 'pcm':
+            # 16-bit LE mono raw PCM
+            return float_to_pcm16(audio).tobytes()
+        return encode_mp3(audio, rate, self.mp3_bitrate)
+
+    def response_frames(self, status_code, payload=None, flags=0, seq=0, sample_rate=0):
+        """응답 프레임 조각 [헤더, 페이로드] (writer.writelines로 전송, sample_rate: 오디오 응답의 출력 샘플레이트)"""
+        # 상태 코드별 응답 수 (스트림은 청크 프레임이 아닌 종료/오류 프레임만 집계)
+        if not flags & self.FLAG_STREAM or flags & self.FLAG_END:
+            self.stats.count_status(status_code)
+        return proto.response_frames(status_code, payload, flags=flags, seq=seq, sample_rate=sample_rate)
+
+    async def handle_tts_stream(self, writer, text, audio_format, speed=1.0, sample_rate=0,
+                                language=None, speaker=None):
+        """문장 단위 스트리밍: 문장마다 합성 즉시 청크 프레임 전송 후 종료 프레임 전송"""
+        seq = 0
+        rate = self.output_rate(audio_format, sample_rate)
+        # 스트림 전체에 쓸 워커 슬롯을 첫 청크 전에 확보 (없으면 ERR_BUSY, 도중에는 거절 없음)
+        lease = self.executor.lease()
         try:
-            # WAV 우선 생성
-            wav_bytes = self.generate_wav_bytes(text)
-            if audio_format == 'wav':
-                audio_data = wav_bytes
-            else:
-                audio_data = self.convert_to_mp3_bytes(wav_bytes)
-            # 응답 헤더 생성 및 전송
-            header = self.create_response_header(self.SUCCESS, len(audio_data))
-            writer.write(header + audio_data)
+            for segment in self.segmenter.split(text):
+                audio_data = await lease.run(self.render_audio, segment, audio_format, speed, sample_rate,
+                                             language, speaker)
+                writer.writelines(self.response_frames(self.SUCCESS, audio_data, self.FLAG_STREAM, seq, rate))
+                await writer.drain()
+                seq += 1
+        finally:
+            lease.release()
+        writer.writelines(self.response_frames(self.SUCCESS, None, self.FLAG_STREAM | self.FLAG_END, seq))
+        await writer.drain()
+        return True
+
+    async def handle_tts_request(self, reader, writer, format_code, flags=0, speed=1.0, sample_rate=0, voice=(0, 0)):
+        """TTS 요청 처리 (voice: 헤더의 (LANG 코드, SPEAKER ID))"""
+        text = (await proto.read_body(reader)).decode('utf-8')
+        audio_format = self.FORMAT_MAP.get(format_code, 'mp3')
+        try:
+            language = self.engines.resolve(voice[0])
+        except VoiceError as e:
+            print(f"[WARNING] {e}")
+            language = None
+        if language is None or not self.MIN_SPEED <= speed <= self.MAX_SPEED or \
+                (sample_rate and sample_rate not in self.SAMPLE_RATES):
+            writer.writelines(self.response_frames(self.ERR_INVALID_PARAMETER))
+            await writer.drain()
+            return False
+        speaker = voice[1]
+        # 스트림 오류 프레임은 STREAM|END를 붙여 클라이언트가 종료를 알 수 있게 함
+        error_flags = self.FLAG_STREAM | self.FLAG_END if flags & self.FLAG_STREAM else 0
+        try:
+            if flags & self.FLAG_STREAM:
+                return await self.handle_tts_stream(writer, text, audio_format, speed, sample_rate,
+                                                    language, speaker)
+            audio_data = await self.executor.run(self.render_audio, text, audio_format, speed, sample_rate,
+                                                 language, speaker)
+            # 응답 헤더 + 오디오 (이어 붙이지 않고 조각 그대로 전송)
+            writer.writelines(self.response_frames(self.SUCCESS, audio_data, 0, 0,
+                                                   self.output_rate(audio_format, sample_rate)))
             await writer.drain()
             return True
+        except ExecutorBusy as e:
+            print(f"[WARNING] 요청 거절: {e}")
+            writer.writelines(self.response_frames(self.ERR_BUSY, None, error_flags))
+            await writer.drain()
+            return False
+        except VoiceError as e:
+            print(f"[WARNING] {e}")
+            writer.writelines(self.response_frames(self.ERR_INVALID_PARAMETER, None, error_flags))
+            await writer.drain()
+            return False
         except Exception as e:
             print(f"[ERROR] 오디오 생성 오류: {e}")
-            header = self.create_response_header(self.ERR_EXCEPTION)
-            writer.write(header)
+            writer.writelines(self.response_frames(self.ERR_EXCEPTION, None, error_flags))
+            await writer.drain()
+            return False
+
+    def run_admin_command(self, command):
+        """관리 명령 실행 → 결과 dict (잘못된 명령은 ValueError)"""
+        op = command.get("op")
+        if op == "cache_stats":
+            return {
+                "cache": self.cache.stats() if self.cache is not None else None,
+                "features": self.engine.features.stats() if self.engine.features is not None else None,
+                "prompts": self.prompts.stats() if self.prompts is not None else None,
+                "engines": self.engines.stats(),
+            }
+        if op == "cache_flush":
+            tier = command.get("tier", "all")
+            if self.cache is not None:
+                self.cache.clear(tier)
+            if tier in ("all", "features") and self.engine.features is not None:
+                self.engine.features.clear()
+            return {"cache": self.cache.stats() if self.cache is not None else None}
+        if op == "cache_seed":
+            # items: [{"text": ..., "format": "wav"|"mp3"|"ogg"|"pcm", "speed": 1.0, "language": "KR", "speaker": 0}, ...]
+            if self.cache is None:
+                raise ValueError("캐시가 비활성화되어 있습니다.")
+            seeded = 0
+            for item in command.get("items", []):
+                self.render_audio(item["text"], item.get("format", "mp3"), float(item.get("speed", 1.0)),
+                                  int(item.get("sample_rate", 0)), item.get("language"), item.get("speaker"))
+                seeded += 1
+            return {"seeded": seeded, "cache": self.cache.stats()}
+        if op == "prompt_list":
+            return {"prompts": self.prompts.ids() if self.prompts is not None else []}
+        if op == "prompt_reload":
+            # 매니페스트를 다시 읽어 변경된 항목만 렌더링하고 팩 파일 교체
+            if self.prompts is None:
+                raise ValueError("프롬프트 매니페스트(TTS_PROMPT_MANIFEST)가 설정되지 않았습니다.")
+            rendered, reused = self.prompts.build(self.render_prompt)
+            return {"rendered": rendered, "reused": reused, "prompts": self.prompts.stats()}
+        raise ValueError(f"알 수 없는 관리 명령: {op}")
+
+    async def handle_admin_request(self, reader, writer):
+        """관리 요청 처리 (바디: TEXT_LEN(4) + UTF-8 JSON, 응답: JSON)"""
+        body = await proto.read_body(reader)
+        try:
+            command = json.loads(body.decode('utf-8'))
+            if self.admin_token and command.get("token") != self.admin_token:
+                writer.writelines(self.response_frames(self.ERR_INVALID_REQUEST))
+                await writer.drain()
+                return False
+            if command.get("op") in ("cache_seed", "prompt_reload"):
+                # 합성이 필요한 명령은 워커 풀에서 실행
+                result = await self.executor.run(self.run_admin_command, command)
+            else:
+                result = self.run_admin_command(command)
+        except ExecutorBusy as e:
+            print(f"[WARNING] 관리 요청 거절: {e}")
+            writer.writelines(self.response_frames(self.ERR_BUSY))
+            await writer.drain()
+            return False
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"[ERROR] 관리 요청 오류: {e}")
+            writer.writelines(self.response_frames(self.ERR_INVALID_PARAMETER))
+            await writer.drain()
+            return False
+        except Exception as e:
+            print(f"[ERROR] 관리 요청 처리 오류: {e}")
+            writer.writelines(self.response_frames(self.ERR_EXCEPTION))
+            await writer.drain()
+            return False
+        payload = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        writer.writelines(self.response_frames(self.SUCCESS, payload))
+        await writer.drain()
+        return True
+
+    async def handle_prompt_request(self, reader, writer, format_code, sample_rate=0):
+        """사전 렌더링 프롬프트 요청 처리 (바디: TEXT_LEN(4) + UTF-8 프롬프트 ID, 합성 없음)"""
+        prompt_id = (await proto.read_body(reader)).decode('utf-8')
+        audio_format = self.FORMAT_MAP.get(format_code, 'mp3')
+        if sample_rate and sample_rate not in self.SAMPLE_RATES:
+            writer.writelines(self.response_frames(self.ERR_INVALID_PARAMETER))
+            await writer.drain()
+            return False
+        pcm = self.prompts.get(prompt_id) if self.prompts is not None else None
+        if pcm is None:
+            writer.writelines(self.response_frames(self.ERR_NOT_FOUND))
+            await writer.drain()
+            return False
+        rate = self.output_rate(audio_format, sample_rate)
+        try:
+            if rate == self.sample_rate and audio_format in ('wav', 'pcm'):
+                audio_data = self.encode_pcm16(pcm, audio_format, sample_rate)
+            else:
+                # 인코딩/리샘플링만 필요 (합성 대기열과 별도로 기본 스레드 풀에서 실행)
+                audio_data = await asyncio.get_running_loop().run_in_executor(
+                    None, self.encode_pcm16, pcm, audio_format, sample_rate)
+        except Exception as e:
+            print(f"[ERROR] 프롬프트 인코딩 오류: {e}")
+            writer.writelines(self.response_frames(self.ERR_EXCEPTION))
             await writer.drain()
             return False
+        writer.writelines(self.response_frames(self.SUCCESS, audio_data, 0, 0, rate))
+        await writer.drain()
+        return True
 
     async def handle_ping_request(self, reader, writer):
-        """Ping 요청 처리"""
-        header = self.create_response_header(self.SUCCESS)
-        writer.write(header)
+        """Ping 요청 처리 (워밍업 중에는 ERR_NOT_READY)"""
+        writer.writelines(self.response_frames(self.SUCCESS if self.ready else self.ERR_NOT_READY))
+        await writer.drain()
+        return True
+
+    async def handle_stats_request(self, reader, writer):
+        """통계 요청 처리 (바디 없음, 응답: UTF-8 JSON)"""
+        result = self.stats.snapshot()
+        result["ready"] = self.ready
+        result["backend"] = self.engines.backend
+        result["executor"] = self.executor.stats()
+        if self.cache is not None:
+            cache = self.cache.stats()
+            result["cache"] = {"requests": cache["requests"], "hits": cache["hits"], "hit_rate": cache["hit_rate"]}
+        else:
+            result["cache"] = None
+        payload = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        writer.writelines(self.response_frames(self.SUCCESS, payload))
         await writer.drain()
         return True
 
     async def handle_client(self, reader, writer):
         addr = writer.get_extra_info('peername')
         try:
-            header = await reader.readexactly(self.HEADER_SIZE)
-            if header[0:4] != self.CHECKCODE:
-                writer.write(self.create_response_header(self.ERR_CHECKCODE_MISMATCH))
+            header = await proto.read_header(reader)
+            if not header.valid:
+                writer.writelines(self.response_frames(self.ERR_CHECKCODE_MISMATCH))
                 await writer.drain()
                 return
-            req_code = header[4]
-            fmt_code = header[5]
-            if req_code == self.REQ_TTS:
-                await self.handle_tts_request(reader, writer, fmt_code)
-            elif req_code == self.REQ_PING:
-                await self.handle_ping_request(reader, writer)
-            else:
-                writer.write(self.create_response_header(self.ERR_UNKNOWN_CODE))
-                await writer.drain()
+            req_code = header.code
+            with self.stats.track(self.REQUEST_NAMES.get(req_code, 'unknown')):
+                if req_code in (self.REQ_TTS, self.REQ_PROMPT) and not self.ready:
+                    # 워밍업 중에는 엔진을 함께 쓰지 않도록 합성 요청 거절
+                    writer.writelines(self.response_frames(self.ERR_NOT_READY))
+                    await writer.drain()
+                elif req_code == self.REQ_TTS:
+                    # SPEED (x100, 0이면 1.0) / SAMPLE_RATE (0이면 원본) / LANG (0이면 기본 언어) / SPEAKER
+                    await self.handle_tts_request(reader, writer, header.fmt, header.flags, header.speed,
+                                                  header.sample_rate, (header.lang, header.speaker))
+                elif req_code == self.REQ_PROMPT:
+                    await self.handle_prompt_request(reader, writer, header.fmt, header.sample_rate)
+                elif req_code == self.REQ_ADMIN:
+                    await self.handle_admin_request(reader, writer)
+                elif req_code == self.REQ_STATS:
+                    await self.handle_stats_request(reader, writer)
+                elif req_code == self.REQ_PING:
+                    await self.handle_ping_request(reader, writer)
+                else:
+                    writer.writelines(self.response_frames(self.ERR_UNKNOWN_CODE))
+                    await writer.drain()
         except asyncio.IncompleteReadError:
-            writer.write(self.create_response_header(self.ERR_INVALID_DATA))
+            writer.writelines(self.response_frames(self.ERR_INVALID_DATA))
             await writer.drain()
         finally:
             writer.close()
             await writer.wait_closed()
 
-    async def run_server(self):
-        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+    async def run_server(self, reuse_port=False):
+        """reuse_port=True: 여러 프로세스가 같은 포트를 공유 (SO_REUSEPORT, 커널이 연결 분배)"""
+        server = await asyncio.start_server(self.handle_client, self.host, self.port,
+                                            reuse_port=reuse_port or None)
         addr = server.sockets[0].getsockname()
-        print(f"[INFO] MeloTTS 서버 시작: {addr}")
+        print(f"[INFO] MeloTTS 서버 시작: {addr} pid={os.getpid()} (workers={self.executor.workers}, queue_limit={self.executor.queue_limit})")
+        # 리스닝 시작 후 워밍업 (그동안 PING/TTS/PROMPT는 ERR_NOT_READY)
+        self._warmup_task = asyncio.create_task(self.run_warmup())
         async with server:
             await server.serve_forever()
 
 
 def start_server(host="0.0.0.0", port=2501, language="KR", device="cuda"):
-    tts_server = TTSServer(host, port, language, device)
+    tts_server = TTSServer(host, port, language, device, cache=AudioCache.from_env())
     asyncio.run(tts_server.run_server())
 
 if __name__ == '__main__':
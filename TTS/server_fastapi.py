@@ -3,22 +3,30 @@
 # created: 2025-05-20
 # 이 주석은 수정하지 마세요.
 
-import os, io, tempfile, argparse
+import os, time, asyncio, argparse
 from typing import Literal
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import Response, StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from melo.api import TTS
-from pydub import AudioSegment
 import uvicorn
 
 from fastapi.middleware.cors import CORSMiddleware
 
+from audio_codec import (encode_wav, encode_mp3, encode_opus, float_to_pcm16, resample,
+                         StreamEncoder, OPUS_SAMPLE_RATES, SUPPORTED_SAMPLE_RATES)
+from tts_executor import SynthesisExecutor, ExecutorBusy
+from text_segmenter import Segmenter
+
 class TTSRequest(BaseModel):
     text: str
-    format: Literal["wav", "mp3"] = "mp3"
+    format: Literal["wav", "mp3", "ogg", "pcm"] = "mp3"   # pcm: 16-bit LE mono raw
     speed: float = 1.0             # 0.5 ~ 2.0
+    stream: bool = False           # True: 문장 단위 청크 스트리밍
+    sample_rate: int = 0           # 출력 샘플레이트 (0이면 모델 원본)
+
+FILE_EXTS = {"wav": "wav", "mp3": "mp3", "ogg": "ogg", "pcm": "pcm"}
 
 class TTSWebAPI:
     """MeloTTS + FastAPI 서버를 하나의 클래스에 캡슐화"""
@@ -27,6 +35,10 @@ class TTSWebAPI:
         self.host, self.port = host, port
         self.engine = TTS(language=language, device=device)
         self.spk_id = spk_id
+        self.sample_rate = self.engine.hps.data.sampling_rate
+        # 합성/인코딩 워커 풀 (TTS_WORKERS / TTS_QUEUE_LIMIT)
+        self.executor = SynthesisExecutor.from_env()
+        self.segmenter = Segmenter.from_env()
         self.app = FastAPI(
             title="MeloTTS Web API",
             version="1.0.0",
@@ -39,7 +51,7 @@ class TTSWebAPI:
             allow_origins=["http://106.255.251.154:21038"],  # 또는 ["*"]
             allow_methods=["POST", "OPTIONS"],
             allow_headers=["Content-Type", "Authorization"],
-            expose_headers=["Content-Disposition"],        # 다운로드용
+            expose_headers=["Content-Disposition", "X-TTFB-Ms", "X-Sample-Rate"],  # 다운로드 / 스트리밍 지표
             allow_credentials=True,                        # 필요 시
         )
         
@@ -48,24 +60,82 @@ class TTSWebAPI:
     # ──────────────────────────────────────────────
     # 내부 유틸
     # ──────────────────────────────────────────────
-    def _synthesize_wav(self, text: str, speed: float) -> bytes:
-        tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        path = tmp.name
-        tmp.close()
-        self.engine.tts_to_file(text, self.spk_id, path, speed=speed, quiet=True)
-        with open(path, "rb") as f:
-            data = f.read()
-        os.remove(path)
-        return data
-
-    @staticmethod
-    def _wav_to_mp3(wav_bytes: bytes) -> bytes:
-        buf_in = io.BytesIO(wav_bytes)
-        audio = AudioSegment.from_file(buf_in, format="wav")
-        buf_out = io.BytesIO()
-        audio.export(buf_out, format="mp3", bitrate="192k")
-        buf_out.seek(0)
-        return buf_out.read()
+    def _output_rate(self, fmt: str, sample_rate: int = 0) -> int:
+        """실제 출력 샘플레이트 (요청값, 없으면 모델 원본 / ogg는 Opus 미지원 레이트면 48000)"""
+        rate = sample_rate or self.sample_rate
+        if fmt == "ogg" and rate not in OPUS_SAMPLE_RATES:
+            return 48000
+        return rate
+
+    def _synthesize(self, text: str, speed: float, rate: int = 0):
+        # output_path=None → 파형을 메모리로 받음 (임시 파일 없음), 필요 시 출력 레이트로 리샘플링
+        audio = self.engine.tts_to_file(text, self.spk_id, None, speed=speed, quiet=True)
+        return resample(audio, self.sample_rate, rate or self.sample_rate)
+
+    def _render(self, text: str, speed: float, fmt: str, rate: int) -> bytes:
+        """합성 + 인코딩 (워커 스레드에서 실행)"""
+        audio = self._synthesize(text, speed, rate)
+        if fmt == "wav":
+            return encode_wav(audio, rate)
+        if fmt == "ogg":
+            return encode_opus(audio, rate)
+        if fmt == "pcm":
+            return float_to_pcm16(audio).tobytes()
+        # 프로세스 내 MP3 인코딩 (lameenc 미설치 시 ffmpeg 대체 경로)
+        return encode_mp3(audio, rate)
+
+    def _render_chunk(self, encoder: StreamEncoder, text: str, speed: float) -> bytes:
+        """문장 하나 합성 → 증분 인코딩 (워커 스레드에서 실행)"""
+        return encoder.feed(self._synthesize(text, speed, encoder.sample_rate))
+
+    async def _stream_response(self, text: str, speed: float, fmt: str, rate: int):
+        """문장마다 합성 즉시 청크를 내보내는 StreamingResponse (첫 청크는 응답 전에 합성)"""
+        segments = self.segmenter.split(text)
+        try:
+            encoder = StreamEncoder(fmt, rate)
+            head = encoder.start()
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        started = time.perf_counter()
+        try:
+            # 스트림 전체에 쓸 워커 슬롯을 응답 시작 전에 확보 (없으면 503, 스트림 도중에는 거절 없음)
+            lease = self.executor.lease()
+        except ExecutorBusy:
+            raise HTTPException(503, "서버가 사용 중입니다. 잠시 후 다시 시도하세요.",
+                                headers={"Retry-After": "1"})
+        try:
+            first = await lease.run(self._render_chunk, encoder, segments[0], speed)
+        except BaseException:
+            lease.release(encoder.close)
+            raise
+        ttfb = (time.perf_counter() - started) * 1000
+
+        async def body():
+            tail = b''
+            try:
+                yield head + first
+                for segment in segments[1:]:
+                    chunk = await lease.run(self._render_chunk, encoder, segment, speed)
+                    if chunk:
+                        yield chunk
+                tail = encoder.close()
+            finally:
+                # 클라이언트가 끊겨도 인코더를 닫음 (실행 중인 문장 작업이 있으면 그 작업이 끝난 뒤)
+                lease.release(encoder.close)
+            if tail:
+                yield tail
+            print(f"[INFO] 스트리밍 완료 - 문장 {len(segments)}개, TTFB {ttfb:.1f} ms, "
+                  f"총 {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        return StreamingResponse(
+            body(),
+            media_type=encoder.media_type,
+            headers={
+                "Content-Disposition": f'inline; filename="speech.{FILE_EXTS[fmt]}"',
+                "X-TTFB-Ms": f"{ttfb:.1f}",
+                "X-Sample-Rate": str(rate),
+            },
+        )
 
     # ──────────────────────────────────────────────
     # 라우트 등록
@@ -79,7 +149,7 @@ class TTSWebAPI:
                 "service": "MeloTTS REST API (class version)",
                 "version": "1.0.0",
                 "endpoints": {
-                    "POST /tts": "텍스트를 오디오로 변환",
+                    "POST /tts": "텍스트를 오디오로 변환 (stream=true: 문장 단위 청크 스트리밍)",
                 },
             }
 
@@ -89,18 +159,27 @@ class TTSWebAPI:
             if not text:
                 raise HTTPException(400, "text 파라미터가 비어 있습니다.")
 
-            wav_bytes = self._synthesize_wav(text, req.speed)
-
-            if req.format == "wav":
-                audio_bytes, media_type, fname = wav_bytes, "audio/wav", "speech.wav"
-            else:
-                audio_bytes = self._wav_to_mp3(wav_bytes)
-                media_type, fname = "audio/mpeg", "speech.mp3"
-
-            return StreamingResponse(
-                io.BytesIO(audio_bytes),
-                media_type=media_type,
-                headers={"Content-Disposition": f'attachment; filename="{fname}"'},
+            if req.sample_rate and req.sample_rate not in SUPPORTED_SAMPLE_RATES:
+                raise HTTPException(400, f"지원하지 않는 sample_rate: {req.sample_rate} (허용: {SUPPORTED_SAMPLE_RATES})")
+            rate = self._output_rate(req.format, req.sample_rate)
+
+            if req.stream:
+                return await self._stream_response(text, req.speed, req.format, rate)
+
+            try:
+                # 블로킹 합성은 워커 풀에서 실행 (이벤트 루프 유지)
+                audio_bytes = await self.executor.run(self._render, text, req.speed, req.format, rate)
+            except ExecutorBusy:
+                raise HTTPException(503, "서버가 사용 중입니다. 잠시 후 다시 시도하세요.",
+                                    headers={"Retry-After": "1"})
+
+            return Response(
+                audio_bytes,
+                media_type=StreamEncoder.MEDIA_TYPES[req.format],
+                headers={
+                    "Content-Disposition": f'attachment; filename="speech.{FILE_EXTS[req.format]}"',
+                    "X-Sample-Rate": str(rate),
+                },
             )
 
     # ──────────────────────────────────────────────
@@ -1,41 +1,64 @@
 # filename: tts_client_ui.py
 # Author: [based on tts_client.py]
 # Created: 2025-03-26
-# Description: TTS Client with Tkinter UI
+# Description: TTS Client with Tkinter UI (+ headless 부하 테스트 모드: --load)
+#
+# 사용 예:
+#   python test_client.py                                              # UI
+#   python test_client.py --load --host 127.0.0.1 --port 2501 -c 8 --duration 60
+#   python test_client.py --load -c 4 --requests 200 --format mp3 --stream --corpus texts.txt --json load.json
 
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
 import socket
-import struct
 import sys
 import io
 import os
+import json
+import random
+import asyncio
+import argparse
 import threading
-import pygame  # pip install pygame
 import time
 import tempfile
+import wave
+
+from voice_protocol import tts as proto
+
+# UI 전용 의존성 (부하 테스트 모드는 없어도 동작)
+try:
+    import tkinter as tk
+    from tkinter import ttk, scrolledtext, messagebox, filedialog
+    import pygame  # pip install pygame
+except ImportError:
+    tk = pygame = None
 
 class TTSClientApp:
     # 상태 코드 정의
-    SUCCESS = 0
-    ERR_CHECKCODE_MISMATCH = 1
-    ERR_INVALID_DATA = 2
-    ERR_INVALID_REQUEST = 3
-    ERR_INVALID_PARAMETER = 4
-    ERR_INVALID_FORMAT = 5
-    ERR_UNKNOWN_CODE = 8
-    ERR_EXCEPTION = 9
-    ERR_TIMEOUT = 10
+    SUCCESS = proto.SUCCESS
+    ERR_CHECKCODE_MISMATCH = proto.ERR_CHECKCODE_MISMATCH
+    ERR_INVALID_DATA = proto.ERR_INVALID_DATA
+    ERR_INVALID_REQUEST = proto.ERR_INVALID_REQUEST
+    ERR_INVALID_PARAMETER = proto.ERR_INVALID_PARAMETER
+    ERR_INVALID_FORMAT = proto.ERR_INVALID_FORMAT
+    ERR_NOT_FOUND = proto.ERR_NOT_FOUND
+    ERR_UNKNOWN_CODE = proto.ERR_UNKNOWN_CODE
+    ERR_EXCEPTION = proto.ERR_EXCEPTION
+    ERR_TIMEOUT = proto.ERR_TIMEOUT
+    ERR_BUSY = proto.ERR_BUSY
+    ERR_NOT_READY = proto.ERR_NOT_READY
     
     # 요청 코드 정의
-    REQ_TTS = 0x01
-    REQ_PING = 99
+    REQ_TTS = proto.REQ_TTS
+    REQ_PING = proto.REQ_PING
+    
+    # 헤더 FLAGS (byte 6) 비트
+    FLAG_STREAM = proto.FLAG_STREAM
+    FLAG_END = proto.FLAG_END
     
     # 헤더 사이즈
-    HEADER_SIZE = 32
+    HEADER_SIZE = proto.HEADER_SIZE
     
     # 체크코드 (고정값 - 서버와 클라이언트 간 약속된 값)
-    CHECKCODE = b'TTS1'  # 체크코드는 4바이트
+    CHECKCODE = proto.CHECKCODE  # 체크코드는 4바이트
     
     def __init__(self, root):
         self.root = root
@@ -46,9 +69,14 @@ class TTSClientApp:
         # 오디오 포맷 매핑
         self.formats = {
             "WAV": 1,
-            "MP3": 2
+            "MP3": 2,
+            "OGG": 3,   # Ogg Opus
+            "PCM": 4    # 16-bit LE mono raw
         }
         
+        # 출력 샘플레이트 선택 (원본 = 서버 모델 샘플레이트)
+        self.sample_rates = ["원본", "8000", "16000", "22050", "24000", "44100", "48000"]
+        
         # 에러 코드 매핑
         self.error_codes = {
             self.SUCCESS: "성공",
@@ -57,9 +85,12 @@ class TTSClientApp:
             self.ERR_INVALID_REQUEST: "잘못된 요청",
             self.ERR_INVALID_PARAMETER: "잘못된 매개변수",
             self.ERR_INVALID_FORMAT: "잘못된 포맷",
+            self.ERR_NOT_FOUND: "찾을 수 없음",
             self.ERR_UNKNOWN_CODE: "알 수 없는 코드",
             self.ERR_EXCEPTION: "서버 예외 발생",
-            self.ERR_TIMEOUT: "시간 초과"
+            self.ERR_TIMEOUT: "시간 초과",
+            self.ERR_BUSY: "서버 사용 중 (대기열 초과)",
+            self.ERR_NOT_READY: "서버 준비 중 (워밍업)"
         }
         
         # Pygame 초기화 (오디오 재생용)
@@ -68,6 +99,7 @@ class TTSClientApp:
         # 메모리에 오디오 데이터 저장
         self.audio_data = None
         self.audio_format = None
+        self.audio_rate = 0     # 응답 헤더의 출력 샘플레이트 (PCM 재생용)
         
         # UI 구성
         self.setup_ui()
@@ -108,6 +140,15 @@ class TTSClientApp:
         ttk.Radiobutton(request_frame, text="TTS", variable=self.request_type, value=self.REQ_TTS).pack(side=tk.LEFT)
         ttk.Radiobutton(request_frame, text="Ping", variable=self.request_type, value=self.REQ_PING).pack(side=tk.LEFT)
         
+        # 문장 단위 스트리밍 수신 여부
+        self.stream_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(server_frame, text="스트리밍 (문장 단위)", variable=self.stream_var).grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        ttk.Label(server_frame, text="샘플레이트:").grid(row=2, column=2, sticky=tk.W, padx=5, pady=5)
+        self.rate_combo = ttk.Combobox(server_frame, values=self.sample_rates, width=8)
+        self.rate_combo.current(0)
+        self.rate_combo.grid(row=2, column=3, sticky=tk.W, padx=5, pady=5)
+        
         # === 텍스트 입력 영역 ===
         text_frame = ttk.LabelFrame(main_frame, text="변환할 텍스트", padding="10")
         text_frame.pack(fill=tk.BOTH, expand=True, pady=5)
@@ -160,26 +201,72 @@ class TTSClientApp:
         self.log_area.see(tk.END)  # 스크롤을 항상 마지막으로
         self.log_area.config(state=tk.DISABLED)
         
-    def create_request_header(self, req_code, format_code=0):
-        """요청 헤더 생성 (32바이트)"""
-        header = bytearray(self.HEADER_SIZE)
-        
-        # 체크코드 삽입 (0-3 바이트)
-        header[0:4] = self.CHECKCODE
-        
-        # 요청 코드 (4 바이트)
-        header[4] = req_code
-        
-        # 포맷 코드 (5 바이트)
-        header[5] = format_code
-        
-        # 타임스탬프 (8-15 바이트)
-        timestamp = int(time.time())
-        struct.pack_into('!Q', header, 8, timestamp)
-        
-        # 나머지는 0으로 둠
-        
-        return header
+    def create_request_header(self, req_code, format_code=0, flags=0, sample_rate=0):
+        """요청 헤더 생성 (32바이트, 공용 코덱)"""
+        return proto.pack_header(req_code, format_code, flags, sample_rate=sample_rate)
+    
+    @staticmethod
+    def merge_wav_chunks(chunks):
+        """스트림으로 받은 WAV 청크들을 하나의 WAV로 병합"""
+        out = io.BytesIO()
+        writer = None
+        for chunk in chunks:
+            with wave.open(io.BytesIO(chunk), 'rb') as w:
+                if writer is None:
+                    writer = wave.open(out, 'wb')
+                    writer.setparams(w.getparams())
+                writer.writeframes(w.readframes(w.getnframes()))
+        if writer is not None:
+            writer.close()
+        return out.getvalue()
+    
+    @staticmethod
+    def merge_ogg_chunks(chunks):
+        """스트림으로 받은 Ogg Opus 청크들을 각각 디코딩해 하나의 WAV로 병합 (soundfile은 연쇄 Ogg를 읽지 못함)"""
+        import soundfile  # pip install soundfile
+        out = io.BytesIO()
+        writer = None
+        for chunk in chunks:
+            data, sr = soundfile.read(io.BytesIO(chunk), dtype='int16')
+            if writer is None:
+                writer = wave.open(out, 'wb')
+                writer.setnchannels(1)
+                writer.setsampwidth(2)
+                writer.setframerate(sr)
+            writer.writeframes(data.tobytes())
+        if writer is not None:
+            writer.close()
+        return out.getvalue()
+    
+    def receive_stream(self, sock, format_code):
+        """스트리밍 응답 수신: 종료 프레임까지 청크 프레임을 모아 하나의 오디오로 병합 → (오디오, 확장자)"""
+        chunks = []
+        start = time.time()
+        while True:
+            response_header = proto.recv_header(sock)
+            if not response_header.valid:
+                raise ValueError(f"체크코드 불일치: 수신값={response_header.checkcode}")
+            status = response_header.code
+            if status != self.SUCCESS:
+                raise ValueError(f"서버 오류 발생: {self.error_codes.get(status, '알 수 없는 오류')}")
+            size = response_header.payload_size
+            seq = response_header.seq
+            if response_header.flags & self.FLAG_END:
+                break
+            self.audio_rate = response_header.sample_rate
+            chunk = proto.recv_exact(sock, size)
+            chunks.append(chunk)
+            if seq == 0:
+                self.log(f"첫 청크 수신: {time.time() - start:.3f}초 ({size} 바이트)")
+            else:
+                self.log(f"청크 #{seq} 수신: {size} 바이트")
+        self.log(f"스트림 종료: 청크 {len(chunks)}개, {time.time() - start:.3f}초")
+        if format_code == 1:
+            return self.merge_wav_chunks(chunks), 'wav'
+        if format_code == 3:
+            return self.merge_ogg_chunks(chunks), 'wav'
+        # MP3 프레임 / PCM 샘플은 이어 붙여도 재생 가능
+        return b''.join(chunks), {2: 'mp3', 4: 'pcm'}.get(format_code, 'wav')
     
     def send_request(self):
         """요청을 서버로 전송"""
@@ -226,19 +313,17 @@ class TTSClientApp:
             self.log("핑 요청 전송 완료")
             
             # 응답 헤더 수신 (32바이트)
-            response_header = sock.recv(self.HEADER_SIZE)
+            response_header = proto.recv_header(sock)
             
             # 체크코드 확인 (0-3 바이트)
-            checkcode = response_header[0:4]
-            
-            if checkcode != self.CHECKCODE:
-                error_msg = f"체크코드 불일치: 기대값={self.CHECKCODE}, 수신값={checkcode}"
+            if not response_header.valid:
+                error_msg = f"체크코드 불일치: 기대값={self.CHECKCODE}, 수신값={response_header.checkcode}"
                 self.log(error_msg)
                 self.root.after(0, lambda: messagebox.showerror("오류", error_msg))
                 return
             
             # 상태 코드 확인 (4 바이트)
-            status = response_header[4]
+            status = response_header.code
             
             if status != self.SUCCESS:
                 error_msg = f"서버 오류 발생: {self.error_codes.get(status, '알 수 없는 오류')}"
@@ -271,6 +356,9 @@ class TTSClientApp:
         format_name = self.format_combo.get()
         format_code = self.formats[format_name]
         text = self.text_input.get("1.0", tk.END).strip()
+        stream = self.stream_var.get()
+        rate_name = self.rate_combo.get()
+        sample_rate = int(rate_name) if rate_name.isdigit() else 0
         
         if not text:
             messagebox.showwarning("경고", "변환할 텍스트를 입력해주세요.")
@@ -280,15 +368,15 @@ class TTSClientApp:
         
         # 스레드에서 실행 (UI 응답성 유지)
         thread = threading.Thread(target=self.send_text_to_tts_thread, 
-                                 args=(host, port, text, format_code))
+                                 args=(host, port, text, format_code, stream, sample_rate))
         thread.daemon = True
         thread.start()
     
-    def send_text_to_tts_thread(self, host, port, text, format_code):
+    def send_text_to_tts_thread(self, host, port, text, format_code, stream=False, sample_rate=0):
         """별도 스레드에서 TTS 서버에 요청 전송"""
         try:
             # 포맷 코드에 따른 확장자 매핑
-            format_extensions = {1: 'wav', 2: 'mp3'}
+            format_extensions = {1: 'wav', 2: 'mp3', 3: 'ogg', 4: 'pcm'}
             
             # 소켓 연결
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -297,31 +385,36 @@ class TTSClientApp:
             self.log(f"서버 연결 중: {host}:{port}")
             sock.connect((host, port))
             
-            # 헤더 생성 및 전송
-            header = self.create_request_header(self.REQ_TTS, format_code)
-            sock.sendall(header)
-            
-            # 텍스트 데이터 전송
+            # 헤더 + 텍스트 길이 + 텍스트 전송
+            flags = self.FLAG_STREAM if stream else 0
             text_bytes = text.encode('utf-8')
-            sock.sendall(struct.pack('!I', len(text_bytes)))
-            sock.sendall(text_bytes)
+            proto.send_frames(sock, proto.request_frames(self.REQ_TTS, text_bytes, fmt=format_code, flags=flags,
+                                                         sample_rate=sample_rate))
             
             self.log(f"텍스트 전송 완료: {len(text_bytes)} 바이트")
             
+            if stream:
+                audio_data, audio_format = self.receive_stream(sock, format_code)
+                self.audio_data = audio_data
+                self.audio_format = audio_format
+                self.root.after(0, lambda: self.status_var.set(f"스트림 수신 완료: 메모리에 {len(audio_data)} 바이트 저장됨"))
+                self.root.after(0, lambda: self.convert_button.config(state=tk.NORMAL))
+                self.root.after(0, lambda: self.play_button.config(state=tk.NORMAL))
+                self.root.after(0, lambda: self.save_button.config(state=tk.NORMAL))
+                return
+            
             # 응답 헤더 수신 (32바이트)
-            response_header = sock.recv(self.HEADER_SIZE)
+            response_header = proto.recv_header(sock)
             
             # 체크코드 확인 (0-3 바이트)
-            checkcode = response_header[0:4] 
-            
-            if checkcode != self.CHECKCODE:
-                error_msg = f"체크코드 불일치: 기대값={self.CHECKCODE}, 수신값={checkcode}"
+            if not response_header.valid:
+                error_msg = f"체크코드 불일치: 기대값={self.CHECKCODE}, 수신값={response_header.checkcode}"
                 self.log(error_msg)
                 self.root.after(0, lambda: messagebox.showerror("오류", error_msg))
                 return
             
             # 상태 코드 확인 (4 바이트)
-            status = response_header[4]
+            status = response_header.code
             
             if status != self.SUCCESS:
                 error_msg = f"서버 오류 발생: {self.error_codes.get(status, '알 수 없는 오류')}"
@@ -330,16 +423,13 @@ class TTSClientApp:
                 return
             
             # 페이로드 크기 확인 (16-19 바이트)
-            audio_size = struct.unpack('!I', response_header[16:20])[0]
+            audio_size = response_header.payload_size
+            # 출력 샘플레이트 (20-23 바이트)
+            self.audio_rate = response_header.sample_rate
             self.log(f"수신할 오디오 데이터 크기: {audio_size} 바이트")
             
-            # 오디오 데이터 수신
-            audio_data = b''
-            while len(audio_data) < audio_size:
-                chunk = sock.recv(min(4096, audio_size - len(audio_data)))
-                if not chunk:
-                    break
-                audio_data += chunk
+            # 오디오 데이터 수신 (미리 할당한 버퍼에 바로 수신)
+            audio_data = bytes(proto.recv_exact(sock, audio_size))
             
             self.log(f"오디오 데이터 수신 완료: {len(audio_data)} 바이트")
             
@@ -362,6 +452,26 @@ class TTSClientApp:
         finally:
             sock.close()
     
+    @staticmethod
+    def pcm_to_wav(pcm, sample_rate):
+        """16-bit LE mono raw PCM → WAV 바이트"""
+        out = io.BytesIO()
+        with wave.open(out, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(sample_rate)
+            w.writeframes(pcm)
+        return out.getvalue()
+    
+    @staticmethod
+    def ogg_to_wav(ogg):
+        """Ogg Opus → WAV 바이트 (pygame이 Opus를 지원하지 않을 때, soundfile 필요)"""
+        import soundfile  # pip install soundfile
+        data, sr = soundfile.read(io.BytesIO(ogg), dtype='int16')
+        out = io.BytesIO()
+        soundfile.write(out, data, sr, format='WAV', subtype='PCM_16')
+        return out.getvalue()
+    
     def play_audio(self):
         """메모리에 저장된 오디오 데이터 재생"""
         if self.audio_data is None:
@@ -372,13 +482,27 @@ class TTSClientApp:
             # 현재 재생 중인 오디오 중지
             pygame.mixer.music.stop()
             
+            # PCM은 WAV로 감싸서 재생
+            play_data, play_ext = self.audio_data, self.audio_format
+            if self.audio_format == 'pcm':
+                play_data, play_ext = self.pcm_to_wav(self.audio_data, self.audio_rate or 44100), 'wav'
+            
             # 임시 파일 생성 (pygame은 파일이나 파일 객체가 필요함)
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".{self.audio_format}")
-            temp_file.write(self.audio_data)
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".{play_ext}")
+            temp_file.write(play_data)
             temp_file.close()
             
             # 새 오디오 로드 및 재생
-            pygame.mixer.music.load(temp_file.name)
+            try:
+                pygame.mixer.music.load(temp_file.name)
+            except pygame.error:
+                if self.audio_format != 'ogg':
+                    raise
+                # SDL_mixer에 Opus 디코더가 없으면 WAV로 디코딩 후 재생
+                self.log("pygame Opus 미지원 - WAV로 변환 후 재생")
+                with open(temp_file.name, 'wb') as f:
+                    f.write(self.ogg_to_wav(self.audio_data))
+                pygame.mixer.music.load(temp_file.name)
             pygame.mixer.music.play()
             
             self.status_var.set(f"재생 중: 메모리에 저장된 오디오")
@@ -455,10 +579,244 @@ class TTSClientApp:
             self.log(f"설정 불러오기 실패: {str(e)}")
             self.status_var.set("설정 불러오기 실패")
 
+# 부하 테스트 기본 코퍼스
+LOAD_CORPUS = [
+    "안녕하세요.",
+    "잠시만 기다려 주세요.",
+    "오늘 서울의 날씨는 맑고 낮 최고 기온은 이십삼 도로 예상됩니다.",
+    "주문하신 상품은 내일 오전 중에 도착할 예정이며, 배송 조회는 앱에서 가능합니다.",
+    "간장 공장 공장장은 강 공장장이고 된장 공장 공장장은 장 공장장이다.",
+    "고객님, 문의하신 내용에 대해 안내해 드리겠습니다. 현재 요금제는 매월 오십 기가바이트의 데이터를 제공하며, "
+    "초과 시 속도가 제한됩니다.",
+]
+
+class ProtocolError(Exception):
+    """응답 헤더 검증 실패"""
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class LoadTester:
+    """
+    headless 부하 테스트: connections개의 asyncio 워커가 각각 연결 → TTS 요청 → 응답 수신을 반복
+    (서버는 연결당 요청 하나), 응답 헤더를 검증하고 상태 코드별로 집계
+    클라이언트 측 실패는 bad_header(헤더 검증 실패) / timeout / connection으로 분류
+    """
+
+    def __init__(self, host, port, texts, connections=4, duration=None, requests=None,
+                 format_code=1, stream=False, sample_rate=0, timeout=30.0):
+        self.host = host
+        self.port = port
+        self.texts = texts
+        self.connections = connections
+        self.duration = duration
+        self.requests = requests
+        self.format_code = format_code
+        self.stream = stream
+        self.sample_rate = sample_rate
+        self.timeout = timeout
+        self.latencies = []
+        self.ttfbs = []
+        self.statuses = {}
+        self.audio_bytes = 0
+        self.sent = 0
+
+    @staticmethod
+    def status_name(status):
+        for name, value in vars(TTSClientApp).items():
+            if (name == "SUCCESS" or name.startswith("ERR_")) and value == status:
+                return name
+        return f"STATUS_{status}"
+
+    def check_header(self, header, seq=None):
+        """체크코드 / 상태 / 스트림 플래그·SEQ / 샘플레이트 검증 → (status, flags, size)"""
+        if not header.valid:
+            raise ProtocolError(f"체크코드 불일치: {header.checkcode!r}")
+        status, flags = header.code, header.flags
+        size, rate, resp_seq = header.payload_size, header.sample_rate, header.seq
+        if status != TTSClientApp.SUCCESS:
+            if size:
+                raise ProtocolError(f"오류 응답에 페이로드 {size} 바이트")
+            return status, flags, size
+        if self.stream:
+            if not flags & TTSClientApp.FLAG_STREAM:
+                raise ProtocolError("스트림 응답에 STREAM 플래그 없음")
+            if resp_seq != seq:
+                raise ProtocolError(f"SEQ 불일치: 기대값={seq}, 수신값={resp_seq}")
+            if flags & TTSClientApp.FLAG_END:
+                if size:
+                    raise ProtocolError(f"종료 프레임에 페이로드 {size} 바이트")
+                return status, flags, size
+        elif flags & TTSClientApp.FLAG_STREAM:
+            raise ProtocolError("단일 응답에 STREAM 플래그")
+        if size == 0:
+            raise ProtocolError("오디오 페이로드 없음")
+        # Ogg는 Opus 미지원 레이트를 48000으로 올리므로 제외
+        if self.sample_rate and self.format_code != 3 and rate != self.sample_rate:
+            raise ProtocolError(f"샘플레이트 불일치: 요청={self.sample_rate}, 응답={rate}")
+        return status, flags, size
+
+    async def request(self, text):
+        """요청 1회 → (status, ttfb), 검증 실패 시 ProtocolError"""
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.writelines(proto.request_frames(proto.REQ_TTS, text, fmt=self.format_code,
+                                                   flags=proto.FLAG_STREAM if self.stream else 0,
+                                                   sample_rate=self.sample_rate))
+            await writer.drain()
+            seq, ttfb = 0, None
+            while True:
+                status, flags, size = self.check_header(await proto.read_header(reader), seq)
+                if status != TTSClientApp.SUCCESS or flags & TTSClientApp.FLAG_END:
+                    return status, ttfb
+                await reader.readexactly(size)
+                self.audio_bytes += size
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+                if not self.stream:
+                    return status, ttfb
+                seq += 1
+        finally:
+            writer.close()
+
+    def record(self, name, latency=None, ttfb=None, detail=None):
+        # 실패 상세는 분류별 첫 번째만 출력
+        if detail and name not in self.statuses:
+            print(f"[WARNING] {name}: {detail}")
+        self.statuses[name] = self.statuses.get(name, 0) + 1
+        if latency is not None:
+            self.latencies.append(latency)
+        if ttfb is not None:
+            self.ttfbs.append(ttfb)
+
+    async def worker(self, deadline):
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if self.requests is not None and self.sent >= self.requests:
+                return
+            self.sent += 1
+            text = random.choice(self.texts)
+            start = time.perf_counter()
+            try:
+                status, ttfb = await asyncio.wait_for(self.request(text), self.timeout)
+            except ProtocolError as e:
+                self.record("bad_header", detail=e)
+                continue
+            except asyncio.TimeoutError:
+                self.record("timeout")
+                continue
+            except (OSError, asyncio.IncompleteReadError) as e:
+                self.record("connection", detail=e)
+                await asyncio.sleep(0.1)
+                continue
+            latency = time.perf_counter() - start
+            if status == TTSClientApp.SUCCESS:
+                self.record("SUCCESS", latency, ttfb)
+            else:
+                self.record(self.status_name(status))
+
+    async def run(self):
+        deadline = time.perf_counter() + self.duration if self.duration else None
+        start = time.perf_counter()
+        await asyncio.gather(*[self.worker(deadline) for _ in range(self.connections)])
+        return self.report(time.perf_counter() - start)
+
+    def report(self, wall):
+        total = sum(self.statuses.values())
+        ok = self.statuses.get("SUCCESS", 0)
+        return {
+            "host": f"{self.host}:{self.port}",
+            "connections": self.connections,
+            "format": self.format_code,
+            "stream": self.stream,
+            "sample_rate": self.sample_rate,
+            "wall_seconds": wall,
+            "requests": total,
+            "success": ok,
+            "throughput_rps": ok / wall if wall else 0.0,
+            "audio_bytes_per_sec": self.audio_bytes / wall if wall else 0.0,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p95": percentile(self.latencies, 95),
+            "latency_p99": percentile(self.latencies, 99),
+            "ttfb_p50": percentile(self.ttfbs, 50),
+            "ttfb_p95": percentile(self.ttfbs, 95),
+            "statuses": dict(sorted(self.statuses.items(), key=lambda kv: -kv[1])),
+        }
+
+
+def print_report(r):
+    print(f"\n[INFO] 부하 테스트 결과 ({r['host']}, 연결 {r['connections']}개, {r['wall_seconds']:.1f}s)")
+    print(f"  요청 {r['requests']} / 성공 {r['success']}  처리량 {r['throughput_rps']:.2f} req/s  "
+          f"오디오 {r['audio_bytes_per_sec'] / 1024:.1f} KB/s")
+    print(f"  지연 p50 {r['latency_p50'] * 1000:.1f}ms  p95 {r['latency_p95'] * 1000:.1f}ms  "
+          f"p99 {r['latency_p99'] * 1000:.1f}ms  (TTFB p50 {r['ttfb_p50'] * 1000:.1f}ms)")
+    for name, count in r["statuses"].items():
+        print(f"  {name:<24} {count:>7}  ({count / r['requests'] * 100:.1f}%)")
+
+
+def load_corpus(path):
+    """코퍼스 파일 (한 줄에 한 문장), 없으면 기본 코퍼스"""
+    if not path:
+        return LOAD_CORPUS
+    with open(path, 'r', encoding='utf-8') as f:
+        texts = [line.strip() for line in f if line.strip()]
+    if not texts:
+        raise ValueError(f"코퍼스가 비어 있습니다: {path}")
+    return texts
+
+
+def run_load_test(args):
+    formats = proto.FORMAT_CODES
+    if args.duration is None and args.requests is None:
+        args.duration = 30.0
+    tester = LoadTester(args.host, args.port, load_corpus(args.corpus), args.connections, args.duration,
+                        args.requests, formats[args.format], args.stream, args.sample_rate, args.timeout)
+    limit = f"{args.duration:.0f}s" if args.duration else f"{args.requests} requests"
+    print(f"[INFO] 부하 테스트 시작: {args.host}:{args.port}, 연결 {args.connections}개, {limit}, "
+          f"format={args.format}, stream={args.stream}")
+    report = asyncio.run(tester.run())
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] 결과 저장: {args.json}")
+    # 성공이 하나도 없으면 실패 종료 코드
+    return 0 if report["success"] else 1
+
+
 def main():
+    parser = argparse.ArgumentParser(description="TTS Client (UI / --load 부하 테스트)")
+    parser.add_argument('--load', action='store_true', help="UI 없이 부하 테스트 실행")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2501)
+    parser.add_argument('-c', '--connections', type=int, default=4, help="동시 연결 수")
+    parser.add_argument('--duration', type=float, default=None, help="실행 시간(초), --requests와 함께 없으면 30초")
+    parser.add_argument('--requests', type=int, default=None, help="총 요청 수")
+    parser.add_argument('--corpus', default=None, help="텍스트 코퍼스 파일 (한 줄에 한 문장)")
+    parser.add_argument('--format', choices=['wav', 'mp3', 'ogg', 'pcm'], default='wav')
+    parser.add_argument('--stream', action='store_true', help="스트리밍 요청 (FLAGS=STREAM)")
+    parser.add_argument('--sample-rate', type=int, default=0, help="출력 샘플레이트 (0이면 원본)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="요청당 제한 시간(초)")
+    parser.add_argument('--json', default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.load:
+        return run_load_test(args)
+    if tk is None:
+        print("[ERROR] UI 실행에는 tkinter / pygame이 필요합니다. (headless: --load)")
+        return 1
     root = tk.Tk()
     app = TTSClientApp(root)
     root.mainloop()
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
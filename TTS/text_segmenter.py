@@ -0,0 +1,113 @@
+# filename: text_segmenter.py
+# author: gbox3d
+# created: 2025-10-19
+# description: 스트리밍 합성용 텍스트 분할기 (짧은 첫 구간으로 첫 오디오까지의 시간 단축, 문장/절 경계 우선, 숫자·인용구 내부 분할 금지)
+
+import os
+import re
+
+# 분할 후보 우선순위 (높을수록 자연스러운 경계)
+BREAK_SENTENCE = 3
+BREAK_CLAUSE = 2
+BREAK_CONNECTIVE = 1
+BREAK_SPACE = 0
+
+# 문장 끝 (공백/줄 끝 앞) 또는 CJK 문장부호 / 줄바꿈
+_SENTENCE_RE = re.compile(r'[.!?…]+["”’」』)]*(?=\s|$)|[。！？]+|\n')
+# 절 경계 (쉼표류)
+_CLAUSE_RE = re.compile(r'[,;:]+(?=\s)|[、，；：]+')
+# 한국어 연결 어미 (공백 앞) - 쉼표 없는 긴 문장의 절 경계
+_CONNECTIVE_RE = re.compile(r'[가-힣](?:고|며|면|서|지만|는데|은데|니까|으나|거나|도록|면서)(?=\s)')
+_SPACE_RE = re.compile(r'\s+')
+
+# 분할 금지 구간: 인용/괄호, 공백으로 이어진 숫자 묶음과 뒤따르는 단위 (전화번호, 1,000 원 / 3.14 / 12:30 포함)
+_PROTECTED_RE = re.compile(
+    r'"[^"\n]*"|“[^”]*”|‘[^’]*’|「[^」]*」|『[^』]*』|\([^)\n]*\)|\[[^\]\n]*\]'
+    r'|\d[\d.,:/\-]*(?:\s\d[\d.,:/\-]*)*(?:\s[^\s\d.,!?;:]+)?'
+)
+
+
+class Segmenter:
+    """
+    텍스트 → 합성 구간 목록
+    첫 구간은 first_chars 이내의 가장 이른 자연 경계에서 끊어 첫 오디오를 빨리 내보내고,
+    이후 구간은 max_chars 이내에서 가장 우선순위가 높은(같으면 가장 뒤의) 경계까지 채웁니다.
+    max_chars 안에 경계가 전혀 없으면 (공백 없는 긴 CJK 문자열 등) 분할 금지 구간을 피해 글자 수로 강제 분할합니다.
+    (MeloTTS 입력 길이는 글자 수에 비례하므로 음소 대신 글자 수로 제한)
+    """
+
+    def __init__(self, first_chars=24, max_chars=120, min_chars=6):
+        self.first_chars = max(1, first_chars)
+        self.max_chars = max(self.first_chars, max_chars)
+        self.min_chars = max(0, min(min_chars, self.first_chars))
+
+    @classmethod
+    def from_env(cls):
+        """TTS_SEGMENT_FIRST_CHARS (기본 24) / TTS_SEGMENT_MAX_CHARS (기본 120) / TTS_SEGMENT_MIN_CHARS (기본 6)"""
+        return cls(int(os.getenv("TTS_SEGMENT_FIRST_CHARS", 24)),
+                   int(os.getenv("TTS_SEGMENT_MAX_CHARS", 120)),
+                   int(os.getenv("TTS_SEGMENT_MIN_CHARS", 6)))
+
+    def _protected(self, text):
+        """분할 금지 구간 (start, end) 목록 (max_chars보다 긴 구간은 길이 제한을 위해 보호하지 않음)"""
+        return [m.span() for m in _PROTECTED_RE.finditer(text) if m.end() - m.start() <= self.max_chars]
+
+    def breaks(self, text):
+        """분할 후보 {위치: 우선순위} (위치는 구간이 끝나는 인덱스)"""
+        found = {}
+        for pattern, priority in ((_SPACE_RE, BREAK_SPACE), (_CONNECTIVE_RE, BREAK_CONNECTIVE),
+                                  (_CLAUSE_RE, BREAK_CLAUSE), (_SENTENCE_RE, BREAK_SENTENCE)):
+            for m in pattern.finditer(text):
+                pos = m.start() if priority == BREAK_SPACE else m.end()
+                if 0 < pos < len(text):
+                    found[pos] = max(priority, found.get(pos, priority))
+        protected = self._protected(text)
+        return {pos: p for pos, p in found.items() if not any(s < pos < e for s, e in protected)}
+
+    def _cut(self, candidates, protected, start, limit, first):
+        """start부터 limit 글자 이내에서 끊을 위치 선택"""
+        lo, hi = start + self.min_chars, start + limit
+        window = [(pos, p) for pos, p in candidates if lo <= pos <= hi]
+        if window:
+            best = max(p for _, p in window)
+            if first:
+                # 첫 구간: 절 이상 경계가 있으면 가장 이른 것 (없으면 공백 중 가장 뒤)
+                clause = [pos for pos, p in window if p >= BREAK_CLAUSE]
+                if clause:
+                    return clause[0]
+            return max(pos for pos, p in window if p == best)
+        # 창 안에 경계가 없으면 limit 위치에서 강제 분할
+        # 긴 숫자/인용구에 걸리면 구간 앞에서 끊고, 너무 짧아지면 max_chars 이내일 때 구간 끝에서 끊음
+        for s, e in protected:
+            if s < hi < e:
+                if s >= lo:
+                    return s
+                if e <= start + self.max_chars:
+                    return e
+                break
+        return hi
+
+    def split(self, text):
+        text = text.strip()
+        if not text:
+            return []
+        candidates = sorted(self.breaks(text).items())
+        protected = self._protected(text)
+        segments, start, first = [], 0, True
+        while start < len(text):
+            rest = text[start:].strip()
+            limit = self.first_chars if first else self.max_chars
+            cut = self._cut(candidates, protected, start, limit, first) if len(rest) > limit else None
+            if cut is None:
+                segments.append(rest)
+                break
+            # 짧은 꼬리는 현재 구간에 붙임
+            if len(text[cut:].strip()) < self.min_chars:
+                segments.append(rest)
+                break
+            segment = text[start:cut].strip()
+            if segment:
+                segments.append(segment)
+            start, first = cut, False
+        return segments
+
@@ -0,0 +1,260 @@
+# filename: tts_cache.py
+# author: gbox3d
+# created: 2025-10-19
+# description: 합성 오디오 2단 캐시 (메모리 LRU + 내용 주소 기반 디스크 캐시)
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+
+_WS_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """캐시 키용 텍스트 정규화 (유니코드 NFC, 공백 정리)"""
+    return _WS_RE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def make_cache_key(text, spk_id, speed, language, audio_format, **extra):
+    """(정규화 텍스트, 화자, 속도, 언어, 출력 포맷[, 기타 옵션]) → sha256 키"""
+    fields = {
+        "text": normalize_text(text),
+        "spk": int(spk_id),
+        "speed": round(float(speed), 3),
+        "lang": language,
+        "fmt": audio_format,
+    }
+    fields.update(extra)
+    raw = json.dumps(fields, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()
+
+
+class MemoryCache:
+    """바이트 크기 제한이 있는 LRU 메모리 캐시 (sizeof: 항목 크기 계산 함수, 기본 len)"""
+
+    def __init__(self, max_bytes, sizeof=len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        size = self.sizeof(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= self.sizeof(old)
+            self._items[key] = data
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= self.sizeof(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class DiskCache:
+    """
+    내용 주소(content-addressed) 디스크 캐시
+    파일 경로는 <root>/<key[:2]>/<key>, 용량 초과 시 가장 오래 사용하지 않은 파일부터 삭제합니다.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._index = OrderedDict()  # key -> size (오래된 순)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _load_index(self):
+        entries = []
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name, st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self.size += size
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # 재시작 후에도 LRU 순서 유지
+        except FileNotFoundError:
+            with self._lock:
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self.size -= size
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 여러 프로세스(레플리카)가 같은 디렉터리를 공유하므로 임시 파일 이름은 프로세스 간에도 고유하게 생성
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=f"{key}.", suffix='.tmp',
+                                         delete=False) as f:
+            tmp_path = f.name
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self.size -= old
+            self._index[key] = len(data)
+            self.size += len(data)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self._index.clear()
+            self.size = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class AudioCache:
+    """메모리 LRU → 디스크 순으로 조회하는 2단 캐시 (디스크 적중 시 메모리로 승격)"""
+
+    def __init__(self, memory_bytes=64 * 1024 * 1024, disk_dir=None, disk_bytes=1024 * 1024 * 1024):
+        self.memory = MemoryCache(memory_bytes) if memory_bytes > 0 else None
+        self.disk = DiskCache(disk_dir, disk_bytes) if disk_dir and disk_bytes > 0 else None
+        self.requests = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """TTS_CACHE_MEMORY_MB / TTS_CACHE_DIR / TTS_CACHE_DISK_MB 로 생성 (둘 다 0이면 None)"""
+        memory_mb = float(os.getenv("TTS_CACHE_MEMORY_MB", 64))
+        disk_dir = os.getenv("TTS_CACHE_DIR") or None
+        disk_mb = float(os.getenv("TTS_CACHE_DISK_MB", 1024))
+        if memory_mb <= 0 and not disk_dir:
+            return None
+        return cls(int(memory_mb * 1024 * 1024), disk_dir, int(disk_mb * 1024 * 1024))
+
+    def get(self, key):
+        data = None
+        if self.memory is not None:
+            data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None and self.memory is not None:
+                self.memory.put(key, data)
+        # 여러 합성 워커 스레드가 동시에 호출하므로 카운터는 락 안에서 갱신
+        with self._lock:
+            self.requests += 1
+            if data is not None:
+                self.hits += 1
+        return data
+
+    def put(self, key, data):
+        if self.memory is not None:
+            self.memory.put(key, data)
+        if self.disk is not None:
+            self.disk.put(key, data)
+
+    def clear(self, tier="all"):
+        if tier in ("all", "memory") and self.memory is not None:
+            self.memory.clear()
+        if tier in ("all", "disk") and self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        with self._lock:
+            requests, hits = self.requests, self.hits
+        return {
+            "requests": requests,
+            "hits": hits,
+            "hit_rate": hits / requests if requests else 0.0,
+            "memory": self.memory.stats() if self.memory is not None else None,
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
@@ -0,0 +1,115 @@
+# filename: tts_executor.py
+# author: gbox3d
+# created: 2025-10-19
+# description: 합성/인코딩 전용 워커 풀 (이벤트 루프 블로킹 방지, 대기열 한도 초과 시 즉시 거절)
+
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorBusy(Exception):
+    """워커와 대기열이 모두 찬 상태 (서버는 ERR_BUSY로 응답)"""
+
+
+class ExecutorLease:
+    """
+    스트리밍 요청 하나가 점유하는 워커 슬롯 1개 (문장 작업을 순서대로 실행, 도중에 ExecutorBusy 없음)
+    release() 시점에 실행 중인 작업이 있으면 그 작업이 끝날 때 슬롯을 반납합니다.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self._future = None
+        self._released = False
+
+    async def run(self, fn, *args):
+        self._future = self.executor._pool.submit(fn, *args)
+        return await asyncio.wrap_future(self._future)
+
+    def release(self, then=None):
+        """슬롯 반납 (then: 실행 중인 작업이 끝난 뒤 호출할 정리 함수, 예: 스트림 인코더 닫기)"""
+        if self._released:
+            return
+        self._released = True
+
+        def finish(_=None):
+            try:
+                if then is not None:
+                    then()
+            except Exception as e:
+                print(f"[WARNING] 스트림 정리 중 오류: {e}")
+            finally:
+                self.executor._release()
+
+        if self._future is None or self._future.done():
+            finish()
+        else:
+            self._future.add_done_callback(finish)
+
+
+class SynthesisExecutor:
+    """
+    블로킹 합성 작업을 전용 스레드 풀에서 실행
+    실행 중(workers) + 대기 중(queue_limit) 작업 수가 한도에 도달하면 ExecutorBusy를 발생시킵니다.
+    """
+
+    def __init__(self, workers=1, queue_limit=8):
+        self.workers = max(1, int(workers))
+        self.queue_limit = max(0, int(queue_limit))
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tts-worker")
+
+    @classmethod
+    def from_env(cls):
+        """TTS_WORKERS (기본 1) / TTS_QUEUE_LIMIT (기본 8)"""
+        return cls(int(os.getenv("TTS_WORKERS", 1)), int(os.getenv("TTS_QUEUE_LIMIT", 8)))
+
+    @property
+    def capacity(self):
+        return self.workers + self.queue_limit
+
+    def _reserve(self):
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise ExecutorBusy(f"대기열 초과 (pending={self.pending}, capacity={self.capacity})")
+            self.pending += 1
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, fn, *args):
+        """fn(*args)를 워커 풀에서 실행하고 결과를 기다림 (한도 초과 시 ExecutorBusy)"""
+        self._reserve()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # 슬롯은 작업이 실제로 끝날 때 반납 (기다리던 쪽이 취소돼도 실행 중인 작업은 계속 한도에 포함)
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def lease(self):
+        """스트림 전체에 쓸 슬롯 1개를 미리 확보 (한도 초과 시 ExecutorBusy, 사용 후 release() 필수)"""
+        self._reserve()
+        return ExecutorLease(self)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
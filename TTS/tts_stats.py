@@ -0,0 +1,117 @@
+# filename: tts_stats.py
+# author: gbox3d
+# created: 2025-10-19
+# description: TTS 서버 런타임 통계 (상태 코드별 응답 수, 합성/인코딩 시간 히스토그램, 글자/초, 처리 중 요청 수, 가동 시간)
+
+import time
+import threading
+from contextlib import contextmanager
+
+# 히스토그램 버킷 상한 (ms), 마지막 버킷은 그 이상 전부
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 히스토그램 (스레드 안전은 ServerStats의 lock이 담당)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        ms = seconds * 1000.0
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q):
+        """버킷 상한으로 추정한 분위수 (ms, 관측 최댓값을 넘지 않음)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(float(self.buckets[i]), self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        labels = [f"le_{b}ms" for b in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class ServerStats:
+    """TTSServer 통계 수집기 (이벤트 루프와 합성 워커 스레드에서 함께 갱신)"""
+
+    def __init__(self, status_names=None):
+        self.status_names = status_names or {}
+        self.started = time.time()
+        self.statuses = {}
+        self.requests = {}
+        self.in_flight = 0
+        self.synth = LatencyHistogram()
+        self.encode = LatencyHistogram()
+        self.chars = 0
+        self.synth_seconds = 0.0
+        self.audio_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def count_status(self, status):
+        name = self.status_names.get(status, str(status))
+        with self._lock:
+            self.statuses[name] = self.statuses.get(name, 0) + 1
+
+    @contextmanager
+    def track(self, request):
+        """요청 하나 처리 구간 (요청 종류별 카운트 + 처리 중 요청 수)"""
+        with self._lock:
+            self.requests[request] = self.requests.get(request, 0) + 1
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def observe_synthesis(self, chars, seconds, audio_seconds):
+        with self._lock:
+            self.synth.observe(seconds)
+            self.chars += chars
+            self.synth_seconds += seconds
+            self.audio_seconds += audio_seconds
+
+    def observe_encode(self, seconds):
+        with self._lock:
+            self.encode.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime": time.time() - self.started,
+                "in_flight": self.in_flight,
+                "requests": dict(self.requests),
+                "statuses": dict(self.statuses),
+                "synthesis": self.synth.snapshot(),
+                "encode": self.encode.snapshot(),
+                "chars": self.chars,
+                "chars_per_sec": self.chars / self.synth_seconds if self.synth_seconds else 0.0,
+                "rtf": self.synth_seconds / self.audio_seconds if self.audio_seconds else 0.0,
+            }
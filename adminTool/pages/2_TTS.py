@@ -89,3 +89,74 @@ if st.button("🚀 TTS 서버 상태 확인", type="primary", use_container_widt
         st.warning(f"⚠️ **오류 내용**: {message}")
 st.markdown("---")
 
+
+# 서버 통계 섹션 (REQ_STATS)
+st.header("📈 서버 통계")
+
+
+def format_uptime(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}h {minutes:02d}m {secs:02d}s"
+
+
+def render_histogram(title, hist):
+    st.markdown(f"**{title}** - {hist['count']}회, 평균 {hist['mean_ms']:.1f}ms, "
+                f"p50 {hist['p50_ms']:.0f}ms / p95 {hist['p95_ms']:.0f}ms / p99 {hist['p99_ms']:.0f}ms (버킷 상한 기준)")
+    # 차트 x축이 글자순으로 정렬되지 않도록 버킷 순번을 붙임
+    st.bar_chart({f"{i:02d}. {label}": n for i, (label, n) in enumerate(hist["buckets"].items())})
+
+
+if st.button("📈 TTS 서버 통계 조회", use_container_width=True):
+    with st.spinner("통계 조회 중..."):
+        success, stats, response_time = run_async(
+            checker.get_tts_stats(
+                'localhost',
+                st.session_state.tts_port
+            )
+        )
+
+    if not success:
+        st.error(f"❌ 통계 조회 실패: {stats}")
+    else:
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            st.metric("가동 시간", format_uptime(stats["uptime"]))
+        with col_b:
+            st.metric("처리 중 요청", stats["in_flight"])
+        with col_c:
+            st.metric("합성 속도", f"{stats['chars_per_sec']:.1f} 글자/초")
+        with col_d:
+            cache = stats.get("cache")
+            st.metric("캐시 적중률", f"{cache['hit_rate'] * 100:.1f}%" if cache else "사용 안 함")
+
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            st.metric("상태", "🟢 준비됨" if stats["ready"] else "🟡 워밍업 중")
+        with col_b:
+            st.metric("백엔드", stats.get("backend", "-"))
+        with col_c:
+            st.metric("RTF", f"{stats['rtf']:.3f}")
+        with col_d:
+            executor = stats.get("executor") or {}
+            st.metric("대기 중 작업", f"{executor.get('pending', 0)} / {executor.get('queue_limit', '-')}")
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.markdown("**상태 코드별 응답 수**")
+            if stats["statuses"]:
+                st.bar_chart(stats["statuses"])
+        with col_b:
+            st.markdown("**요청 종류별 수**")
+            if stats["requests"]:
+                st.bar_chart(stats["requests"])
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            render_histogram("합성 시간", stats["synthesis"])
+        with col_b:
+            render_histogram("인코딩 시간", stats["encode"])
+
+        with st.expander("원본 JSON"):
+            st.json(stats)
+st.markdown("---")
@@ -4,11 +4,13 @@
 # description: Server checker utility functions
 
 import asyncio
-import struct
+import json
 import time
 from typing import Tuple
 import os
 
+from voice_protocol import asr, tts
+
 class ServerChecker:
     """서버 상태 확인 클래스"""
 
@@ -25,17 +27,14 @@ class ServerChecker:
             )
 
             # Ping 요청 (request_code = 99)
-            header = struct.pack('!ii', checkcode, 99)
-            writer.write(header)
+            writer.writelines(asr.ping_frames(checkcode))
             await writer.drain()
 
             # 응답 받기
-            response = await asyncio.wait_for(
-                reader.readexactly(9),
+            recv_checkcode, recv_request_code, status = await asyncio.wait_for(
+                asr.read_response(reader),
                 timeout=self.timeout
             )
-
-            recv_checkcode, recv_request_code, status = struct.unpack('!iiB', response)
             elapsed = time.time() - start_time
 
             writer.close()
@@ -72,39 +71,27 @@ class ServerChecker:
                 timeout=self.timeout
             )
 
-            # 1. 헤더 전송 (checkcode, request_code = 1)
-            request_code = 1
-            header = struct.pack('!ii', checkcode, request_code)
-            writer.write(header)
-
-            # 2. 포맷 코드 전송 (wav: 1)
             # 파일 확장자에 따라 포맷 코드 결정 (예시)
             fmt_map = {".wav": 1, ".mp3": 2, ".webm": 3, ".mp4": 4}
             ext = os.path.splitext(audio_filepath)[1].lower()
             fmt_code = fmt_map.get(ext)
             if fmt_code is None:
                  return False, f"지원하지 않는 오디오 포맷: {ext}", 0.0
-            writer.write(struct.pack('!B', fmt_code))
 
-            # 3. 오디오 데이터 크기 및 데이터 전송
-            writer.write(struct.pack('!i', len(audio_bytes)))
-            writer.write(audio_bytes)
+            # 헤더(checkcode, request_code = 1) + 포맷 코드 + 오디오 크기, 오디오 데이터 전송
+            writer.writelines(asr.stt_frames(checkcode, fmt_code, audio_bytes))
             await writer.drain()
 
             # 응답 헤더 수신
-            response_header = await asyncio.wait_for(reader.readexactly(9), timeout=self.timeout)
-            recv_checkcode, recv_request_code, status = struct.unpack('!iiB', response_header)
+            recv_checkcode, recv_request_code, status = await asyncio.wait_for(asr.read_response(reader),
+                                                                               timeout=self.timeout)
 
-            if status != 0:
+            if status != asr.SUCCESS:
                 elapsed = time.time() - start_time
                 return False, f"서버 오류 응답 (status: {status})", elapsed
 
             # 인식 결과 텍스트 수신
-            result_size_bytes = await asyncio.wait_for(reader.readexactly(4), timeout=self.timeout)
-            result_size = struct.unpack('!i', result_size_bytes)[0]
-            
-            result_bytes = await asyncio.wait_for(reader.readexactly(result_size), timeout=self.timeout)
-            text_result = result_bytes.decode('utf-8')
+            text_result = await asyncio.wait_for(asr.read_text(reader), timeout=self.timeout)
 
             elapsed = time.time() - start_time
             writer.close()
@@ -133,28 +120,22 @@ class ServerChecker:
             )
 
             # TTS 서버 헤더 생성 (Ping 요청)
-            header = bytearray(32)
-            header[0:4] = b'TTS1'  # CHECKCODE
-            header[4] = 99  # REQ_PING
-            header[5] = 0  # format_code (사용하지 않음)
-
-            writer.write(header)
+            writer.writelines(tts.request_frames(tts.REQ_PING))
             await writer.drain()
 
             # 응답 받기 (32바이트 헤더)
             response = await asyncio.wait_for(
-                reader.readexactly(32),
+                tts.read_header(reader),
                 timeout=self.timeout
             )
 
-            recv_checkcode = response[0:4]
-            status = response[4]
+            status = response.code
             elapsed = time.time() - start_time
 
             writer.close()
             await writer.wait_closed()
 
-            if recv_checkcode == b'TTS1' and status == 0:
+            if response.valid and status == tts.SUCCESS:
                 return True, f"응답 시간: {elapsed:.3f}초", elapsed
             else:
                 return False, f"잘못된 응답 (status: {status})", elapsed
@@ -169,6 +150,40 @@ class ServerChecker:
             elapsed = time.time() - start_time
             return False, f"오류: {str(e)}", elapsed
 
+    async def get_tts_stats(self, host: str, port: int) -> Tuple[bool, object, float]:
+        """TTS 서버 통계 요청 (REQ_STATS 0x12) → (성공 여부, 통계 dict 또는 오류 메시지, 응답 시간)"""
+        start_time = time.time()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port),
+                timeout=self.timeout
+            )
+
+            writer.writelines(tts.request_frames(tts.REQ_STATS))
+            await writer.drain()
+
+            # 응답 헤더 (32바이트) + JSON 페이로드
+            response, payload = await asyncio.wait_for(tts.read_frame(reader), timeout=self.timeout)
+            status = response.code
+            elapsed = time.time() - start_time
+
+            writer.close()
+            await writer.wait_closed()
+
+            if not response.valid or status != tts.SUCCESS:
+                return False, f"잘못된 응답 (status: {status})", elapsed
+            return True, json.loads(bytes(payload).decode('utf-8')), elapsed
+
+        except asyncio.TimeoutError:
+            elapsed = time.time() - start_time
+            return False, f"타임아웃 ({self.timeout}초)", elapsed
+        except ConnectionRefusedError:
+            elapsed = time.time() - start_time
+            return False, "연결 거부됨", elapsed
+        except Exception as e:
+            elapsed = time.time() - start_time
+            return False, f"오류: {str(e)}", elapsed
+
 def run_async(coro):
     """비동기 함수를 동기적으로 실행"""
     try:
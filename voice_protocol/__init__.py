@@ -0,0 +1,13 @@
+# filename: voice_protocol/__init__.py
+# author: gbox3d
+# created: 2025-10-19
+# description: ASR / TTS TCP 프로토콜 공용 코덱 (서버와 클라이언트가 같은 프레임 정의를 공유)
+#
+# 사용 예:
+#   from voice_protocol import asr, tts
+#   writer.writelines(tts.response_frames(tts.SUCCESS, audio, sample_rate=44100))
+#   header = await tts.read_header(reader)
+
+from . import asr, tts
+
+__all__ = ["asr", "tts"]
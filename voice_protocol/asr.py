@@ -0,0 +1,105 @@
+# filename: voice_protocol/asr.py
+# author: gbox3d
+# created: 2025-10-19
+# description: ASR 서버 '!iiB' 프레임 인코딩/디코딩 (STT/asr_protocol.md)
+#
+# 요청: checkcode(i) + request_code(i) [+ 요청별 바디]
+# 응답: checkcode(i) + request_code(i) + status(B) [+ 텍스트 길이(i) + UTF-8 텍스트]
+# 프레임은 조각 리스트로 만들어 writer.writelines()로 보냅니다. (오디오 바이트를 헤더와 이어 붙이지 않음)
+
+import struct
+from typing import NamedTuple
+
+# 요청 코드
+REQ_STT = 0x01
+REQ_STT_SHM = 0x02
+REQ_PING = 99
+
+# 상태 코드
+SUCCESS = 0
+ERR_CHECKCODE_MISMATCH = 1
+ERR_INVALID_DATA = 2
+ERR_INVALID_REQUEST = 3
+ERR_INVALID_PARAMETER = 4
+ERR_INVALID_FORMAT = 5
+ERR_UNKNOWN_CODE = 8
+ERR_EXCEPTION = 9
+ERR_TIMEOUT = 10
+
+# 오디오 포맷 코드
+FORMAT_NAMES = {1: "wav", 2: "mp3", 3: "webm", 4: "mp4"}
+
+REQUEST_HEADER = struct.Struct('!ii')
+RESPONSE_HEADER = struct.Struct('!iiB')
+LENGTH = struct.Struct('!i')
+FORMAT = struct.Struct('!B')
+_STT_PREFIX = struct.Struct('!iiBi')            # 헤더 + 포맷 코드 + 오디오 길이
+_SHM_META = struct.Struct('!BiiB')              # sample_format, sample_rate, nbytes, name_len
+_TEXT_PREFIX = struct.Struct('!iiBi')           # 응답 헤더 + 텍스트 길이
+
+
+class ASRResponse(NamedTuple):
+    checkcode: int
+    request_code: int
+    status: int
+
+
+class ShmMeta(NamedTuple):
+    sample_format: int
+    sample_rate: int
+    nbytes: int
+    name_len: int
+
+
+# ── 요청 ──
+def ping_frames(checkcode):
+    return [REQUEST_HEADER.pack(checkcode, REQ_PING)]
+
+
+def stt_frames(checkcode, format_code, audio):
+    """STT 요청 조각: [헤더 + 포맷 + 길이, 오디오]"""
+    return [_STT_PREFIX.pack(checkcode, REQ_STT, format_code, memoryview(audio).nbytes), audio]
+
+
+def shm_frames(checkcode, sample_format, sample_rate, nbytes, name):
+    """STT_SHM 요청 조각: [헤더, 메타, 세그먼트 이름]"""
+    name_bytes = name.encode('utf-8')
+    return [REQUEST_HEADER.pack(checkcode, REQ_STT_SHM),
+            _SHM_META.pack(sample_format, sample_rate, nbytes, len(name_bytes)), name_bytes]
+
+
+def unpack_request(buf, offset=0):
+    """(checkcode, request_code)"""
+    return REQUEST_HEADER.unpack_from(buf, offset)
+
+
+def unpack_shm_meta(buf, offset=0):
+    return ShmMeta._make(_SHM_META.unpack_from(buf, offset))
+
+
+SHM_META_SIZE = _SHM_META.size
+
+
+# ── 응답 ──
+def status_frames(checkcode, request_code, status):
+    return [RESPONSE_HEADER.pack(checkcode, request_code, status)]
+
+
+def text_frames(checkcode, request_code, text):
+    """성공 응답 조각: [헤더 + 텍스트 길이, 텍스트]"""
+    body = text.encode('utf-8')
+    return [_TEXT_PREFIX.pack(checkcode, request_code, SUCCESS, len(body)), body]
+
+
+def unpack_response(buf, offset=0):
+    return ASRResponse._make(RESPONSE_HEADER.unpack_from(buf, offset))
+
+
+async def read_response(reader):
+    return unpack_response(await reader.readexactly(RESPONSE_HEADER.size))
+
+
+async def read_text(reader):
+    """성공 응답의 텍스트 길이(4) + UTF-8 텍스트"""
+    size = LENGTH.unpack(await reader.readexactly(LENGTH.size))[0]
+    return (await reader.readexactly(size)).decode('utf-8')
@@ -0,0 +1,145 @@
+# filename: voice_protocol/tts.py
+# author: gbox3d
+# created: 2025-10-19
+# description: TTS 서버 32바이트 'TTS1' 헤더 프레임 인코딩/디코딩 (TTS/protocol.md)
+#
+# 헤더 (big-endian, 32 bytes)
+#   0-3 CHECKCODE | 4 CODE | 5 FMT | 6 FLAGS | 7 reserved | 8-15 TIMESTAMP | 16-19 PAYLOAD_SIZE
+#   20-23 SAMPLE_RATE | 24-27 SEQ | 28-29 SPEED(x100) | 30 LANG | 31 SPEAKER
+# 프레임은 [헤더, 바디...] 조각 리스트로 만들어 writer.writelines()로 보냅니다. (오디오 페이로드를 헤더와 이어 붙이지 않음)
+
+import time
+import struct
+from typing import NamedTuple
+
+CHECKCODE = b'TTS1'
+HEADER_SIZE = 32
+
+# 요청 코드
+REQ_TTS = 0x01
+REQ_ADMIN = 0x10
+REQ_PROMPT = 0x11
+REQ_STATS = 0x12
+REQ_PING = 99
+
+# 상태 코드
+SUCCESS = 0
+ERR_CHECKCODE_MISMATCH = 1
+ERR_INVALID_DATA = 2
+ERR_INVALID_REQUEST = 3
+ERR_INVALID_PARAMETER = 4
+ERR_INVALID_FORMAT = 5
+ERR_NOT_FOUND = 6
+ERR_UNKNOWN_CODE = 8
+ERR_EXCEPTION = 9
+ERR_TIMEOUT = 10
+ERR_BUSY = 11
+ERR_NOT_READY = 12
+
+# FLAGS (byte 6) 비트
+FLAG_STREAM = 0x01
+FLAG_END = 0x02
+
+# FMT 코드
+FORMAT_CODES = {'wav': 1, 'mp3': 2, 'ogg': 3, 'pcm': 4}
+
+_HEADER = struct.Struct('!4sBBBxQIIIHBB')
+_LENGTH = struct.Struct('!I')
+
+
+class TTSHeader(NamedTuple):
+    checkcode: bytes
+    code: int           # 요청 코드 또는 응답 상태 코드
+    fmt: int
+    flags: int
+    timestamp: int
+    payload_size: int
+    sample_rate: int
+    seq: int
+    speed_x100: int
+    lang: int
+    speaker: int
+
+    @property
+    def speed(self):
+        """SPEED 필드 (0이면 1.0)"""
+        return self.speed_x100 / 100.0 if self.speed_x100 else 1.0
+
+    @property
+    def valid(self):
+        return self.checkcode == CHECKCODE
+
+
+def pack_header(code, fmt=0, flags=0, payload_size=0, sample_rate=0, seq=0, speed=0.0, lang=0, speaker=0,
+                timestamp=None):
+    """32바이트 헤더 (speed는 배율, 0이면 기본값)"""
+    return _HEADER.pack(CHECKCODE, code, fmt, flags, int(time.time()) if timestamp is None else timestamp,
+                        payload_size, sample_rate, seq, int(round(speed * 100)), lang, speaker)
+
+
+def unpack_header(buf, offset=0):
+    """버퍼(bytes/bytearray/memoryview)에서 복사 없이 헤더 파싱"""
+    return TTSHeader._make(_HEADER.unpack_from(buf, offset))
+
+
+def request_frames(code, body=None, **fields):
+    """요청 프레임 조각: [헤더] 또는 [헤더, 바디 길이(4), 바디] (body: str 또는 bytes-like)"""
+    if body is None:
+        return [pack_header(code, **fields)]
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return [pack_header(code, **fields), _LENGTH.pack(len(body)), body]
+
+
+def response_frames(status, payload=None, **fields):
+    """응답 프레임 조각: [헤더] 또는 [헤더, 페이로드...] (payload: bytes-like 또는 그 조각 리스트, PAYLOAD_SIZE는 합계)"""
+    if payload is None:
+        parts = []
+    elif isinstance(payload, (list, tuple)):
+        parts = list(payload)
+    else:
+        parts = [payload]
+    size = sum(memoryview(part).nbytes for part in parts)
+    if size == 0:
+        return [pack_header(status, **fields)]
+    return [pack_header(status, payload_size=size, **fields)] + parts
+
+
+async def read_header(reader):
+    return unpack_header(await reader.readexactly(HEADER_SIZE))
+
+
+async def read_body(reader):
+    """요청 바디: 길이(4) + 바이트"""
+    size = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))[0]
+    return await reader.readexactly(size)
+
+
+async def read_frame(reader):
+    """응답 프레임 1개 → (헤더, 페이로드 memoryview)"""
+    header = await read_header(reader)
+    payload = await reader.readexactly(header.payload_size) if header.payload_size else b''
+    return header, memoryview(payload)
+
+
+def send_frames(sock, frames):
+    """블로킹 소켓으로 프레임 조각 전송 (조각을 이어 붙이지 않음)"""
+    for frame in frames:
+        sock.sendall(frame)
+
+
+def recv_exact(sock, size):
+    """블로킹 소켓에서 정확히 size 바이트 수신 (미리 할당한 버퍼에 recv_into)"""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError(f"수신 중 연결 종료 ({received}/{size} 바이트)")
+        received += n
+    return buf
+
+
+def recv_header(sock):
+    return unpack_header(recv_exact(sock, HEADER_SIZE))